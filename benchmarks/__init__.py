@@ -0,0 +1 @@
+"""Skrip benchmark; jalankan dengan `python -m benchmarks.<nama>` dari root repo."""
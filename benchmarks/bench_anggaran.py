@@ -0,0 +1,140 @@
+"""Anggaran token input + batas keluaran vs tanpa anggaran untuk prompt sangat panjang.
+
+Mock diberi jendela konteks 8k token, waktu proses per token masukan, dan
+waktu generate per token keluaran (request tanpa max_tokens dianggap
+menulis versi perbaikan sepanjang `--token-tanpa-batas`). Prompt multi-bagian
+dari ratusan sampai puluhan ribu token dinilai dua kali: tanpa anggaran
+(ANGGARAN_TOKEN_INPUT=0, ANGGARAN_TOKEN_KELUARAN=0) dan dengan anggaran default.
+Request plus max_tokens harus selalu muat jendela konteks. Terakhir mock
+memotong jawaban di max_tokens: jawaban terpotong diulang sekali dengan
+batas lebih besar yang masih muat konteks, dan kalau tetap terpotong (atau
+konteks sudah penuh) berakhir dengan AnalisisError yang jelas tanpa 400.
+
+    python -m benchmarks.bench_anggaran --latency 0.05 --konteks 8192
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from benchmarks.mock_openai import jalankan_mock
+
+_PARAGRAF = (
+    "Pastikan setiap jawaban mengikuti kebijakan perusahaan tentang privasi data pelanggan, "
+    "gunakan bahasa yang sopan, dan sebutkan sumber bila mengutip angka. "
+)
+
+
+def buat_prompt(bagian: int) -> str:
+    """System prompt multi-halaman: peran di awal, aturan bernomor di tengah, format keluaran di akhir"""
+    isi = ["# Peran\nKamu adalah asisten layanan pelanggan toko elektronik. Jawab dengan ramah dan ringkas."]
+    isi += [f"## Aturan {i}\nAturan nomor {i}: " + _PARAGRAF * 6 for i in range(bagian)]
+    isi.append("# Format keluaran\nJawab dalam tiga poin singkat lalu tutup dengan pertanyaan lanjutan.")
+    return "\n\n".join(isi)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latency dasar mock per request (detik)")
+    parser.add_argument("--konteks", type=int, default=8192, help="Jendela konteks mock (token)")
+    parser.add_argument("--detik-per-token", type=float, default=0.0002, help="Waktu generate per token keluaran")
+    parser.add_argument("--detik-per-token-masuk", type=float, default=0.00002, help="Waktu proses per token masukan")
+    parser.add_argument("--token-tanpa-batas", type=int, default=4000,
+                        help="Token keluaran request tanpa max_tokens (versi perbaikan prompt panjang)")
+    args = parser.parse_args()
+
+    server, base_url = jalankan_mock(latency=args.latency)
+    handler = server.RequestHandlerClass
+    handler.konteks_maks = args.konteks
+    handler.detik_per_token = args.detik_per_token
+    handler.detik_per_token_masuk = args.detik_per_token_masuk
+    handler.token_keluaran = args.token_tanpa_batas
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+
+    from penilai import AnalisisError, PenilaiPrompt, get_config, registry
+
+    dasar = dict(get_config(), cache_enabled=False, riwayat_enabled=False, retry_maks=0, breaker_ambang=1.1,
+                 metrics_enabled=True, anggaran_konteks=args.konteks)
+    prompts = {bagian: buat_prompt(bagian) for bagian in (2, 20, 80, 300)}
+    gagal = []
+    hasil = {}
+    for nama, config in (
+        ("tanpa anggaran", dict(dasar, anggaran_token_input=0, anggaran_token_keluaran=0)),
+        ("dengan anggaran", dasar),
+    ):
+        penilai = PenilaiPrompt(config)
+        server.token_masuk_maks = 0
+        print(nama)
+        for bagian, prompt in prompts.items():
+            keputusan = penilai.anggaran(prompt)
+            mulai = time.perf_counter()
+            try:
+                penilai.analisis_prompt(prompt, pakai_cache=False)
+                status = "ok"
+            except AnalisisError as e:
+                status = "gagal (" + ("konteks" if "context_length_exceeded" in str(e) else str(e)[:40]) + ")"
+            durasi = (time.perf_counter() - mulai) * 1000
+            hasil[nama, bagian] = (status, durasi)
+            print(f"  {bagian:>3} bagian  prompt={keputusan.token_prompt:>6} tok  request={keputusan.token_request:>6} tok"
+                  f"  max_tokens={keputusan.max_tokens or '-':>5}  diringkas={keputusan.bagian_diringkas:<3}"
+                  f" dihapus={keputusan.bagian_dihapus:<3} {durasi:7.1f} ms  {status}  [{keputusan.penghitung}]")
+            if nama == "dengan anggaran" and keputusan.token_request + keputusan.max_tokens > args.konteks:
+                gagal.append(f"request + max_tokens prompt {bagian} bagian melebihi jendela konteks")
+        if nama == "dengan anggaran":
+            print(f"  token masukan terbesar di mock: {server.token_masuk_maks}")
+            if server.token_masuk_maks > config["anggaran_token_input"]:
+                gagal.append("request melebihi anggaran token input")
+
+    if any(hasil["dengan anggaran", bagian][0] != "ok" for bagian in prompts):
+        gagal.append("semua prompt harus bisa dinilai dengan anggaran")
+    if hasil["tanpa anggaran", max(prompts)][0] == "ok":
+        gagal.append("prompt terpanjang seharusnya melebihi konteks mock tanpa anggaran")
+    tengah = [b for b in prompts if hasil["tanpa anggaran", b][0] == "ok" and b != min(prompts)]
+    if any(hasil["dengan anggaran", b][1] >= hasil["tanpa anggaran", b][1] for b in tengah):
+        gagal.append("latency prompt panjang harus turun dengan anggaran")
+
+    # Answers cut off at max_tokens: retried once with a larger cap that still fits the context window,
+    # then a clear error. The largest prompt fills the input budget, so its cap is already the context
+    # remainder and it must fail without a doomed request.
+    penilai = PenilaiPrompt(dasar)
+    terkecil, terbesar = prompts[min(prompts)], prompts[max(prompts)]
+    max_kecil, max_besar = penilai.anggaran(terkecil).max_tokens, penilai.anggaran(terbesar).max_tokens
+    for nama, prompt, token_jawaban, harapan, request in (
+        ("terkecil", terkecil, max_kecil + 500, "ok", 2),
+        ("terkecil", terkecil, 100_000, "terpotong", 2),
+        ("terbesar", terbesar, max_besar - 100, "ok", 1),
+        ("terbesar", terbesar, max_besar + 500, "terpotong", 1),
+    ):
+        handler.token_jawaban = token_jawaban
+        for jalur, fungsi in (
+            ("biasa", lambda: penilai.analisis_prompt(prompt, pakai_cache=False)),
+            ("stream", lambda: list(penilai.analisis_prompt_stream(prompt, pakai_cache=False))),
+            ("async", lambda: asyncio.run(penilai.analisis_prompt_async(prompt, pakai_cache=False))),
+        ):
+            awal, error = server.request, server.error
+            try:
+                fungsi()
+                status = "ok"
+            except AnalisisError as e:
+                status = "terpotong" if "terpotong" in str(e) else str(e)[:60]
+            print(f"prompt {nama} (max_tokens {penilai.anggaran(prompt).max_tokens}), jawaban perlu {token_jawaban:>6}"
+                  f" tok, {jalur:<6}: {server.request - awal} request  {status}")
+            if status != harapan or server.request - awal != request or server.error != error:
+                gagal.append(f"jawaban terpotong (prompt {nama}, {jalur}) harus {request} request lalu {harapan}")
+    handler.token_jawaban = 0
+
+    snapshot = registry.snapshot()
+    keputusan = {k: v for k, v in snapshot.items() if k.startswith("penilai_anggaran_total")}
+    print(f"metrik: {keputusan}")
+    if not any("dipangkas" in k for k in keputusan):
+        gagal.append("keputusan pemangkasan harus tercatat di metrik")
+
+    server.shutdown()
+    print("OK" if not gagal else "GAGAL: " + "; ".join(gagal))
+    sys.exit(1 if gagal else 0)
+
+
+if __name__ == "__main__":
+    main()
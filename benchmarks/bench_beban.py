@@ -0,0 +1,171 @@
+"""Uji beban end-to-end: analisis_prompt + generate_tips_kilat pada concurrency naik bertahap.
+
+Secara default menjalankan mock endpoint lokal (benchmarks.mock_openai) di
+proses yang sama, jadi bisa dipakai di CI tanpa akses jaringan dan tanpa
+biaya API. Untuk tiap level concurrency dilaporkan throughput (flow/detik),
+p50/p95/p99 latency, jumlah error, dan pemakaian memori.
+
+    python -m benchmarks.bench_beban --latency 0.8 --distribusi lognormal --error-rate 0.02
+    python -m benchmarks.bench_beban --concurrency 1,4,16 --requests 50 --json hasil.json
+    python -m benchmarks.bench_beban --base-url http://127.0.0.1:8765/v1   # mock/endpoint yang sudah jalan
+
+Mock in-process berbagi GIL dengan client; untuk --stream atau concurrency
+tinggi jalankan `python -m benchmarks.mock_openai` di proses terpisah dan
+arahkan --base-url ke sana supaya overhead mock tidak ikut terukur.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from benchmarks.mock_openai import jalankan_mock, tambah_argumen_mock
+
+PROMPT_UJI = [
+    "Jelaskan konsep blockchain dalam 3 paragraf untuk pemula.",
+    "Buatkan caption Instagram untuk sepatu sneakers dari bahan daur ulang.",
+    "Saya punya budget Rp 5.000.000 untuk liburan 4 hari di Bali. Pikirkan step by step.",
+]
+
+
+def persentil(data, p):
+    data = sorted(data)
+    return data[min(int(len(data) * p), len(data) - 1)]
+
+
+def rss_mb() -> float:
+    """Resident set size proses saat ini (MB); 0 jika tidak tersedia di platform ini"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            return 0.0
+
+
+def jalankan_level(penilai, concurrency: int, jumlah: int, stream: bool) -> Dict[str, Any]:
+    from penilai import AnalisisError, generate_tips_kilat
+
+    def satu(i: int):
+        prompt = f"{PROMPT_UJI[i % len(PROMPT_UJI)]} (#{i})"
+        mulai = time.perf_counter()
+        try:
+            if stream:
+                analisis = dict(penilai.analisis_prompt_stream(prompt, pakai_cache=False))["selesai"]
+            else:
+                analisis = penilai.analisis_prompt(prompt, pakai_cache=False)
+        except AnalisisError:
+            return None
+        generate_tips_kilat(
+            analisis, penilai.client, prompt, penilai.config["model"],
+            penjadwal=penilai.penjadwal, resilien=penilai.resilien,
+        )
+        return time.perf_counter() - mulai
+
+    rss_awal = rss_mb()
+    mulai = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        hasil = list(pool.map(satu, range(jumlah)))
+    total = time.perf_counter() - mulai
+
+    durasi = [d * 1000 for d in hasil if d is not None]
+    return {
+        "concurrency": concurrency,
+        "requests": jumlah,
+        "sukses": len(durasi),
+        "error": jumlah - len(durasi),
+        "rps": len(durasi) / total if total else 0.0,
+        "p50_ms": statistics.median(durasi) if durasi else 0.0,
+        "p95_ms": persentil(durasi, 0.95) if durasi else 0.0,
+        "p99_ms": persentil(durasi, 0.99) if durasi else 0.0,
+        "rss_mb": rss_mb(),
+        "rss_delta_mb": rss_mb() - rss_awal,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="Daftar level concurrency, dipisah koma")
+    parser.add_argument("--requests", type=int, default=64, help="Jumlah flow (analisis + tips) per level")
+    parser.add_argument("--base-url", help="Pakai endpoint ini alih-alih menjalankan mock di proses yang sama")
+    parser.add_argument("--retry", type=int, default=0,
+                        help="Retry lapisan resilience (default 0 supaya error injeksi terlihat)")
+    parser.add_argument("--hedging", action="store_true", help="Aktifkan hedging di p95")
+    parser.add_argument("--stream", action="store_true", help="Pakai analisis_prompt_stream")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Laporkan puncak alokasi Python per level (memperlambat eksekusi)")
+    parser.add_argument("--json", metavar="PATH", help="Tulis hasil sebagai JSON (untuk dibandingkan di CI)")
+    tambah_argumen_mock(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        server, base_url = jalankan_mock(
+            latency=args.latency,
+            distribusi=args.distribusi,
+            sebaran=args.sebaran,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            seed=args.seed,
+        )
+    # Injected failures make the tips fallback warn on every flow; keep the report readable
+    logging.getLogger("penilai").setLevel(logging.ERROR)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+
+    from penilai import PenilaiPrompt, get_config
+
+    config = dict(
+        get_config(),
+        cache_enabled=False,
+        riwayat_enabled=False,
+        tips_mode="terpisah",
+        retry_maks=args.retry,
+        hedging=args.hedging,
+        # Injected errors should be measured, not short-circuited
+        breaker_ambang=1.1,
+    )
+    penilai = PenilaiPrompt(config)
+
+    # Warm-up: imports, first TCP connection and lazy client setup stay out of the first level
+    jalankan_level(penilai, 1, 1, args.stream)
+
+    print(f"endpoint={base_url}  latency={args.latency}s ({args.distribusi})  error_rate={args.error_rate:.1%}")
+    semua: List[Dict[str, Any]] = []
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        if args.tracemalloc:
+            tracemalloc.start()
+        hasil = jalankan_level(penilai, concurrency, args.requests, args.stream)
+        if args.tracemalloc:
+            hasil["tracemalloc_puncak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+        semua.append(hasil)
+        print(
+            f"c={concurrency:<3} rps={hasil['rps']:7.1f}  p50={hasil['p50_ms']:8.1f} ms"
+            f"  p95={hasil['p95_ms']:8.1f} ms  p99={hasil['p99_ms']:8.1f} ms"
+            f"  error={hasil['error']:<3} rss={hasil['rss_mb']:6.1f} MB"
+            + (f"  puncak_alokasi={hasil['tracemalloc_puncak_mb']:.1f} MB" if args.tracemalloc else "")
+        )
+
+    if server is not None:
+        print(f"mock: {server.request} request, {server.error} error diinjeksi, {server.koneksi} koneksi TCP")
+        server.shutdown()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"argumen": vars(args), "hasil": semua}, f, indent=2)
+        print(f"hasil ditulis ke {args.json}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Mode cascade vs semua ke model utama terhadap mock endpoint.
+
+Mock memberi skor berbeda per prompt (tersebar di semua pita skor), model
+murah dibuat lebih cepat dan sesekali mengembalikan JSON rusak. Set prompt
+yang sama dinilai dua kali: tanpa cascade dan dengan cascade. Dilaporkan
+rasio eskalasi per alasan, latency dan biaya per tier, serta penghematan.
+
+    python -m benchmarks.bench_cascade --n 200 --latency 0.05 --faktor-murah 0.3
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+from benchmarks.mock_openai import jalankan_mock
+
+_TOPIK = ("caption Instagram", "email penawaran", "ringkasan rapat", "artikel blog", "deskripsi produk")
+
+
+def buat_prompt(i: int) -> str:
+    prompt = f"Buatkan {_TOPIK[i % len(_TOPIK)]} untuk usaha kopi #{i} dengan gaya santai."
+    if i % 10 == 0:
+        # Long prompts skip the cheap model entirely
+        prompt += " Konteks tambahan: " + " ".join(f"detail{j}" for j in range(200))
+    elif i % 7 == 0:
+        # Few-shot plus step-by-step counts as complex
+        prompt += "\nContoh 1: Kopi pagi bikin semangat.\nContoh 2: Senja dan kopi.\nPikirkan step by step."
+    return prompt
+
+
+def jalankan(config, prompts):
+    from penilai import PenilaiPrompt
+    from penilai.cascade import pelacak_cascade
+
+    pelacak_cascade.reset()
+    penilai = PenilaiPrompt(config)
+    durasi, skor = [], []
+    for prompt in prompts:
+        mulai = time.perf_counter()
+        skor.append(penilai.analisis_prompt(prompt, pakai_cache=False).skor)
+        durasi.append((time.perf_counter() - mulai) * 1000)
+    return durasi, skor, pelacak_cascade.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200, help="Jumlah prompt berbeda")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latency mock model utama (detik)")
+    parser.add_argument("--faktor-murah", type=float, default=0.3, help="Latency model murah relatif model utama")
+    parser.add_argument("--json-rusak", type=float, default=0.05, help="Fraksi jawaban model murah yang JSON-nya rusak")
+    parser.add_argument("--model", default="gpt-4", help="Model utama")
+    parser.add_argument("--model-murah", default="gpt-4o-mini", help="Model murah")
+    parser.add_argument("--margin", type=float, default=3.0, help="Jarak ke batas pita skor yang memicu eskalasi")
+    args = parser.parse_args()
+
+    server, base_url = jalankan_mock(latency=args.latency, seed=11)
+    handler = server.RequestHandlerClass
+    handler.skor_acak = True
+    handler.faktor_latency = {args.model_murah: args.faktor_murah}
+    handler.json_rusak = {args.model_murah: args.json_rusak}
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+
+    from penilai import get_config
+    from penilai.cascade import alasan_eskalasi_awal, biaya, dekat_batas
+
+    dasar = dict(get_config(), cache_enabled=False, riwayat_enabled=False, retry_maks=0, breaker_ambang=1.1,
+                 model=args.model, cascade_model=args.model_murah, cascade_margin=args.margin)
+    prompts = [buat_prompt(i) for i in range(args.n)]
+
+    durasi_utama, skor_utama, _ = jalankan(dict(dasar, cascade=False), prompts)
+    durasi, skor, stats = jalankan(dict(dasar, cascade=True), prompts)
+
+    # The mock reports the same usage for every call
+    biaya_utama = biaya(args.model, SimpleNamespace(prompt_tokens=1000, completion_tokens=400)) * args.n
+    print(f"tanpa cascade : rata={statistics.mean(durasi_utama):6.1f} ms  p50={statistics.median(durasi_utama):6.1f} ms"
+          f"  biaya=${biaya_utama:.4f}")
+    print(f"dengan cascade: rata={statistics.mean(durasi):6.1f} ms  p50={statistics.median(durasi):6.1f} ms"
+          f"  biaya=${stats['biaya_usd']:.4f}"
+          f"  (perkiraan tanpa cascade ${stats['biaya_tanpa_cascade_usd']:.4f}, hemat ${stats['hemat_usd']:.4f})")
+    print(f"eskalasi {stats['eskalasi']}/{stats['evaluasi']} = {stats['rasio_eskalasi']:.0%}  alasan={stats['alasan']}")
+    for nama, tier in stats["tier"].items():
+        print(f"  tier {nama:<5} panggilan={tier['panggilan']:<4} rata latency={tier['rata_latency_detik'] * 1000:6.1f} ms"
+              f"  token={tier['prompt_tokens'] + tier['completion_tokens']:<7} biaya=${tier['biaya_usd']:.4f}")
+
+    gagal = []
+    # The mock scores by prompt text, so the main-model run tells which prompts sit near a cutoff
+    dekat = sum(
+        1 for prompt, s in zip(prompts, skor_utama)
+        if dekat_batas(s, args.margin) and alasan_eskalasi_awal(prompt, dasar["cascade_kata_maks"]) is None
+    )
+    alasan = stats["alasan"]
+    # A near-cutoff answer that also broke its JSON is counted as json_tidak_valid
+    if not alasan.get("dekat_batas", 0) <= dekat <= alasan.get("dekat_batas", 0) + alasan.get("json_tidak_valid", 0):
+        gagal.append(f"{dekat} prompt dekat batas harus dieskalasi")
+    if skor != skor_utama:
+        gagal.append("skor akhir harus sama dengan run tanpa cascade")
+    if not stats["hemat_usd"] > 0:
+        gagal.append("cascade harus lebih murah")
+    if abs(stats["biaya_tanpa_cascade_usd"] - biaya_utama) > 1e-9:
+        gagal.append("perkiraan biaya tanpa cascade harus sama dengan run tanpa cascade")
+    server.shutdown()
+    print("OK" if not gagal else "GAGAL: " + "; ".join(gagal))
+    sys.exit(1 if gagal else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Bandingkan client OpenAI baru per request vs client bersama dengan pooling.
+
+Menjalankan mock endpoint lokal (benchmarks.mock_openai), lalu mengirim
+request chat completion yang sama dengan dua strategi:
+- per-request: openai.OpenAI() baru setiap kali (perilaku lama, PenilaiPrompt per rerun)
+- bersama: penilai.get_client() dengan pool koneksi keep-alive
+
+    python -m benchmarks.bench_client --requests 200 --concurrency 8
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_openai import jalankan_mock
+from penilai import get_client, get_config, statistik_koneksi
+
+PESAN = [{"role": "user", "content": "Jelaskan konsep blockchain dalam 3 paragraf untuk pemula."}]
+
+
+def persentil(data, p):
+    data = sorted(data)
+    return data[min(int(len(data) * p), len(data) - 1)]
+
+
+def jalankan(nama, buat_client, jumlah, concurrency, server):
+    koneksi_awal = server.koneksi
+
+    def satu(_):
+        mulai = time.perf_counter()
+        client = buat_client()
+        client.chat.completions.create(model="gpt-4", messages=PESAN)
+        return (time.perf_counter() - mulai) * 1000
+
+    mulai = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        durasi = list(pool.map(satu, range(jumlah)))
+    total = time.perf_counter() - mulai
+
+    print(
+        f"{nama:<12} p50={statistics.median(durasi):7.2f} ms  p95={persentil(durasi, 0.95):7.2f} ms"
+        f"  p99={persentil(durasi, 0.99):7.2f} ms  rps={jumlah / total:7.1f}"
+        f"  koneksi TCP={server.koneksi - koneksi_awal}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.005, help="Latency mock per request (detik)")
+    args = parser.parse_args()
+
+    server, base_url = jalankan_mock(latency=args.latency)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    config = dict(get_config(), api_key="sk-mock")
+
+    import openai
+
+    jalankan("per-request", lambda: openai.OpenAI(api_key="sk-mock"), args.requests, args.concurrency, server)
+    jalankan("bersama", lambda: get_client(config), args.requests, args.concurrency, server)
+    print("statistik client bersama:", statistik_koneksi())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Lalu lintas demo pada prompt contoh: request ke API dengan dan tanpa artefak.
+
+Setiap "klik" memilih salah satu dari empat prompt contoh lalu menampilkan
+analisis + tips kilat. Tanpa artefak, analisis bisa datang dari cache
+tetapi tips kilat tetap memanggil model setiap kali; dengan artefak,
+klik dilayani dari file tanpa request sama sekali. Dicek juga bahwa
+pergantian model membuat artefak basi, artefak lama tetap tersaji selama
+penyegaran background, dan penyegaran hanya menghitung keempat contoh
+sekali.
+
+    python -m benchmarks.bench_contoh --klik 200 --latency 0.05
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.mock_openai import jalankan_mock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--klik", type=int, default=200, help="Jumlah klik tombol contoh")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latency mock per request (detik)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    server, base_url = jalankan_mock(latency=args.latency)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+
+    from penilai import CONTOH_PROMPT, CacheAnalisis, PenilaiPrompt, get_config, get_koleksi_contoh
+
+    acak = random.Random(args.seed)
+    klik = [acak.choice(list(CONTOH_PROMPT)) for _ in range(args.klik)]
+    gagal = []
+    with tempfile.TemporaryDirectory() as tmp:
+        config = dict(
+            get_config(), retry_maks=0, riwayat_enabled=False, tips_mode="terpisah",
+            cache_path=os.path.join(tmp, "cache.sqlite3"), contoh_path=os.path.join(tmp, "contoh.json"),
+        )
+
+        penilai = PenilaiPrompt(config, cache=CacheAnalisis(path=os.path.join(tmp, "cache-tanpa.sqlite3")))
+        awal, durasi = server.request, []
+        for nama in klik:
+            mulai = time.perf_counter()
+            analisis = penilai.analisis_prompt(CONTOH_PROMPT[nama])
+            penilai.tips_kilat(analisis, CONTOH_PROMPT[nama])
+            durasi.append((time.perf_counter() - mulai) * 1000)
+        tanpa = server.request - awal
+        print(f"tanpa artefak : {tanpa:>4} request untuk {args.klik} klik  p50={statistics.median(durasi):7.2f} ms")
+
+        koleksi = get_koleksi_contoh(config)
+        awal = server.request
+        mulai = time.perf_counter()
+        status = koleksi.segarkan()
+        print(f"bangun artefak: {server.request - awal:>4} request  {(time.perf_counter() - mulai) * 1000:.0f} ms  {status}")
+        awal, durasi = server.request, []
+        for nama in klik:
+            mulai = time.perf_counter()
+            hasil = koleksi.ambil(nama)
+            durasi.append((time.perf_counter() - mulai) * 1000)
+            if hasil is None or not hasil.segar or not hasil.tips:
+                gagal.append(f"artefak {nama} tidak tersaji")
+                break
+        dengan = server.request - awal
+        print(f"dengan artefak: {dengan:>4} request untuk {args.klik} klik  p50={statistics.median(durasi):7.3f} ms")
+        if dengan or tanpa < args.klik:
+            gagal.append("klik contoh dengan artefak tidak boleh memanggil API")
+
+        # Model switch: stale artifacts stay servable while the new version is computed once
+        baru = get_koleksi_contoh(dict(config, model="gpt-4o-mini"))
+        lama = baru.ambil("Few-Shot")
+        print(f"ganti model   : basi={len(baru.basi())}  artefak lama tersaji={lama is not None and not lama.segar}")
+        if len(baru.basi()) != len(CONTOH_PROMPT) or lama is None or lama.segar:
+            gagal.append("ganti model harus membuat artefak basi tapi tetap tersaji")
+        awal = server.request
+        baru.segarkan_background()
+        baru.segarkan_background()
+        while baru.stats()["menyegarkan"]:
+            time.sleep(0.01)
+        segar = all(baru.ambil(nama).segar for nama in CONTOH_PROMPT)
+        print(f"penyegaran bg : {server.request - awal:>4} request  semua segar={segar}  artefak={baru.stats()['artefak']}")
+        if not segar or server.request - awal != 2 * len(CONTOH_PROMPT):
+            gagal.append("penyegaran background harus menghitung tiap contoh tepat sekali")
+
+    server.shutdown()
+    print("OK" if not gagal else "GAGAL: " + "; ".join(gagal))
+    sys.exit(1 if gagal else 0)
+
+
+if __name__ == "__main__":
+    main()
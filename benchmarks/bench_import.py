@@ -0,0 +1,48 @@
+"""Benchmark cold-start import: scoring core headless vs. stack Streamlit lama.
+
+    python -m benchmarks.bench_import --runs 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# prompt_scorer.py lama meng-import semua ini di level modul sebelum bisa menilai apa pun
+SKENARIO = {
+    "penilai (headless)": "import penilai",
+    "penilai + openai": "import penilai, openai",
+    "stack lama (streamlit + openai + dotenv)": "import streamlit, openai, dotenv",
+}
+
+
+def ukur(kode: str, runs: int) -> list:
+    durasi = []
+    for _ in range(runs):
+        mulai = time.perf_counter()
+        hasil = subprocess.run([sys.executable, "-c", kode], capture_output=True)
+        if hasil.returncode != 0:
+            return []
+        durasi.append((time.perf_counter() - mulai) * 1000)
+    return durasi
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = ukur("pass", args.runs)
+    base_ms = statistics.median(baseline)
+    print(f"{'skenario':<45} {'median ms':>10} {'tanpa interpreter':>18}")
+    for nama, kode in SKENARIO.items():
+        durasi = ukur(kode, args.runs)
+        if not durasi:
+            print(f"{nama:<45} {'tidak terpasang':>10}")
+            continue
+        median = statistics.median(durasi)
+        print(f"{nama:<45} {median:>10.1f} {median - base_ms:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
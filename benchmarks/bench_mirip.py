@@ -0,0 +1,116 @@
+"""Lookup indeks prompt mirip pada 100 ribu prompt.
+
+Indeks diisi prompt sintetis dengan kosakata acak, lalu dicari dengan
+sidik yang sudah dihitung (biaya lookup murni) dan dengan prompt mentah
+(termasuk normalisasi + MinHash). Dicek juga: varian spasi/tanda
+baca/kapitalisasi dianggap identik, edit satu kata pada prompt panjang
+tetap ketemu, dan prompt yang tidak berhubungan tidak dicocokkan.
+
+    python -m benchmarks.bench_mirip --n 100000 --lookup 2000 --ambang 0.8
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from penilai.mirip import IndeksMirip, normalisasi_mirip, sidik_minhash
+
+_SUKU = (
+    "ba ka ta ma na ra sa la pa da ga ja be ke te me ne re se le pe de bi ki ti mi ni ri si li pi di "
+    "bu ku tu mu nu ru su lu pu du ng an kan nya lah per ber ter"
+).split()
+
+
+def buat_kosakata(acak: random.Random, n: int = 8000) -> list:
+    return sorted({"".join(acak.choice(_SUKU) for _ in range(acak.randint(1, 4))) for _ in range(n)})
+
+
+def buat_prompt(acak: random.Random, kosakata: list, bobot: list, kata: int) -> str:
+    # Zipf-weighted word choice, so common words are shared across prompts like in real text
+    return " ".join(acak.choices(kosakata, bobot, k=kata)) + "."
+
+
+def persentil(durasi, p):
+    return sorted(durasi)[min(len(durasi) - 1, int(len(durasi) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000, help="Jumlah prompt di indeks")
+    parser.add_argument("--lookup", type=int, default=2000, help="Jumlah pencarian yang diukur")
+    parser.add_argument("--ambang", type=float, default=0.8, help="Kemiripan minimal")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    acak = random.Random(args.seed)
+    kosakata = buat_kosakata(acak)
+    bobot = [1 / (i + 1) for i in range(len(kosakata))]
+    acak.shuffle(kosakata)
+    prompts = [buat_prompt(acak, kosakata, bobot, acak.randint(20, 60)) for _ in range(args.n)]
+    indeks = IndeksMirip(ambang=args.ambang, maks=args.n)
+
+    mulai = time.perf_counter()
+    indeks.muat(prompts)
+    detik_muat = time.perf_counter() - mulai
+    print(f"muat {len(indeks)} prompt: {detik_muat:.1f} s ({detik_muat / args.n * 1e6:.0f} us/prompt)")
+
+    # Half the lookups are fresh prompts (misses), half are one-word edits of stored ones
+    kueri = []
+    for i in range(args.lookup):
+        if i % 2:
+            kata = acak.choice(prompts).split()
+            kata[acak.randrange(len(kata))] = acak.choice(kosakata)
+            kueri.append(" ".join(kata))
+        else:
+            kueri.append(buat_prompt(acak, kosakata, bobot, acak.randint(20, 60)))
+    teks = [normalisasi_mirip(k) for k in kueri]
+    sidik = [sidik_minhash(t) for t in teks]
+
+    durasi_sidik, durasi_penuh = [], []
+    for s, t in zip(sidik, teks):
+        mulai = time.perf_counter()
+        indeks.cari_sidik(s, t)
+        durasi_sidik.append((time.perf_counter() - mulai) * 1000)
+    for k in kueri:
+        mulai = time.perf_counter()
+        indeks.cari(k)
+        durasi_penuh.append((time.perf_counter() - mulai) * 1000)
+    p50, p99 = statistics.median(durasi_sidik), persentil(durasi_sidik, 0.99)
+    print(f"lookup (sidik siap) : p50={p50:.3f} ms  p99={p99:.3f} ms")
+    print(f"lookup (prompt mentah): p50={statistics.median(durasi_penuh):.3f} ms"
+          f"  p99={persentil(durasi_penuh, 0.99):.3f} ms")
+
+    gagal = []
+    if not p99 < 1.0:
+        gagal.append("lookup p99 harus di bawah 1 ms")
+
+    varian = [(p, "  " + p.upper().replace(" ", "   ").rstrip(".") + "!!") for p in acak.sample(prompts, 200)]
+    identik = sum(1 for asli, v in varian if (hasil := indeks.cari(v)) and hasil.identik and hasil.prompt == asli)
+    print(f"varian spasi/tanda baca/kapital identik: {identik}/{len(varian)}")
+    if identik != len(varian):
+        gagal.append("varian spasi/tanda baca/kapital harus identik")
+
+    panjang = [p for p in prompts if len(p.split()) >= 30]
+    edit = ketemu = 0
+    for asli in acak.sample(panjang, min(200, len(panjang))):
+        kata = asli.split()
+        kata[acak.randrange(len(kata))] = acak.choice(kosakata)
+        edit += 1
+        hasil = indeks.cari(" ".join(kata))
+        ketemu += bool(hasil and hasil.prompt == asli)
+    print(f"edit satu kata (>=30 kata) ketemu: {ketemu}/{edit}")
+    if ketemu < 0.9 * edit:
+        gagal.append("edit satu kata pada prompt panjang harus ketemu")
+
+    palsu = sum(1 for t, s in zip(teks[::2], sidik[::2]) if indeks.cari_sidik(s, t) is not None)
+    print(f"prompt baru dicocokkan (false positive): {palsu}/{len(teks[::2])}")
+    if palsu > 0.01 * len(teks[::2]):
+        gagal.append("prompt yang tidak berhubungan tidak boleh dicocokkan")
+
+    print("OK" if not gagal else "GAGAL: " + "; ".join(gagal))
+    sys.exit(1 if gagal else 0)
+
+
+if __name__ == "__main__":
+    main()
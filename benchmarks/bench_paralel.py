@@ -0,0 +1,85 @@
+"""Mode analisis tunggal vs paralel terhadap mock dengan waktu generate per token.
+
+Mode tunggal menulis seluruh JSON analisis dalam satu generate panjang;
+mode paralel mengirim lima kriteria + versi perbaikan sebagai request kecil
+bersamaan, jadi latency mengikuti sub-request terlama. Run ketiga mengganti
+template perbaikan saja (tips_mode gabung): skor kriteria diambil dari
+cache per sub-request, hanya perbaikan yang dipanggil ulang.
+
+    python -m benchmarks.bench_paralel --n 20 --latency 0.05 --detik-per-token 0.0005
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.mock_openai import jalankan_mock
+
+
+def ukur(penilai, prompts, server):
+    request_awal = server.request
+    durasi = []
+    for prompt in prompts:
+        mulai = time.perf_counter()
+        analisis = penilai.analisis_prompt(prompt)
+        durasi.append((time.perf_counter() - mulai) * 1000)
+    return durasi, server.request - request_awal, analisis
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20, help="Jumlah prompt berbeda")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latency dasar mock per request (detik)")
+    parser.add_argument("--detik-per-token", type=float, default=0.0005, help="Waktu generate per token keluaran")
+    parser.add_argument("--token-tunggal", type=int, default=1500, help="Token keluaran analisis mode tunggal")
+    args = parser.parse_args()
+
+    server, base_url = jalankan_mock(latency=args.latency)
+    server.RequestHandlerClass.detik_per_token = args.detik_per_token
+    server.RequestHandlerClass.token_keluaran = args.token_tunggal
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+
+    from penilai import CacheAnalisis, PenilaiPrompt, get_config
+
+    prompts = [f"Buatkan rencana konten mingguan untuk toko roti #{i}." for i in range(args.n)]
+    gagal = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CacheAnalisis(path=os.path.join(tmp, "cache.sqlite3"))
+        dasar = dict(get_config(), retry_maks=0, breaker_ambang=1.1, tips_mode="terpisah", riwayat_enabled=False)
+
+        hasil = {}
+        for mode in ("tunggal", "paralel"):
+            penilai = PenilaiPrompt(dict(dasar, analisis_mode=mode), cache=cache)
+            durasi, request, analisis = ukur(penilai, prompts, server)
+            hasil[mode] = durasi
+            print(f"{mode:<8} p50={statistics.median(durasi):6.1f} ms  p95={sorted(durasi)[int(len(durasi) * 0.95)]:6.1f} ms"
+                  f"  request={request / len(prompts):.0f}/prompt  skor={analisis.skor} {analisis.skor_kriteria}")
+        if not statistics.median(hasil["paralel"]) < statistics.median(hasil["tunggal"]):
+            gagal.append("mode paralel harus lebih cepat")
+        # The mock answers 72 for every criterion, so the weighted total must be 72 as well
+        if analisis.skor != 72 or set(analisis.skor_kriteria.values()) != {72}:
+            gagal.append("skor total harus dihitung lokal dari skor kriteria")
+
+        penilai = PenilaiPrompt(dict(dasar, analisis_mode="paralel", tips_mode="gabung"), cache=cache)
+        durasi, request, analisis = ukur(penilai, prompts, server)
+        print(f"paralel, template perbaikan berubah: p50={statistics.median(durasi):6.1f} ms"
+              f"  request={request / len(prompts):.0f}/prompt  tips={len(analisis.tips_kilat)}")
+        if request != len(prompts):
+            gagal.append("skor kriteria harus diambil dari cache per sub-request")
+
+        penilai = PenilaiPrompt(dict(dasar, analisis_mode="paralel"), cache=cache)
+        mulai = time.perf_counter()
+        analisis = asyncio.run(penilai.analisis_prompt_async("Prompt async baru", pakai_cache=False))
+        print(f"paralel async: {(time.perf_counter() - mulai) * 1000:.1f} ms  skor={analisis.skor}")
+
+    server.shutdown()
+    print("OK" if not gagal else "GAGAL: " + "; ".join(gagal))
+    sys.exit(1 if gagal else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Throughput pra-penilaian lokal (penilai.prescorer) pada korpus prompt sintetis.
+
+    python -m benchmarks.bench_prescorer --jumlah 100000
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import Counter
+
+from penilai.prescorer import pra_analisis
+
+TUGAS = [
+    "Jelaskan konsep blockchain untuk pemula.",
+    "Tulis caption Instagram untuk produk sepatu daur ulang.",
+    "Buat rencana budget liburan 4 hari di Bali.",
+    "Analisis data penjualan kuartal terakhir dan temukan tren utama.",
+    "Buat fungsi Python untuk memvalidasi alamat email.",
+    "Ringkas artikel berikut menjadi poin-poin penting.",
+]
+PERAN = ["Kamu adalah ahli marketing digital.", "Act as a senior data analyst.", "Bertindak sebagai guru SD."]
+CONTOH = "Contoh {n}:\nInput: {a}\nOutput: {b}\n"
+LANGKAH = ["Pikirkan step by step.", "Jelaskan langkah demi langkah.", "Jelaskan alasan di setiap keputusan."]
+OPSI = "Eksplorasi 3 alternatif berbeda:\n1. Opsi pertama\n2. Opsi kedua\n3. Opsi ketiga\n"
+FORMAT = ["Jawab dalam 3 paragraf.", "Gunakan format JSON.", "Sajikan dalam tabel.", "Maksimal 100 kata."]
+KONTEKS = "Latar belakang: perusahaan kami adalah startup edukasi dengan 50 karyawan di Jakarta. " * 3
+
+
+def buat_korpus(jumlah: int, seed: int = 42):
+    rng = random.Random(seed)
+    korpus = []
+    for _ in range(jumlah):
+        bagian = []
+        if rng.random() < 0.4:
+            bagian.append(rng.choice(PERAN))
+        if rng.random() < 0.3:
+            bagian.append(KONTEKS * rng.randint(1, 4))
+        bagian.append(rng.choice(TUGAS))
+        if rng.random() < 0.3:
+            bagian.extend(CONTOH.format(n=i, a=f"contoh {i}", b=f"hasil {i}") for i in range(1, rng.randint(2, 4)))
+        if rng.random() < 0.3:
+            bagian.append(rng.choice(LANGKAH))
+        if rng.random() < 0.2:
+            bagian.append(OPSI)
+        if rng.random() < 0.5:
+            bagian.append(rng.choice(FORMAT))
+        korpus.append("\n\n".join(bagian))
+    return korpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jumlah", type=int, default=100_000)
+    args = parser.parse_args()
+
+    korpus = buat_korpus(args.jumlah)
+    rata_panjang = statistics.mean(len(p) for p in korpus)
+
+    durasi = []
+    teknik = Counter()
+    mulai = time.perf_counter()
+    for prompt in korpus:
+        t0 = time.perf_counter_ns()
+        hasil = pra_analisis(prompt)
+        durasi.append(time.perf_counter_ns() - t0)
+        teknik.update(t.teknik for t in hasil.teknik)
+    total = time.perf_counter() - mulai
+
+    durasi.sort()
+    print(f"korpus: {len(korpus)} prompt, rata-rata {rata_panjang:.0f} karakter")
+    print(f"throughput: {len(korpus) / total:,.0f} prompt/detik")
+    print(
+        f"latency: p50={durasi[len(durasi) // 2] / 1000:.1f} us"
+        f"  p99={durasi[int(len(durasi) * 0.99)] / 1000:.1f} us  max={durasi[-1] / 1000:.1f} us"
+    )
+    print("teknik terdeteksi:", dict(teknik))
+
+
+if __name__ == "__main__":
+    main()
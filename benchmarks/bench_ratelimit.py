@@ -0,0 +1,70 @@
+"""Keadilan antrian penjadwal: satu pengguna berat vs beberapa pengguna ringan.
+
+Pengguna berat mengirim banyak prompt sekaligus, lalu beberapa pengguna
+ringan masing-masing mengirim sedikit prompt sesaat kemudian. Dengan
+antrian round-robin per sesi, pengguna ringan tidak harus menunggu semua
+prompt pengguna berat selesai. Semua panggilan tetap di bawah RPM yang diset.
+
+    python -m benchmarks.bench_ratelimit --rpm 120 --berat 30 --ringan 4
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_openai import jalankan_mock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rpm", type=int, default=120, help="Batas request per menit penjadwal")
+    parser.add_argument("--tpm", type=int, default=0, help="Batas token per menit penjadwal (0 = tanpa batas)")
+    parser.add_argument("--berat", type=int, default=30, help="Jumlah prompt pengguna berat")
+    parser.add_argument("--ringan", type=int, default=4, help="Jumlah pengguna ringan (2 prompt per orang)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latency mock per request (detik)")
+    args = parser.parse_args()
+
+    server, base_url = jalankan_mock(latency=args.latency)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+
+    from penilai import PenilaiPrompt, get_config
+
+    config = dict(get_config(), cache_enabled=False, riwayat_enabled=False,
+                  ratelimit_rpm=args.rpm, ratelimit_tpm=args.tpm)
+    berat = PenilaiPrompt(config, sesi="berat")
+    ringan = [PenilaiPrompt(config, sesi=f"ringan-{i}") for i in range(args.ringan)]
+    # Drain the initial burst allowance so the run measures steady-state scheduling
+    penjadwal = berat.penjadwal
+    for _ in range(int(penjadwal._bucket_request.kapasitas) if penjadwal._bucket_request else 0):
+        penjadwal.minta("pemanasan", 0)
+
+    selesai = {}
+    lock = threading.Lock()
+    mulai = time.perf_counter()
+
+    def evaluasi(penilai, i):
+        penilai.analisis_prompt(f"Prompt {penilai.sesi} #{i}", pakai_cache=False)
+        with lock:
+            selesai.setdefault(penilai.sesi.split("-")[0], []).append(time.perf_counter() - mulai)
+
+    with ThreadPoolExecutor(max_workers=args.berat + 2 * args.ringan) as pool:
+        for i in range(args.berat):
+            pool.submit(evaluasi, berat, i)
+        time.sleep(0.2)
+        for penilai in ringan:
+            for i in range(2):
+                pool.submit(evaluasi, penilai, i)
+    total = time.perf_counter() - mulai
+
+    for nama, waktu in selesai.items():
+        print(f"{nama:<7} n={len(waktu):<3} selesai median={statistics.median(waktu):6.1f} s  max={max(waktu):6.1f} s")
+    print(f"{server.request} request dalam {total:.1f} s = {server.request / total * 60:.0f} rpm (batas {args.rpm})")
+    print(penjadwal.stats())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
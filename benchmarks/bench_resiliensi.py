@@ -0,0 +1,188 @@
+"""Skenario gangguan terhadap mock endpoint yang menyuntikkan error dan latency.
+
+Setiap skenario memeriksa perilaku lapisan resilience dan mencetak OK/GAGAL;
+exit code 1 jika ada yang gagal, jadi bisa dipakai di CI.
+
+1. error 500 acak 30%: retry menaikkan rasio sukses
+2. 429 + Retry-After: retry menunggu sesuai header
+3. error 100%: circuit breaker terbuka, panggilan berikutnya gagal cepat
+   dan memakai hasil cache (atau AnalisisError -> analisis lokal di UI)
+4. latency berekor panjang: hedging di p95 memangkas p99
+
+    python -m benchmarks.bench_resiliensi
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.mock_openai import Latency, jalankan_mock
+
+_gagal = []
+
+
+def periksa(nama: str, kondisi: bool, detail: str) -> None:
+    print(f"  [{'OK' if kondisi else 'GAGAL'}] {nama}: {detail}")
+    if not kondisi:
+        _gagal.append(nama)
+
+
+def persentil(data, p):
+    data = sorted(data)
+    return data[min(int(len(data) * p), len(data) - 1)]
+
+
+def atur_mock(server, latency=0.01, distribusi="tetap", sebaran=0.5, error_rate=0.0, error_status=500, retry_after=1):
+    handler = server.RequestHandlerClass
+    handler.latency = Latency(latency, distribusi, sebaran, seed=7)
+    handler.error_rate = error_rate
+    handler.error_status = error_status
+    handler.retry_after = retry_after
+
+
+def penilai_baru(config, cache=None, **opsi):
+    from penilai import PenilaiPrompt
+    from penilai.ratelimit import PenjadwalAPI
+    from penilai.resilience import PemutusSirkuit, Resilien
+
+    penilai = PenilaiPrompt(config, cache=cache)
+    # Active but generous limits: every attempt and hedge must still pass through the scheduler
+    penilai.penjadwal = PenjadwalAPI(rpm=1_000_000, antrian_maks=0)
+    breaker = PemutusSirkuit(ambang=opsi.pop("ambang", 1.1), minimal=5, jeda=opsi.pop("jeda", 30.0))
+    penilai.resilien = Resilien(breaker=breaker, backoff_dasar=0.05, **opsi)
+    return penilai
+
+
+def rasio_sukses(penilai, n: int) -> float:
+    from penilai import AnalisisError
+
+    sukses = 0
+    for i in range(n):
+        try:
+            penilai.analisis_prompt(f"prompt flaky #{i}", pakai_cache=False)
+            sukses += 1
+        except AnalisisError:
+            pass
+    return sukses / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=60, help="Request per skenario")
+    args = parser.parse_args()
+
+    server, base_url = jalankan_mock(latency=0.01)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+
+    from penilai import AnalisisError, CacheAnalisis, get_config
+
+    config = dict(get_config(), cache_enabled=False, riwayat_enabled=False)
+
+    print("1. error 500 acak 30%")
+    atur_mock(server, error_rate=0.3)
+    tanpa = rasio_sukses(penilai_baru(config, retry_maks=0), args.n)
+    request_awal = server.request
+    penilai = penilai_baru(config, retry_maks=3)
+    dengan = rasio_sukses(penilai, args.n)
+    periksa("retry menaikkan sukses", dengan > tanpa and dengan >= 0.9, f"tanpa retry {tanpa:.0%}, retry 3x {dengan:.0%}")
+    dikirim = server.request - request_awal
+    periksa("tiap retry memakai tiket penjadwal", penilai.penjadwal.diberi == dikirim,
+            f"{dikirim} request ke API, {penilai.penjadwal.diberi} tiket diberi")
+
+    print("2. 429 dengan Retry-After: 1")
+    atur_mock(server, error_rate=0.5, error_status=429, retry_after=1)
+    penilai = penilai_baru(config, retry_maks=5)
+    durasi = []
+    for i in range(6):
+        request_awal = server.request
+        mulai = time.perf_counter()
+        penilai.analisis_prompt(f"prompt 429 #{i}", pakai_cache=False)
+        durasi.append((server.request - request_awal, time.perf_counter() - mulai))
+    diulang = [d for n, d in durasi if n > 1]
+    periksa(
+        "retry menunggu sesuai Retry-After",
+        bool(diulang) and min(diulang) >= 1.0,
+        f"{len(diulang)} evaluasi kena 429, jeda tersingkat {min(diulang) if diulang else 0:.2f} s",
+    )
+
+    print("3. error 100%: circuit breaker")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CacheAnalisis(path=os.path.join(tmp, "cache.sqlite3"))
+        penilai = penilai_baru(config, cache=cache, retry_maks=0, ambang=0.5, jeda=1.0)
+        atur_mock(server)
+        penilai.analisis_prompt("prompt yang pernah dinilai")  # seed the cache while upstream is healthy
+        atur_mock(server, error_rate=1.0)
+        for i in range(5):
+            try:
+                penilai.analisis_prompt(f"prompt rusak #{i}", pakai_cache=False)
+            except AnalisisError:
+                pass
+        status = penilai.resilien.breaker.stats()["status"]
+        periksa("breaker terbuka setelah error melonjak", status == "terbuka", f"status={status}")
+
+        request_awal = server.request
+        mulai = time.perf_counter()
+        try:
+            penilai.analisis_prompt("prompt baru", pakai_cache=False)
+            pesan = "tidak ada error"
+        except AnalisisError as e:
+            pesan = str(e)
+        cepat = time.perf_counter() - mulai
+        periksa(
+            "gagal cepat tanpa request ke API",
+            server.request == request_awal and cepat < 0.05,
+            f"{cepat * 1000:.1f} ms, pesan: {pesan}",
+        )
+        analisis = penilai.analisis_prompt("prompt yang pernah dinilai", pakai_cache=False)
+        periksa("evaluasi ulang memakai cache saat breaker terbuka", analisis.skor == 72 and server.request == request_awal,
+                f"skor={analisis.skor}")
+
+        atur_mock(server)
+        time.sleep(1.1)
+        penilai.analisis_prompt("prompt setelah pulih", pakai_cache=False)
+        status = penilai.resilien.breaker.stats()["status"]
+        periksa("breaker tertutup lagi setelah percobaan sukses", status == "tertutup", f"status={status}")
+
+    print("4. latency berekor panjang (lognormal sigma 1.0): hedging")
+    hasil = {}
+    for hedging in (False, True):
+        atur_mock(server, latency=0.05, distribusi="lognormal", sebaran=1.0)
+        penilai = penilai_baru(config, retry_maks=0, hedging=hedging)
+        request_awal = server.request
+        durasi = []
+        # Enough samples that p99 is not decided by one or two outliers
+        for i in range(args.n * 4):
+            mulai = time.perf_counter()
+            penilai.analisis_prompt(f"prompt lambat #{i}", pakai_cache=False)
+            durasi.append((time.perf_counter() - mulai) * 1000)
+        # The first samples only warm up the p95 tracker
+        durasi = durasi[20:]
+        hasil[hedging] = durasi
+        stats = penilai.resilien.stats()
+        print(
+            f"  hedging={'on ' if hedging else 'off'} p50={statistics.median(durasi):6.1f} ms"
+            f"  p99={persentil(durasi, 0.99):7.1f} ms  hedge dikirim={stats['hedge_dikirim']}"
+            f" menang={stats['hedge_menang']}"
+        )
+    # Losing hedges keep running in their threads; let them land before comparing counts
+    time.sleep(1.0)
+    dikirim = server.request - request_awal
+    periksa("tiap hedge memakai tiket penjadwal", penilai.penjadwal.diberi == dikirim,
+            f"{dikirim} request ke API, {penilai.penjadwal.diberi} tiket diberi")
+    tanpa, dengan = persentil(hasil[False], 0.99), persentil(hasil[True], 0.99)
+    periksa(
+        "hedging memangkas p99 minimal 20%",
+        dengan <= 0.8 * tanpa,
+        f"{tanpa:.0f} ms -> {dengan:.0f} ms ({1 - dengan / tanpa:.0%} lebih cepat)",
+    )
+
+    server.shutdown()
+    print("semua skenario OK" if not _gagal else f"{len(_gagal)} skenario gagal: {', '.join(_gagal)}")
+    sys.exit(1 if _gagal else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Riwayat evaluasi dengan 1 juta baris: insert, konsistensi agregat, dan query dashboard.
+
+Riwayat diisi evaluasi sintetis (skor, jenis tugas, dan teknik acak dengan
+ejaan bervariasi seperti dari model, tersebar di 180 hari) lewat catat_banyak per batch, lalu:
+- agregat inkremental dicocokkan dengan hitung ulang penuh (GROUP BY atas
+  seluruh tabel, yang waktunya juga dilaporkan sebagai pembanding);
+- skenario dashboard (ringkasan + 100 evaluasi terbaru, dengan berbagai
+  filter) diukur dan harus jauh di bawah 1 detik;
+- latency catat() satu evaluasi pada tabel yang sudah berisi 1 juta baris.
+
+    python -m benchmarks.bench_riwayat --n 1000000 --batas-ms 250
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+from penilai.model import AnalisisPrompt, TeknikInfo, TeknikPrompt
+from penilai.riwayat import RiwayatEvaluasi, bitmask_teknik, kelompok_skor, nama_teknik
+
+JENIS_TUGAS = [
+    "creative writing", "Creative Writing", "analisis data", "coding", "ringkasan", "terjemahan",
+    "perencanaan", "tanya jawab", "klasifikasi", "brainstorming", "edukasi", "email bisnis",
+]
+SUMBER = ["model"] * 6 + ["cache"] * 3 + ["mirip", "lokal"]
+
+
+def ejaan_teknik(nama: str) -> List[str]:
+    """Ejaan yang benar-benar dipakai model untuk satu teknik"""
+    return [nama, nama.lower(), nama.replace(" ", "-"), nama.upper().replace(" ", "_"), nama.rstrip("s")]
+
+
+def buat_analisis(acak: random.Random) -> AnalisisPrompt:
+    teknik = acak.sample(list(TeknikPrompt), acak.choice([0, 1, 1, 1, 2]))
+    return AnalisisPrompt(
+        skor=max(0, min(100, int(acak.gauss(68, 15)))),
+        # Zipf-ish: a few task types dominate, like real traffic
+        jenis_tugas=acak.choices(JENIS_TUGAS, [1 / (i + 1) for i in range(len(JENIS_TUGAS))])[0],
+        teknik_sesuai=[],
+        teknik_ditemukan=[TeknikInfo(teknik=acak.choice(ejaan_teknik(t.value)), alasan="") for t in teknik]
+        + [TeknikInfo(teknik="ReAct", alasan="")] * (acak.random() < 0.05),
+        teknik_disarankan=[],
+        kelebihan=[],
+        kekurangan=[],
+        rekomendasi=[],
+        versi_perbaikan="",
+    )
+
+
+def ukur(fungsi, ulang: int = 5) -> float:
+    """Median durasi (ms) dari beberapa kali panggil"""
+    durasi = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        durasi.append((time.perf_counter() - mulai) * 1000)
+    return statistics.median(durasi)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=1_000_000, help="Jumlah evaluasi di riwayat")
+    parser.add_argument("--batch", type=int, default=10_000, help="Evaluasi per transaksi catat_banyak")
+    parser.add_argument("--batas-ms", type=float, default=250.0, help="Batas durasi satu tampilan dashboard")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    acak = random.Random(args.seed)
+    contoh = [buat_analisis(acak) for _ in range(2000)]
+    prompts = [f"Prompt uji nomor {i}: buatkan konten untuk kampanye produk {i % 97} dengan gaya santai." for i in range(500)]
+    direktori = tempfile.mkdtemp(prefix="bench-riwayat-")
+    riwayat = RiwayatEvaluasi(os.path.join(direktori, "riwayat.sqlite3"))
+    awal = time.time() - 180 * 86400
+    langkah = 180 * 86400 / args.n
+
+    mulai = time.perf_counter()
+    for awal_batch in range(0, args.n, args.batch):
+        riwayat.catat_banyak(
+            (acak.choice(prompts), acak.choice(contoh), acak.choice(SUMBER), awal + i * langkah)
+            for i in range(awal_batch, min(args.n, awal_batch + args.batch))
+        )
+    detik = time.perf_counter() - mulai
+    ukuran = sum(os.path.getsize(os.path.join(direktori, f)) for f in os.listdir(direktori)) / 2 ** 20
+    print(f"insert {len(riwayat):,} evaluasi: {detik:.1f} s ({args.n / detik:,.0f} baris/s), file {ukuran:.0f} MB")
+
+    gagal = []
+    db = riwayat._db()
+    mulai = time.perf_counter()
+    total, total_skor = db.execute("SELECT COUNT(*), SUM(skor) FROM evaluasi").fetchone()
+    per_jenis = dict(db.execute("SELECT jenis_tugas, COUNT(*) FROM evaluasi GROUP BY jenis_tugas").fetchall())
+    per_skor = dict(db.execute("SELECT skor, COUNT(*) FROM evaluasi GROUP BY skor").fetchall())
+    per_teknik = dict(db.execute("SELECT teknik, COUNT(*) FROM evaluasi GROUP BY teknik").fetchall())
+    print(f"hitung ulang agregat dari tabel penuh: {(time.perf_counter() - mulai) * 1000:.0f} ms")
+
+    ringkasan = riwayat.ringkasan()
+    distribusi = [0] * 10
+    for skor, jumlah in per_skor.items():
+        distribusi[kelompok_skor(skor)] += jumlah
+    teknik = {}
+    for bitmask, jumlah in per_teknik.items():
+        for nama in nama_teknik(bitmask) or ("-",):
+            teknik[nama] = teknik.get(nama, 0) + jumlah
+    if (
+        ringkasan["total"] != total
+        or ringkasan["rata_skor"] != round(total_skor / total, 1)
+        or list(ringkasan["distribusi_skor"].values()) != distribusi
+        or {j["nama"]: j["jumlah"] for j in ringkasan["jenis_tugas"]} != per_jenis
+        or {t["nama"]: t["jumlah"] for t in ringkasan["teknik"]} != teknik
+        or sum(ringkasan["per_hari"].values()) > total
+    ):
+        gagal.append("agregat inkremental tidak sama dengan hitung ulang penuh")
+    else:
+        print(f"agregat inkremental cocok: total={total:,} rata={ringkasan['rata_skor']} "
+              f"jenis={len(per_jenis)} (\"creative writing\" digabung: {per_jenis.get('creative writing', 0):,})")
+
+    # Spelling variants from the model land on the canonical technique; unknown names are counted, not dropped
+    salah = [a for a in contoh if len(nama_teknik(bitmask_teknik(a))) != len(a.teknik_ditemukan)]
+    if salah or not any(t["nama"] == "Lainnya" for t in ringkasan["teknik"]):
+        gagal.append(f"ejaan teknik tidak dinormalisasi ({len(salah)} analisis)")
+
+    terakhir = riwayat.daftar(batas=1)[0]
+    skenario = {
+        "ringkasan + 100 terbaru": lambda: (riwayat.ringkasan(), riwayat.daftar(100)),
+        "per jenis tugas": lambda: (riwayat.ringkasan("coding"), riwayat.daftar(100, jenis_tugas="coding")),
+        "skor 90-100": lambda: riwayat.daftar(100, skor_min=90),
+        "skor < 20 (jarang)": lambda: riwayat.daftar(100, skor_maks=19),
+        "jenis jarang + skor 40-60": lambda: riwayat.daftar(100, jenis_tugas="email bisnis", skor_min=40, skor_maks=60),
+        "7 hari terakhir": lambda: riwayat.daftar(100, sejak=time.time() - 7 * 86400),
+        "rentang waktu lama": lambda: riwayat.daftar(100, sejak=awal, sampai=awal + 86400),
+        "halaman dalam (keyset)": lambda: riwayat.daftar(100, sebelum_id=terakhir.id - args.n // 2),
+    }
+    for nama, fungsi in skenario.items():
+        durasi = ukur(fungsi)
+        print(f"  {nama:<26} {durasi:7.2f} ms")
+        if durasi > args.batas_ms:
+            gagal.append(f"{nama} {durasi:.0f} ms melebihi {args.batas_ms:.0f} ms")
+
+    durasi = []
+    for _ in range(500):
+        mulai = time.perf_counter()
+        riwayat.catat(acak.choice(prompts), acak.choice(contoh), "model")
+        durasi.append((time.perf_counter() - mulai) * 1000)
+    p99 = sorted(durasi)[int(len(durasi) * 0.99)]
+    print(f"catat() satu evaluasi: p50={statistics.median(durasi):.2f} ms  p99={p99:.2f} ms")
+    if len(riwayat) != args.n + 500:
+        gagal.append("jumlah di agregat tidak sama dengan jumlah insert")
+
+    for nama in os.listdir(direktori):
+        os.remove(os.path.join(direktori, nama))
+    os.rmdir(direktori)
+    print("OK" if not gagal else "GAGAL: " + "; ".join(gagal))
+    sys.exit(1 if gagal else 0)
+
+
+if __name__ == "__main__":
+    main()
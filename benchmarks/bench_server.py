@@ -0,0 +1,142 @@
+"""Uji beban layanan HTTP (penilai.server) terhadap mock endpoint.
+
+Layanan dan client beban jalan di satu event loop, mock di thread
+terpisah. Dilaporkan throughput dan latency pada beberapa jumlah worker
+dengan concurrency client tetap (throughput harus naik seiring worker),
+lalu dicek backpressure (antrian kecil dibanjiri: sebagian request ditolak
+429 beserta kedalaman antrian, sisanya sukses), /healthz, dan graceful
+shutdown (request yang sudah diterima tetap selesai 200, request baru
+ditolak).
+
+    python -m benchmarks.bench_server --latency 0.1 --worker 1,4,16 --concurrency 32 --requests 96
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+from benchmarks.mock_openai import jalankan_mock
+
+
+def persentil(data, p):
+    data = sorted(data)
+    return data[min(int(len(data) * p), len(data) - 1)]
+
+
+async def kirim(client: httpx.AsyncClient, url: str, prompt: str):
+    mulai = time.perf_counter()
+    respons = await client.post(url + "/v1/analisis", json={"prompt": prompt, "pakai_cache": False})
+    return respons, time.perf_counter() - mulai
+
+
+async def banjiri(url: str, jumlah: int, concurrency: int, label: str):
+    """Kirim `jumlah` request unik dengan paling banyak `concurrency` sekaligus"""
+    batas = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+
+        async def satu(i):
+            async with batas:
+                return await kirim(client, url, f"Buatkan caption produk kopi susu gula aren ({label} #{i})")
+
+        mulai = time.perf_counter()
+        hasil = await asyncio.gather(*(satu(i) for i in range(jumlah)))
+        return hasil, time.perf_counter() - mulai
+
+
+async def jalankan(args, penilai):
+    from penilai.server import LayananPenilai
+
+    async def layanan_baru(worker, antrian_maks):
+        layanan = LayananPenilai(penilai, worker=worker, antrian_maks=antrian_maks)
+        server = await layanan.mulai("127.0.0.1", 0)
+        return layanan, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+    gagal = []
+    throughput = {}
+    print(f"concurrency client {args.concurrency}, {args.requests} request per level")
+    for worker in [int(w) for w in args.worker.split(",")]:
+        layanan, url = await layanan_baru(worker, antrian_maks=args.requests)
+        hasil, durasi = await banjiri(url, args.requests, args.concurrency, f"w{worker}")
+        await layanan.berhenti(5)
+        latency = [d * 1000 for r, d in hasil if r.status_code == 200]
+        error = sum(r.status_code != 200 for r, _ in hasil)
+        throughput[worker] = len(latency) / durasi
+        print(f"  worker={worker:<3} {throughput[worker]:7.1f} req/s  p50={statistics.median(latency):7.1f} ms"
+              f"  p99={persentil(latency, 0.99):7.1f} ms  error={error}")
+        if error:
+            gagal.append(f"{error} request gagal pada worker={worker}")
+    terkecil, terbesar = min(throughput), max(throughput)
+    skala = throughput[terbesar] / throughput[terkecil]
+    print(f"skala throughput worker {terkecil} -> {terbesar}: {skala:.1f}x")
+    if skala < min(terbesar / terkecil, args.concurrency / terkecil) * 0.5:
+        gagal.append("throughput harus naik seiring jumlah worker")
+
+    # Backpressure: a small queue flooded well past its capacity
+    layanan, url = await layanan_baru(worker=2, antrian_maks=4)
+    hasil, _ = await banjiri(url, 40, 40, "banjir")
+    status = [r.status_code for r, _ in hasil]
+    ditolak = [r for r, _ in hasil if r.status_code == 429]
+    print(f"banjir 40 request ke 2 worker + antrian 4: 200={status.count(200)} 429={len(ditolak)}"
+          f" lain={len(status) - status.count(200) - len(ditolak)}")
+    if not ditolak or status.count(200) < 4 or status.count(200) + len(ditolak) != len(status):
+        gagal.append("antrian penuh harus ditolak 429 dan sisanya sukses")
+    elif not all("antrian" in r.json() and "Retry-After" in r.headers for r in ditolak):
+        gagal.append("respons 429 harus memuat kedalaman antrian dan Retry-After")
+    else:
+        print(f"  contoh 429: {ditolak[0].json()}  Retry-After={ditolak[0].headers['Retry-After']}")
+
+    async with httpx.AsyncClient() as client:
+        sehat = await client.get(url + "/healthz")
+        print(f"/healthz: {sehat.status_code} {sehat.json()}")
+        if sehat.status_code != 200 or sehat.json().get("status") != "ok":
+            gagal.append("/healthz harus 200 saat server berjalan")
+
+        # Graceful shutdown while 6 requests are queued or running on 2 workers
+        berjalan = [asyncio.ensure_future(kirim(client, url, f"Prompt saat shutdown #{i}")) for i in range(6)]
+        await asyncio.sleep(args.latency / 2)
+        mulai = time.perf_counter()
+        await layanan.berhenti(10)
+        selesai = [r.status_code for r, _ in await asyncio.gather(*berjalan)]
+        print(f"shutdown dengan 6 request diterima: {selesai} ({(time.perf_counter() - mulai) * 1000:.0f} ms)")
+        if selesai != [200] * 6:
+            gagal.append("request yang sudah diterima harus selesai saat shutdown")
+        try:
+            setelah = (await client.get(url + "/healthz")).status_code
+        except httpx.TransportError:
+            setelah = "ditolak"
+        print(f"request setelah shutdown: {setelah}")
+        if setelah == 200:
+            gagal.append("server yang sudah berhenti tidak boleh menerima request")
+    return gagal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.1, help="Latency mock per request (detik)")
+    parser.add_argument("--worker", default="1,4,16", help="Daftar jumlah worker, dipisah koma")
+    parser.add_argument("--concurrency", type=int, default=32, help="Request client yang berjalan bersamaan")
+    parser.add_argument("--requests", type=int, default=96, help="Jumlah request per level")
+    args = parser.parse_args()
+
+    server, base_url = jalankan_mock(latency=args.latency)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+
+    from penilai import PenilaiPrompt, get_config
+
+    config = dict(get_config(), cache_enabled=False, riwayat_enabled=False, mirip_enabled=False, metrics_enabled=False,
+                  retry_maks=0)
+    gagal = asyncio.run(jalankan(args, PenilaiPrompt(config, sesi="bench-server")))
+
+    server.shutdown()
+    print("OK" if not gagal else "GAGAL: " + "; ".join(gagal))
+    sys.exit(1 if gagal else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Simulasi satu kelas workshop menekan tombol sample yang sama secara bersamaan.
+
+N thread memanggil analisis_prompt untuk prompt identik (tanpa cache),
+lalu dihitung berapa request yang benar-benar sampai ke mock endpoint.
+Skenario kedua membuat semua request gagal untuk memastikan error sampai
+ke setiap penunggu.
+
+    python -m benchmarks.bench_singleflight --pengguna 50 --latency 0.5
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_openai import jalankan_mock
+
+PROMPT_SAMPLE = "Jelaskan konsep blockchain dalam 3 paragraf untuk pemula."
+
+
+def serbu(penilai, pengguna: int, server) -> None:
+    from penilai import AnalisisError, statistik_singleflight
+
+    request_awal = server.request
+    hemat_awal = statistik_singleflight()["panggilan_dihemat"]
+    mulai_bersamaan = threading.Barrier(pengguna)
+
+    def satu(_):
+        mulai_bersamaan.wait()
+        try:
+            return penilai.analisis_prompt(PROMPT_SAMPLE, pakai_cache=False).skor
+        except AnalisisError as e:
+            return type(e).__name__
+
+    mulai = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=pengguna) as pool:
+        hasil = list(pool.map(satu, range(pengguna)))
+    durasi = time.perf_counter() - mulai
+
+    print(
+        f"  {pengguna} pemanggil -> {server.request - request_awal} request ke API"
+        f"  (dihemat {statistik_singleflight()['panggilan_dihemat'] - hemat_awal})"
+        f"  hasil={sorted(set(map(str, hasil)))}  {durasi * 1000:.0f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pengguna", type=int, default=50, help="Jumlah pemanggil bersamaan")
+    parser.add_argument("--latency", type=float, default=0.5, help="Latency mock per request (detik)")
+    args = parser.parse_args()
+
+    server, base_url = jalankan_mock(latency=args.latency)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+
+    from penilai import PenilaiPrompt, get_config
+
+    penilai = PenilaiPrompt(dict(get_config(), cache_enabled=False, riwayat_enabled=False, retry_maks=0))
+
+    print("semua sukses:")
+    serbu(penilai, args.pengguna, server)
+
+    print("semua gagal (error_rate=100%):")
+    server.RequestHandlerClass.error_rate = 1.0
+    serbu(penilai, args.pengguna, server)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Bandingkan latency evaluasi dua panggilan (analisis lalu tips) vs mode "gabung".
+
+Memakai endpoint dari konfigurasi biasa; set OPENAI_BASE_URL untuk menunjuk ke
+mock server lokal supaya tidak membayar panggilan GPT-4 sungguhan.
+
+    python -m benchmarks.bench_tips --runs 5
+"""
+import argparse
+import statistics
+import time
+
+from penilai import PenilaiPrompt, get_config
+
+PROMPT_UJI = [
+    "Jelaskan konsep blockchain dalam 3 paragraf untuk pemula.",
+    "Buatkan caption Instagram untuk sepatu sneakers dari bahan daur ulang.",
+    "Saya punya budget Rp 5.000.000 untuk liburan 4 hari di Bali. Pikirkan step by step.",
+]
+
+
+def ukur_flow(penilai: PenilaiPrompt, prompt: str) -> float:
+    mulai = time.perf_counter()
+    analisis = penilai.analisis_prompt(prompt, pakai_cache=False)
+    penilai.tips_kilat(analisis, prompt)
+    return time.perf_counter() - mulai
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3, help="Pengulangan per prompt uji")
+    args = parser.parse_args()
+
+    hasil = {}
+    for mode in ("terpisah", "gabung"):
+        config = dict(get_config(), tips_mode=mode, riwayat_enabled=False)
+        penilai = PenilaiPrompt(config)
+        durasi = [ukur_flow(penilai, p) for _ in range(args.runs) for p in PROMPT_UJI]
+        hasil[mode] = durasi
+        print(
+            f"{mode:<10} n={len(durasi):<3} median={statistics.median(durasi) * 1000:8.1f} ms"
+            f"  mean={statistics.mean(durasi) * 1000:8.1f} ms  max={max(durasi) * 1000:8.1f} ms"
+        )
+
+    hemat = 1 - statistics.median(hasil["gabung"]) / statistics.median(hasil["terpisah"])
+    print(f"mode gabung memangkas median latency {hemat:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""Mock endpoint chat completions lokal untuk benchmark tanpa akses jaringan.
+
+Menjawab POST /v1/chat/completions dengan JSON kalengan yang cocok dengan
+skema AnalisisPrompt (atau daftar tips untuk request tanpa response_format).
+Latency diambil dari distribusi yang bisa diatur, sebagian request bisa
+dibuat gagal (500/429/503), dan request `stream=True` dijawab sebagai SSE.
+Untuk benchmark cascade, skor bisa diturunkan dari isi prompt dan tiap
+model bisa diberi faktor latency dan rasio JSON rusak sendiri. Waktu
+generate bisa dibuat sebanding jumlah token keluaran (`max_tokens`, atau
+`token_keluaran` untuk request tanpa batas) dan token masukan, dan request
+yang melebihi `konteks_maks` ditolak 400 seperti context_length_exceeded.
+
+    python -m benchmarks.mock_openai --port 8765 --latency 0.8 --distribusi lognormal --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=sk-mock python -m benchmarks.bench_client
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+HASIL_ANALISIS = {
+    "skor": 72,
+    "jenis_tugas": "creative writing",
+    "teknik_sesuai": ["Few-Shot"],
+    "teknik_ditemukan": [{"teknik": "Zero-Shot", "alasan": "Tidak ada contoh dalam prompt"}],
+    "teknik_disarankan": [{"teknik": "Few-Shot", "alasan": "Tambahkan 1-2 contoh format output"}],
+    "kelebihan": ["Tujuan prompt jelas"],
+    "kekurangan": ["Target audience belum disebutkan"],
+    "rekomendasi": ["Sebutkan target audience", "Tentukan format output"],
+    "versi_perbaikan": "Kamu adalah copywriter. Buat caption Instagram untuk ...",
+}
+TIPS = "🎯 Sebutkan target audience secara spesifik\n📝 Tentukan format output yang diinginkan\n📋 Tambahkan 1-2 contoh"
+
+DISTRIBUSI = ("tetap", "uniform", "lognormal", "pareto")
+
+
+class Latency:
+    """Sampler latency (detik) dengan median `median`
+
+    - tetap: selalu `median`
+    - uniform: seragam di [median * (1 - sebaran), median * (1 + sebaran)]
+    - lognormal: median `median`, sigma `sebaran`; ekor kanan panjang seperti API LLM
+    - pareto: minimal `median / 2`, alpha `1 / sebaran`; ekor sangat berat
+    """
+
+    def __init__(self, median: float = 0.05, distribusi: str = "tetap", sebaran: float = 0.5, seed: Optional[int] = None):
+        if distribusi not in DISTRIBUSI:
+            raise ValueError(f"distribusi harus salah satu dari {DISTRIBUSI}, bukan {distribusi!r}")
+        self.median = median
+        self.distribusi = distribusi
+        self.sebaran = sebaran
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sampel(self) -> float:
+        with self._lock:
+            if self.distribusi == "uniform":
+                return self._random.uniform(self.median * (1 - self.sebaran), self.median * (1 + self.sebaran))
+            if self.distribusi == "lognormal":
+                return self._random.lognormvariate(math.log(self.median), self.sebaran) if self.median > 0 else 0.0
+            if self.distribusi == "pareto":
+                return self.median / 2 * self._random.paretovariate(1 / self.sebaran)
+            return self.median
+
+    def gagal(self, rate: float) -> bool:
+        with self._lock:
+            return self._random.random() < rate
+
+
+class HandlerMock(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+    disable_nagle_algorithm = True  # small SSE chunks otherwise stall on delayed ACKs
+    latency = Latency()
+    error_rate = 0.0
+    error_status = 500
+    retry_after = 1
+    chunk_karakter = 16
+    # Per-model knobs: {"gpt-4o-mini": 0.3} scales latency / breaks that share of JSON answers
+    faktor_latency: dict = {}
+    json_rusak: dict = {}
+    # Derive the score from the prompt text so different prompts land in different bands
+    skor_acak = False
+    # Generation time per output token; requests without max_tokens are assumed to write token_keluaran
+    detik_per_token = 0.0
+    token_keluaran = 1500
+    # Tokens a complete answer needs: a smaller max_tokens cuts the text and finishes with "length" (0 = never)
+    token_jawaban = 0
+    # Prompt processing time per input token, and the context window (0 = unlimited)
+    detik_per_token_masuk = 0.0
+    konteks_maks = 0
+    # Rough chars-per-token the mock uses to size incoming messages
+    karakter_per_token = 4
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        self.server.catat("request")
+        model = body.get("model", "mock")
+        token_masuk = sum(len(pesan["content"]) for pesan in body["messages"]) // self.karakter_per_token
+        self.server.catat_masuk(token_masuk)
+        token_keluar = body.get("max_tokens") or self.token_keluaran
+        if self.konteks_maks and token_masuk + (body.get("max_tokens") or 0) > self.konteks_maks:
+            self.server.catat("error")
+            self._kirim_json(400, {"error": {
+                "message": f"mock: {token_masuk} input tokens exceed the context window of {self.konteks_maks}",
+                "type": "invalid_request_error", "code": "context_length_exceeded",
+            }})
+            return
+        generate = self.detik_per_token * token_keluar + self.detik_per_token_masuk * token_masuk
+        time.sleep((self.latency.sampel() + generate) * self.faktor_latency.get(model, 1.0))
+        if self.error_rate and self.latency.gagal(self.error_rate):
+            self.server.catat("error")
+            headers = {"Retry-After": str(self.retry_after)} if self.error_status in (429, 503) else None
+            self._kirim_json(self.error_status, {
+                "error": {"message": "mock: injected failure", "type": "server_error", "code": None}
+            }, headers)
+            return
+        if body.get("stream"):
+            self._kirim_stream(body)
+        else:
+            self._kirim_json(200, self._completion(body))
+
+    def _konten(self, body: dict) -> str:
+        if body.get("response_format", {}).get("type") == "json_object":
+            hasil = dict(HASIL_ANALISIS)
+            if "tips_kilat" in body["messages"][-1]["content"]:
+                hasil["tips_kilat"] = TIPS.split("\n")
+            if self.skor_acak:
+                ringkas = hashlib.sha256(body["messages"][-1]["content"].encode("utf-8")).digest()
+                hasil["skor"] = 30 + ringkas[0] % 69
+            rusak = self.json_rusak.get(body.get("model", "mock"), 0.0)
+            if rusak and self.latency.gagal(rusak):
+                return json.dumps(hasil, ensure_ascii=False)[:-40]
+            return json.dumps(hasil, ensure_ascii=False)
+        return TIPS
+
+    def _potong(self, body: dict, konten: str) -> Tuple[str, str]:
+        """(konten, finish_reason) setelah dipotong max_tokens, seperti model asli yang kehabisan token"""
+        max_tokens = body.get("max_tokens")
+        if not self.token_jawaban or not max_tokens or max_tokens >= self.token_jawaban:
+            return konten, "stop"
+        self.server.catat("terpotong")
+        return konten[:len(konten) * max_tokens // self.token_jawaban], "length"
+
+    def _completion(self, body: dict) -> dict:
+        konten, finish_reason = self._potong(body, self._konten(body))
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": finish_reason,
+                "message": {"role": "assistant", "content": konten},
+            }],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 400, "total_tokens": 1400},
+        }
+
+    def _kirim_stream(self, body: dict):
+        konten, finish_reason = self._potong(body, self._konten(body))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(data: dict):
+            baris = f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(baris):x}\r\n".encode() + baris + b"\r\n")
+
+        dasar = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                 "model": body.get("model", "mock")}
+        for i in range(0, len(konten), self.chunk_karakter):
+            chunk({**dasar, "choices": [{"index": 0, "delta": {"content": konten[i:i + self.chunk_karakter]},
+                                         "finish_reason": None}]})
+        chunk({**dasar, "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]})
+        if body.get("stream_options", {}).get("include_usage"):
+            chunk({**dasar, "choices": [],
+                   "usage": {"prompt_tokens": 1000, "completion_tokens": 400, "total_tokens": 1400}})
+        akhir = b"data: [DONE]\n\n"
+        self.wfile.write(f"{len(akhir):x}\r\n".encode() + akhir + b"\r\n0\r\n\r\n")
+
+    def _kirim_json(self, status: int, data: dict, headers: dict = None):
+        out = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        for nama, nilai in (headers or {}).items():
+            self.send_header(nama, nilai)
+        self.end_headers()
+        self.wfile.write(out)
+
+
+class ServerMock(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    koneksi = 0  # TCP connections accepted, to compare pooling strategies from the server side
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self.request = 0
+        self.error = 0
+        self.terpotong = 0
+        self.token_masuk_maks = 0
+
+    def get_request(self):
+        self.koneksi += 1
+        return super().get_request()
+
+    def catat(self, nama: str) -> None:
+        with self._lock:
+            setattr(self, nama, getattr(self, nama) + 1)
+
+    def catat_masuk(self, token: int) -> None:
+        with self._lock:
+            self.token_masuk_maks = max(self.token_masuk_maks, token)
+
+
+def jalankan_mock(
+    port: int = 0,
+    latency: float = 0.05,
+    distribusi: str = "tetap",
+    sebaran: float = 0.5,
+    error_rate: float = 0.0,
+    error_status: int = 500,
+    seed: Optional[int] = None,
+) -> Tuple[ServerMock, str]:
+    """Start mock server di thread background; kembalikan (server, base_url)"""
+    handler = type("HandlerMockTerkonfigurasi", (HandlerMock,), {
+        "latency": Latency(latency, distribusi, sebaran, seed),
+        "error_rate": error_rate,
+        "error_status": error_status,
+    })
+    server = ServerMock(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def tambah_argumen_mock(parser: argparse.ArgumentParser) -> None:
+    """Opsi mock yang sama untuk server mandiri dan skrip benchmark"""
+    parser.add_argument("--latency", type=float, default=0.05, help="Median latency per request (detik)")
+    parser.add_argument("--distribusi", choices=DISTRIBUSI, default="tetap", help="Distribusi latency")
+    parser.add_argument("--sebaran", type=float, default=0.5,
+                        help="Sebaran distribusi (sigma lognormal, lebar relatif uniform, 1/alpha pareto)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraksi request yang digagalkan (0-1)")
+    parser.add_argument("--error-status", type=int, default=500, help="Status HTTP untuk request yang gagal")
+    parser.add_argument("--seed", type=int, default=None, help="Seed RNG supaya hasil bisa diulang")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    tambah_argumen_mock(parser)
+    args = parser.parse_args()
+    server, base_url = jalankan_mock(
+        args.port, args.latency, args.distribusi, args.sebaran, args.error_rate, args.error_status, args.seed
+    )
+    print(f"Mock OpenAI berjalan di {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
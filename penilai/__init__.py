@@ -0,0 +1,105 @@
+"""Komponen inti Penilai Prompt Engineering yang tidak bergantung pada Streamlit.
+
+Modul ini aman di-import dari worker, batch job, atau test; dependensi berat
+(openai) baru di-import saat PenilaiPrompt dibuat.
+"""
+
+from penilai.anggaran import KeputusanAnggaran
+from penilai.cache import CacheAnalisis, buat_kunci_cache, normalisasi_prompt
+from penilai.cascade import statistik_cascade
+from penilai.client import get_async_client, get_client, statistik_koneksi
+from penilai.config import get_config
+from penilai.contoh import (
+    CONTOH_PROMPT,
+    HasilContoh,
+    KoleksiContoh,
+    get_koleksi_contoh,
+    nama_contoh,
+)
+from penilai.core import (
+    AnalisisError,
+    PenilaiPrompt,
+    generate_tips_kilat,
+    get_cache,
+    parse_tips,
+    tips_default,
+)
+from penilai.metrics import metrik_aktif, registry
+from penilai.mirip import IndeksMirip, PromptMirip
+from penilai.model import AnalisisPrompt, TeknikInfo, TeknikPrompt, analisis_dari_dict
+from penilai.prescorer import PraAnalisis, analisis_lokal, pra_analisis, tips_lokal
+from penilai.ratelimit import AntrianError, PenjadwalAPI, get_penjadwal
+from penilai.resilience import Resilien, SirkuitTerbuka, get_resilien
+from penilai.riwayat import EntriRiwayat, RiwayatEvaluasi, get_riwayat
+from penilai.singleflight import statistik_singleflight
+from penilai.streaming import ParserJSONBertahap
+from penilai.templates import (
+    KRITERIA,
+    SYSTEM_ANALISIS,
+    SYSTEM_TIPS,
+    TEMPLATE_ANALISIS,
+    TEMPLATE_ANALISIS_GABUNG,
+    TEMPLATE_KRITERIA,
+    TEMPLATE_PERBAIKAN,
+    TEMPLATE_PERBAIKAN_GABUNG,
+    TEMPLATE_TIPS,
+    buat_prompt_analisis,
+    buat_prompt_tips,
+)
+
+__all__ = [
+    "AnalisisError",
+    "AnalisisPrompt",
+    "AntrianError",
+    "CONTOH_PROMPT",
+    "CacheAnalisis",
+    "EntriRiwayat",
+    "HasilContoh",
+    "IndeksMirip",
+    "KRITERIA",
+    "KeputusanAnggaran",
+    "KoleksiContoh",
+    "ParserJSONBertahap",
+    "PenilaiPrompt",
+    "PenjadwalAPI",
+    "PraAnalisis",
+    "PromptMirip",
+    "Resilien",
+    "RiwayatEvaluasi",
+    "SYSTEM_ANALISIS",
+    "SYSTEM_TIPS",
+    "SirkuitTerbuka",
+    "TEMPLATE_ANALISIS",
+    "TEMPLATE_ANALISIS_GABUNG",
+    "TEMPLATE_KRITERIA",
+    "TEMPLATE_PERBAIKAN",
+    "TEMPLATE_PERBAIKAN_GABUNG",
+    "TEMPLATE_TIPS",
+    "TeknikInfo",
+    "TeknikPrompt",
+    "analisis_dari_dict",
+    "analisis_lokal",
+    "buat_kunci_cache",
+    "buat_prompt_analisis",
+    "buat_prompt_tips",
+    "generate_tips_kilat",
+    "get_async_client",
+    "get_cache",
+    "get_client",
+    "get_config",
+    "get_koleksi_contoh",
+    "get_penjadwal",
+    "get_resilien",
+    "get_riwayat",
+    "metrik_aktif",
+    "nama_contoh",
+    "normalisasi_prompt",
+    "parse_tips",
+    "pra_analisis",
+    "registry",
+    "statistik_cascade",
+    "statistik_koneksi",
+    "statistik_singleflight",
+    "tips_default",
+    "tips_lokal",
+]
@@ -0,0 +1,5 @@
+import sys
+
+from penilai.cli import main
+
+sys.exit(main())
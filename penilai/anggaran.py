@@ -0,0 +1,222 @@
+"""Anggaran token request analisis: hitung lokal, pangkas prompt panjang, batasi keluaran.
+
+Token dihitung dengan tiktoken bila terpasang (`pip install "prompt-scorer[token]"`),
+selain itu dengan perkiraan panjang karakter yang sama dengan penjadwal
+(penilai.ratelimit). Kalau request lengkap (system + template + prompt)
+melebihi anggaran input, prompt dipangkas per bagian (paragraf atau heading
+markdown): bagian awal dan akhir dipertahankan utuh karena di situ biasanya
+ada instruksi dan format keluaran, bagian tengah diringkas jadi kalimat
+pertamanya, dan sisanya dihapus dengan penanda. max_tokens analisis
+diturunkan dari panjang prompt yang dikirim (versi perbaikan kira-kira
+sepanjang prompt), dibatasi anggaran keluaran supaya latency terbatas, dan
+tidak pernah melebihi sisa jendela konteks model setelah request; jawaban
+yang tetap terpotong diulang sekali oleh PenilaiPrompt.
+"""
+import functools
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from penilai.ratelimit import perkiraan_token
+
+# Analysis JSON without the rewrite: scores, techniques, 3-4 items per list
+TOKEN_KELUARAN_DASAR = 1500
+# The rewrite restates the prompt with added structure
+RASIO_PERBAIKAN = 1.3
+# Context windows by model-name prefix, most specific first
+_KONTEKS_MODEL = (
+    ("gpt-4.1", 1_047_576),
+    ("gpt-4o", 128_000),
+    ("gpt-4-turbo", 128_000),
+    ("gpt-4-1106", 128_000),
+    ("gpt-4-0125", 128_000),
+    ("gpt-4-32k", 32_768),
+    ("gpt-4", 8_192),
+    ("gpt-3.5-turbo", 16_385),
+    ("o1-mini", 128_000),
+    ("o1", 200_000),
+    ("o3", 200_000),
+    ("o4", 200_000),
+)
+# Unknown models (proxies, local servers) get the smallest common window
+KONTEKS_DEFAULT = 8_192
+# Chat format overhead per message plus reply priming
+_TOKEN_PER_PESAN = 4
+_TOKEN_BALASAN = 3
+# Share of the input budget for sections kept whole; the rest is for one-line summaries
+_PORSI_UTUH = 0.8
+_PANJANG_RINGKASAN = 120
+_PENANDA_HAPUS = "[... bagian dihapus karena melebihi anggaran token ...]"
+
+_BATAS_BAGIAN = re.compile(r"\n[ \t]*\n\s*|\n(?=#{1,6}\s)")
+_AKHIR_KALIMAT = re.compile(r"(?<=[.!?:])\s")
+
+_lock = threading.Lock()
+_penghitung: Dict[str, Tuple[Callable[[str], int], str]] = {}
+
+
+def penghitung_token(model: str) -> Tuple[Callable[[str], int], str]:
+    """(fungsi hitung token, "tiktoken" | "perkiraan") untuk model ini"""
+    with _lock:
+        if model not in _penghitung:
+            try:
+                import tiktoken
+
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("cl100k_base")
+                _penghitung[model] = (lambda teks: len(encoding.encode(teks, disallowed_special=()))), "tiktoken"
+            except Exception:
+                # Not installed, or the BPE file cannot be fetched (offline): estimate from length
+                _penghitung[model] = perkiraan_token, "perkiraan"
+        return _penghitung[model]
+
+
+def konteks_model(model: str, konteks: int = 0) -> int:
+    """Jendela konteks model dalam token; `konteks` > 0 (ANGGARAN_KONTEKS) menimpa tabel"""
+    if konteks > 0:
+        return konteks
+    return next((jumlah for awalan, jumlah in _KONTEKS_MODEL if model.startswith(awalan)), KONTEKS_DEFAULT)
+
+
+def token_request_tetap(hitung: Callable[[str], int], *teks: str) -> int:
+    """Token request di luar prompt pengguna: pesan system/template plus overhead format chat"""
+    return sum(hitung(t) for t in teks) + _TOKEN_PER_PESAN * len(teks) + _TOKEN_BALASAN
+
+
+def max_token_keluaran(
+    token_prompt: int, batas: int, dasar: int = TOKEN_KELUARAN_DASAR, sisa_konteks: Optional[int] = None
+) -> int:
+    """max_tokens untuk jawaban yang memuat versi perbaikan prompt; 0 berarti tanpa batas
+
+    `sisa_konteks` (jendela konteks dikurangi token request) membatasi hasil
+    supaya request plus jawaban tetap muat di model.
+    """
+    if batas <= 0:
+        return 0
+    maks = min(batas, dasar + int(token_prompt * RASIO_PERBAIKAN))
+    if sisa_konteks is not None:
+        maks = max(1, min(maks, sisa_konteks))
+    return maks
+
+
+# Frozen: instances are memoized and shared between callers
+@dataclass(frozen=True)
+class KeputusanAnggaran:
+    # Text that is actually sent to the model
+    prompt: str
+    token_prompt: int
+    token_dikirim: int
+    # Whole request (system + template + sent prompt)
+    token_request: int
+    anggaran: int
+    max_tokens: int
+    konteks: int = 0
+    bagian_diringkas: int = 0
+    bagian_dihapus: int = 0
+    penghitung: str = "perkiraan"
+
+    @property
+    def dipangkas(self) -> bool:
+        return self.token_dikirim < self.token_prompt
+
+
+def _ringkas(bagian: str) -> str:
+    kalimat = _AKHIR_KALIMAT.split(bagian.strip().splitlines()[0], maxsplit=1)[0]
+    if len(kalimat) > _PANJANG_RINGKASAN:
+        kalimat = kalimat[:_PANJANG_RINGKASAN].rstrip() + "…"
+    return f"[ringkasan bagian: {kalimat}]"
+
+
+def _potong(teks: str, anggaran: int, hitung: Callable[[str], int]) -> str:
+    """Potong dari belakang sampai muat `anggaran` token (perkiraan proporsional, dicek ulang)"""
+    token = hitung(teks)
+    while token > anggaran and teks:
+        teks = teks[: max(0, int(len(teks) * anggaran / token * 0.95))].rstrip()
+        token = hitung(teks)
+    return teks
+
+
+def _potong_tengah(teks: str, anggaran: int, hitung: Callable[[str], int]) -> str:
+    """Buang potongan di tengah sampai muat `anggaran` token; kepala dan ekor tetap dipertahankan"""
+    token = hitung(teks)
+    simpan = len(teks)
+    hasil = teks
+    while token > anggaran and simpan > 0:
+        simpan = int(simpan * anggaran / token * 0.95)
+        ekor = simpan // 2
+        hasil = teks[: simpan - ekor].rstrip() + "\n[...]\n" + (teks[len(teks) - ekor :].lstrip() if ekor else "")
+        token = hitung(hasil)
+    return hasil if token <= anggaran else ""
+
+
+def pangkas_prompt(prompt: str, anggaran: int, hitung: Callable[[str], int]) -> Tuple[str, int, int]:
+    """Pangkas prompt per bagian sampai muat `anggaran` token; kembalikan (teks, diringkas, dihapus)"""
+    bagian = [b.strip() for b in _BATAS_BAGIAN.split(prompt) if b.strip()]
+    token = [hitung(b) for b in bagian]
+    pakai: List[Optional[str]] = [None] * len(bagian)
+    terpakai = 0
+    # Whole sections from both ends inward, head first
+    urutan = [i for pasangan in zip(range(len(bagian)), reversed(range(len(bagian)))) for i in pasangan]
+    for i in dict.fromkeys(urutan[: len(bagian)]):
+        if terpakai + token[i] > anggaran * _PORSI_UTUH:
+            if terpakai == 0:
+                # A single giant first section: keep as much of its head as fits
+                pakai[i] = _potong(bagian[i], int(anggaran * _PORSI_UTUH), hitung)
+                terpakai += hitung(pakai[i])
+            break
+        pakai[i] = bagian[i]
+        terpakai += token[i]
+    diringkas = 0
+    for i, isi in enumerate(bagian):
+        if pakai[i] is not None:
+            continue
+        ringkasan = _ringkas(isi)
+        token_ringkasan = hitung(ringkasan)
+        if terpakai + token_ringkasan <= anggaran:
+            pakai[i] = ringkasan
+            terpakai += token_ringkasan
+            diringkas += 1
+    hasil: List[str] = []
+    for isi in pakai:
+        if isi is not None:
+            hasil.append(isi)
+        elif not hasil or hasil[-1] is not _PENANDA_HAPUS:
+            # One marker per run of dropped sections
+            hasil.append(_PENANDA_HAPUS)
+    # Separators and markers are not counted above; trim any overshoot from the middle so both preserved ends survive
+    return _potong_tengah("\n\n".join(hasil), anggaran, hitung), diringkas, pakai.count(None)
+
+
+@functools.lru_cache(maxsize=256)
+def terapkan_anggaran(
+    prompt: str,
+    model: str,
+    token_tetap: int,
+    anggaran_input: int,
+    batas_keluaran: int,
+    dasar_keluaran: int,
+    konteks: int = KONTEKS_DEFAULT,
+) -> KeputusanAnggaran:
+    """Keputusan anggaran untuk satu prompt; di-memo karena dipanggil untuk kunci cache dan request"""
+    hitung, penghitung = penghitung_token(model)
+    token_prompt = hitung(prompt)
+    teks, token_dikirim, diringkas, dihapus = prompt, token_prompt, 0, 0
+    if anggaran_input > 0 and token_tetap + token_prompt > anggaran_input:
+        teks, diringkas, dihapus = pangkas_prompt(prompt, max(0, anggaran_input - token_tetap), hitung)
+        token_dikirim = hitung(teks)
+    token_request = token_tetap + token_dikirim
+    return KeputusanAnggaran(
+        prompt=teks,
+        token_prompt=token_prompt,
+        token_dikirim=token_dikirim,
+        token_request=token_request,
+        anggaran=anggaran_input,
+        max_tokens=max_token_keluaran(token_dikirim, batas_keluaran, dasar_keluaran, konteks - token_request),
+        konteks=konteks,
+        bagian_diringkas=diringkas,
+        bagian_dihapus=dihapus,
+        penghitung=penghitung,
+    )
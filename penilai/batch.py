@@ -0,0 +1,147 @@
+"""Scoring massal dari file JSONL/CSV dengan konkurensi terbatas dan checkpoint.
+
+File output JSONL sekaligus menjadi checkpoint: setiap baris ditulis begitu
+satu prompt selesai, dan saat dijalankan ulang id yang sudah sukses dilewati.
+"""
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict
+from typing import Any, Dict, Iterator, Optional, Set, TextIO
+
+from penilai.core import AnalisisError, PenilaiPrompt
+
+logger = logging.getLogger(__name__)
+
+
+def baca_input(path: str, field: str = "prompt", id_field: str = "id") -> Iterator[Dict[str, str]]:
+    """Baca record {id, prompt} dari file .jsonl atau .csv
+
+    Jika kolom id tidak ada atau kosong, nomor baris (mulai 1) dipakai sebagai
+    id sehingga resume tetap konsisten selama file input tidak berubah. Id
+    ganda membuat ValueError, karena checkpoint tidak bisa membedakan kedua
+    record.
+    """
+    terlihat: Set[str] = set()
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            baris = csv.DictReader(f)
+        else:
+            baris = (json.loads(line) for line in f if line.strip())
+        for nomor, record in enumerate(baris, start=1):
+            prompt = record.get(field)
+            if not prompt:
+                logger.warning("Baris %d tidak punya field '%s', dilewati", nomor, field)
+                continue
+            id_asli = record.get(id_field)
+            # CSV has no null: an empty cell means "no id", but a literal 0 is still a valid id
+            id_record = str(nomor if id_asli is None or str(id_asli).strip() == "" else id_asli)
+            if id_record in terlihat:
+                raise ValueError(f"Baris {nomor}: id '{id_record}' sudah dipakai record sebelumnya")
+            terlihat.add(id_record)
+            yield {"id": id_record, "prompt": prompt}
+
+
+def id_selesai(path: str) -> Set[str]:
+    """Id yang sudah sukses dinilai di file output (checkpoint)"""
+    selesai: Set[str] = set()
+    if not os.path.exists(path):
+        return selesai
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Baris terakhir bisa terpotong kalau proses mati saat menulis
+                continue
+            if record.get("error") is None:
+                selesai.add(record["id"])
+    return selesai
+
+
+async def _nilai_satu(penilai: PenilaiPrompt, record: Dict[str, str], tips: bool, pakai_cache: bool) -> Dict[str, Any]:
+    mulai = time.perf_counter()
+    hasil: Dict[str, Any] = {"id": record["id"], "prompt": record["prompt"]}
+    try:
+        analisis = await penilai.analisis_prompt_async(record["prompt"], pakai_cache=pakai_cache)
+        hasil["analisis"] = asdict(analisis)
+        if tips:
+            hasil["tips"] = await penilai.tips_kilat_async(analisis, record["prompt"])
+        hasil["error"] = None
+    except AnalisisError as e:
+        hasil["error"] = str(e)
+    except Exception as e:
+        # e.g. KeyError from a malformed model response: recorded like any other failed prompt
+        logger.exception("Prompt %s gagal dinilai", record["id"])
+        hasil["error"] = f"{type(e).__name__}: {e}"
+    hasil["durasi"] = round(time.perf_counter() - mulai, 3)
+    return hasil
+
+
+async def jalankan_batch(
+    penilai: PenilaiPrompt,
+    input_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    field: str = "prompt",
+    id_field: str = "id",
+    tips: bool = False,
+    pakai_cache: bool = True,
+    progress: Optional[TextIO] = sys.stderr,
+) -> Dict[str, int]:
+    """Nilai semua prompt di input dan stream hasilnya ke output JSONL
+
+    Paling banyak `concurrency` request berjalan bersamaan; antrean dibatasi
+    supaya file input besar tidak dimuat sekaligus ke memori.
+    """
+    # Reject duplicate ids before anything is scored, not halfway through the output
+    for _ in baca_input(input_path, field, id_field):
+        pass
+    selesai = id_selesai(output_path)
+    antrean: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    statistik = {"dilewati": 0, "sukses": 0, "gagal": 0}
+
+    with open(output_path, "a", encoding="utf-8") as out:
+
+        async def worker():
+            while True:
+                record = await antrean.get()
+                if record is None:
+                    antrean.task_done()
+                    return
+                hasil = await _nilai_satu(penilai, record, tips, pakai_cache)
+                out.write(json.dumps(hasil, ensure_ascii=False) + "\n")
+                out.flush()
+                statistik["gagal" if hasil["error"] else "sukses"] += 1
+                if progress is not None:
+                    progress.write(
+                        f"\r✅ {statistik['sukses']}  ❌ {statistik['gagal']}  ⏭️ {statistik['dilewati']}"
+                    )
+                    progress.flush()
+                antrean.task_done()
+
+        async def produsen():
+            for record in baca_input(input_path, field, id_field):
+                if record["id"] in selesai:
+                    statistik["dilewati"] += 1
+                    continue
+                await antrean.put(record)
+            for _ in range(concurrency):
+                await antrean.put(None)
+
+        # Gathered together so a worker dying (e.g. the output write fails) stops the
+        # producer instead of leaving it blocked on a full queue
+        tugas = [asyncio.create_task(produsen())] + [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            await asyncio.gather(*tugas)
+        finally:
+            for t in tugas:
+                t.cancel()
+
+    if progress is not None:
+        progress.write("\n")
+    return statistik
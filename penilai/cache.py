@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "prompt-scorer", "analisis.sqlite3")
+
+
+def normalisasi_prompt(prompt: str) -> str:
+    """Normalisasi prompt supaya perbedaan whitespace kosmetik tidak mengubah kunci cache"""
+    prompt = unicodedata.normalize("NFC", prompt)
+    prompt = prompt.replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in prompt.strip().split("\n"))
+
+
+def buat_kunci_cache(prompt: str, model: str, temperature: float, template: str) -> str:
+    """Hash SHA-256 dari prompt ternormalisasi, model, temperature dan teks template"""
+    bahan = json.dumps(
+        [normalisasi_prompt(prompt), model, float(temperature), template],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(bahan.encode("utf-8")).hexdigest()
+
+
+class CacheAnalisis:
+    """Cache dua tingkat (LRU in-process + SQLite) untuk hasil analisis prompt.
+
+    Nilai yang disimpan adalah dict JSON hasil model, bukan objek dataclass,
+    supaya tetap bisa dibaca walaupun dataclass berubah.
+    """
+
+    _PRUNE_SETIAP = 50
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_CACHE_PATH,
+        max_memori: int = 256,
+        max_disk: int = 10000,
+        ttl: float = 7 * 24 * 3600,
+        aktif: bool = True,
+    ):
+        self.path = os.path.expanduser(path) if path else path
+        self.max_memori = max_memori
+        self.max_disk = max_disk
+        self.ttl = ttl
+        self.aktif = aktif
+        self._lock = threading.Lock()
+        self._memori: "OrderedDict[str, tuple]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._jumlah_tulis = 0
+        self.hits_memori = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS analisis (
+                    kunci TEXT PRIMARY KEY,
+                    prompt TEXT NOT NULL,
+                    nilai TEXT NOT NULL,
+                    dibuat REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_analisis_dibuat ON analisis (dibuat)")
+            self._conn.commit()
+        return self._conn
+
+    def _kedaluwarsa(self, dibuat: float, sekarang: float) -> bool:
+        return self.ttl is not None and self.ttl > 0 and sekarang - dibuat > self.ttl
+
+    def get(self, kunci: str, catat: bool = True) -> Optional[Dict[str, Any]]:
+        """Ambil hasil dari memori dulu, lalu dari disk. None jika miss atau cache nonaktif
+
+        catat=False untuk lookup sampingan (misal pratinjau prompt mirip) yang
+        tidak boleh memengaruhi statistik hit/miss.
+        """
+        if not self.aktif:
+            return None
+        sekarang = time.time()
+        with self._lock:
+            entri = self._memori.get(kunci)
+            if entri is not None:
+                nilai, dibuat = entri
+                if not self._kedaluwarsa(dibuat, sekarang):
+                    self._memori.move_to_end(kunci)
+                    if catat:
+                        self.hits_memori += 1
+                    return nilai
+                del self._memori[kunci]
+
+            db = self._db()
+            if db is not None:
+                baris = db.execute("SELECT nilai, dibuat FROM analisis WHERE kunci = ?", (kunci,)).fetchone()
+                if baris is not None:
+                    if not self._kedaluwarsa(baris[1], sekarang):
+                        nilai = json.loads(baris[0])
+                        self._simpan_memori(kunci, nilai, baris[1])
+                        if catat:
+                            self.hits_disk += 1
+                        return nilai
+                    db.execute("DELETE FROM analisis WHERE kunci = ?", (kunci,))
+                    db.commit()
+
+            if catat:
+                self.misses += 1
+            return None
+
+    def set(self, kunci: str, prompt: str, nilai: Dict[str, Any]) -> None:
+        """Simpan hasil ke kedua tingkat cache"""
+        if not self.aktif:
+            return
+        dibuat = time.time()
+        with self._lock:
+            self._simpan_memori(kunci, nilai, dibuat)
+            db = self._db()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO analisis (kunci, prompt, nilai, dibuat) VALUES (?, ?, ?, ?)",
+                (kunci, normalisasi_prompt(prompt), json.dumps(nilai, ensure_ascii=False), dibuat),
+            )
+            self._jumlah_tulis += 1
+            if self._jumlah_tulis % self._PRUNE_SETIAP == 0:
+                self._prune(db, dibuat)
+            db.commit()
+
+    def _simpan_memori(self, kunci: str, nilai: Dict[str, Any], dibuat: float) -> None:
+        self._memori[kunci] = (nilai, dibuat)
+        self._memori.move_to_end(kunci)
+        while len(self._memori) > self.max_memori:
+            self._memori.popitem(last=False)
+
+    def _prune(self, db: sqlite3.Connection, sekarang: float) -> None:
+        # Buang entri kedaluwarsa, lalu entri tertua jika melebihi batas ukuran
+        if self.ttl:
+            db.execute("DELETE FROM analisis WHERE dibuat < ?", (sekarang - self.ttl,))
+        db.execute(
+            """
+            DELETE FROM analisis WHERE kunci IN (
+                SELECT kunci FROM analisis ORDER BY dibuat DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_disk,),
+        )
+
+    def daftar_prompt(self) -> List[str]:
+        """Prompt unik yang masih berlaku di cache disk, dari yang tertua (untuk indeks prompt mirip)"""
+        if not self.aktif:
+            return []
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return []
+            batas = time.time() - self.ttl if self.ttl else 0
+            baris = db.execute(
+                "SELECT prompt FROM analisis WHERE dibuat >= ? GROUP BY prompt ORDER BY MAX(dibuat)", (batas,)
+            ).fetchall()
+        return [prompt for prompt, in baris]
+
+    def clear(self) -> None:
+        """Kosongkan seluruh cache (memori dan disk)"""
+        with self._lock:
+            self._memori.clear()
+            db = self._db()
+            if db is not None:
+                db.execute("DELETE FROM analisis")
+                db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistik hit/miss untuk ditampilkan di mode debug"""
+        with self._lock:
+            total = self.hits_memori + self.hits_disk + self.misses
+            return {
+                "aktif": self.aktif,
+                "hits_memori": self.hits_memori,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": (self.hits_memori + self.hits_disk) / total if total else 0.0,
+                "entri_memori": len(self._memori),
+            }
@@ -0,0 +1,180 @@
+"""Mode cascade: nilai dulu dengan model murah, eskalasi ke model utama bila perlu.
+
+Hasil model murah dipakai langsung kecuali skornya dekat batas pita skor
+(50/65/80/90, sama dengan meter skor di UI), JSON-nya tidak lolos validasi,
+atau prompt-nya panjang/kompleks sejak awal. Statistik per tier (jumlah,
+latency, token, biaya) dan alasan eskalasi dikumpulkan di sini supaya
+penghematan biaya bisa dibandingkan dengan "semua ke model utama".
+"""
+import threading
+from typing import Any, Dict, Optional
+
+from penilai.metrics import registry
+from penilai.prescorer import pra_analisis
+
+# Score band cutoffs shown by tampilkan_meter_skor in the UI
+BATAS_SKOR = (50, 65, 80, 90)
+
+# USD per 1M tokens (input, output); unknown models are counted as 0 cost
+HARGA_MODEL = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-4.1": (2.0, 8.0),
+    "gpt-4.1-mini": (0.4, 1.6),
+    "gpt-4.1-nano": (0.1, 0.4),
+    "gpt-3.5-turbo": (0.5, 1.5),
+}
+
+TIER = ("murah", "utama")
+
+_KUNCI_WAJIB = (
+    "skor", "jenis_tugas", "teknik_sesuai", "teknik_ditemukan", "teknik_disarankan",
+    "kelebihan", "kekurangan", "rekomendasi", "versi_perbaikan",
+)
+
+
+def harga(model: str) -> tuple:
+    """(input, output) USD per 1M token; cocokkan prefiks terpanjang untuk nama bertanggal"""
+    if model in HARGA_MODEL:
+        return HARGA_MODEL[model]
+    cocok = [nama for nama in HARGA_MODEL if model.startswith(nama + "-")]
+    return HARGA_MODEL[max(cocok, key=len)] if cocok else (0.0, 0.0)
+
+
+def biaya(model: str, usage: Any) -> float:
+    """Biaya USD satu respons dari objek usage OpenAI"""
+    if usage is None:
+        return 0.0
+    masuk, keluar = harga(model)
+    return (
+        (getattr(usage, "prompt_tokens", 0) or 0) * masuk
+        + (getattr(usage, "completion_tokens", 0) or 0) * keluar
+    ) / 1_000_000
+
+
+def alasan_eskalasi_awal(prompt: str, kata_maks: int) -> Optional[str]:
+    """Alasan langsung memakai model utama tanpa mencoba model murah, atau None"""
+    pra = pra_analisis(prompt)
+    if kata_maks and pra.jumlah_kata > kata_maks:
+        return "prompt_panjang"
+    # Several advanced techniques at once are where the cheap model disagrees most
+    if len(pra.teknik) >= 2:
+        return "prompt_kompleks"
+    return None
+
+
+def validasi_hasil(result: Any) -> Optional[str]:
+    """Pesan kesalahan jika dict hasil model tidak sesuai skema analisis, atau None"""
+    if not isinstance(result, dict):
+        return "bukan objek JSON"
+    hilang = [kunci for kunci in _KUNCI_WAJIB if kunci not in result]
+    if hilang:
+        return f"field hilang: {', '.join(hilang)}"
+    skor = result["skor"]
+    if isinstance(skor, bool) or not isinstance(skor, (int, float)) or not 0 <= skor <= 100:
+        return f"skor tidak valid: {skor!r}"
+    for kunci in ("teknik_sesuai", "kelebihan", "kekurangan", "rekomendasi"):
+        if not isinstance(result[kunci], list):
+            return f"{kunci} bukan list"
+    for kunci in ("teknik_ditemukan", "teknik_disarankan"):
+        if not isinstance(result[kunci], list) or not all(
+            isinstance(item, dict) and "teknik" in item and "alasan" in item for item in result[kunci]
+        ):
+            return f"{kunci} tidak berisi objek teknik/alasan"
+    return None
+
+
+def dekat_batas(skor: float, margin: float) -> bool:
+    """True jika skor berada dalam `margin` poin dari salah satu BATAS_SKOR"""
+    return any(abs(skor - batas) <= margin for batas in BATAS_SKOR)
+
+
+def alasan_eskalasi(result: Any, margin: float) -> Optional[str]:
+    """Alasan mengulang hasil model murah di model utama, atau None jika hasilnya dipakai"""
+    if validasi_hasil(result) is not None:
+        return "json_tidak_valid"
+    if dekat_batas(result["skor"], margin):
+        return "dekat_batas"
+    return None
+
+
+class StatistikCascade:
+    """Jumlah, latency, token, dan biaya per tier plus alasan eskalasi"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.evaluasi = 0
+            self.eskalasi: Dict[str, int] = {}
+            self.tier = {
+                nama: {"panggilan": 0, "durasi": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "biaya": 0.0}
+                for nama in TIER
+            }
+            # What the cheap-tier calls would have cost on the main model, for the savings estimate
+            self.biaya_tanpa_cascade = 0.0
+
+    def catat_panggilan(self, tier: str, model: str, model_utama: str, durasi: float, usage: Any) -> None:
+        nilai = biaya(model, usage)
+        with self._lock:
+            data = self.tier[tier]
+            data["panggilan"] += 1
+            data["durasi"] += durasi
+            data["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+            data["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+            data["biaya"] += nilai
+            if tier == "murah":
+                self.biaya_tanpa_cascade += biaya(model_utama, usage)
+        registry.observe("penilai_cascade_durasi_detik", durasi, help="Latency panggilan analisis per tier cascade",
+                         tier=tier)
+        registry.inc("penilai_biaya_usd_total", nilai, help="Perkiraan biaya API analisis (USD)", model=model)
+
+    def catat_keputusan(self, alasan: Optional[str]) -> None:
+        """Satu evaluasi selesai; alasan None berarti hasil model murah dipakai"""
+        with self._lock:
+            self.evaluasi += 1
+            if alasan is not None:
+                self.eskalasi[alasan] = self.eskalasi.get(alasan, 0) + 1
+        registry.inc("penilai_cascade_total", help="Evaluasi mode cascade per hasil akhir",
+                     tier="murah" if alasan is None else "utama", alasan=alasan or "-")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total_eskalasi = sum(self.eskalasi.values())
+            murah = self.tier["murah"]
+            biaya_aktual = sum(data["biaya"] for data in self.tier.values())
+            # Without cascade every evaluation is one main-model call: escalated ones cost what they
+            # cost, accepted cheap ones are priced at the main model's rate for the same tokens
+            rata_utama_per_murah = self.biaya_tanpa_cascade / murah["panggilan"] if murah["panggilan"] else 0.0
+            biaya_tanpa = self.tier["utama"]["biaya"] + rata_utama_per_murah * (self.evaluasi - total_eskalasi)
+            return {
+                "evaluasi": self.evaluasi,
+                "eskalasi": total_eskalasi,
+                "rasio_eskalasi": total_eskalasi / self.evaluasi if self.evaluasi else 0.0,
+                "alasan": dict(self.eskalasi),
+                "tier": {
+                    nama: {
+                        "panggilan": data["panggilan"],
+                        "rata_latency_detik": data["durasi"] / data["panggilan"] if data["panggilan"] else 0.0,
+                        "prompt_tokens": data["prompt_tokens"],
+                        "completion_tokens": data["completion_tokens"],
+                        "biaya_usd": data["biaya"],
+                    }
+                    for nama, data in self.tier.items()
+                },
+                "biaya_usd": biaya_aktual,
+                "biaya_tanpa_cascade_usd": biaya_tanpa,
+                "hemat_usd": biaya_tanpa - biaya_aktual,
+            }
+
+
+pelacak_cascade = StatistikCascade()
+
+
+def statistik_cascade() -> Dict[str, Any]:
+    """Snapshot rasio eskalasi, latency, dan biaya per tier untuk seluruh proses"""
+    return pelacak_cascade.stats()
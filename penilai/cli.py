@@ -0,0 +1,140 @@
+"""Entry point command line `prompt-scorer`."""
+import argparse
+import asyncio
+import importlib.util
+import json
+import sys
+from typing import List, Optional
+
+from penilai.config import get_config
+
+
+def _cmd_batch(args: argparse.Namespace) -> int:
+    from penilai.batch import jalankan_batch
+    from penilai.core import PenilaiPrompt
+
+    config = get_config()
+    if args.metrics:
+        config["metrics_enabled"] = True
+    try:
+        penilai = PenilaiPrompt(config)
+        statistik = asyncio.run(jalankan_batch(
+            penilai,
+            args.input,
+            args.output,
+            concurrency=args.concurrency,
+            field=args.field,
+            id_field=args.id_field,
+            tips=args.tips,
+            pakai_cache=not args.no_cache,
+        ))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    print(json.dumps(statistik), file=sys.stderr)
+    if args.metrics:
+        from penilai.metrics import registry
+
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(registry.prometheus())
+    return 1 if statistik["gagal"] else 0
+
+
+def _cmd_ui(args: argparse.Namespace) -> int:
+    from streamlit.web import cli as stcli
+
+    # Locate the UI script without importing it (it renders on import)
+    script = importlib.util.find_spec("prompt_scorer").origin
+    sys.argv = ["streamlit", "run", script] + args.streamlit_args
+    return stcli.main()
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    import logging
+
+    from penilai.core import PenilaiPrompt
+    from penilai.server import layani
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    config = get_config()
+    # The service exposes /metrics, so collect them unless explicitly disabled
+    if config["metrics_enabled"] is None:
+        config["metrics_enabled"] = True
+    try:
+        penilai = PenilaiPrompt(config, sesi="server")
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    try:
+        asyncio.run(layani(
+            penilai,
+            host=args.host,
+            port=args.port,
+            worker=args.worker or config["server_worker"],
+            antrian_maks=args.antrian or config["server_antrian_maks"],
+            batas_shutdown=config["server_batas_shutdown"],
+            timeout_baca=config["server_timeout_baca"],
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _cmd_contoh(args: argparse.Namespace) -> int:
+    from penilai.contoh import get_koleksi_contoh
+
+    config = get_config()
+    if args.output:
+        config["contoh_path"] = args.output
+    try:
+        koleksi = get_koleksi_contoh(config)
+    except ValueError as e:
+        # Usually a missing OPENAI_API_KEY: computing artifacts needs the API, serving them does not
+        print(f"❌ {e}; artefak contoh dihitung lewat API", file=sys.stderr)
+        return 2
+    status = koleksi.segarkan(paksa=args.paksa)
+    print(json.dumps({"path": koleksi.path, "status": status}, ensure_ascii=False), file=sys.stderr)
+    return 1 if any(s.startswith("gagal") for s in status.values()) else 0
+
+
+def buat_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="prompt-scorer", description="Penilai Prompt Engineering")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+
+    batch = sub.add_parser("batch", help="Nilai banyak prompt dari file JSONL/CSV")
+    batch.add_argument("input", help="File input .jsonl atau .csv")
+    batch.add_argument("-o", "--output", required=True, help="File output JSONL (sekaligus checkpoint)")
+    batch.add_argument("-c", "--concurrency", type=int, default=8, help="Jumlah request paralel maksimum")
+    batch.add_argument("--field", default="prompt", help="Nama field/kolom berisi prompt")
+    batch.add_argument("--id-field", default="id", help="Nama field/kolom id (default: nomor baris)")
+    batch.add_argument("--tips", action="store_true", help="Sertakan tips kilat untuk setiap prompt")
+    batch.add_argument("--no-cache", action="store_true", help="Abaikan cache analisis")
+    batch.add_argument("--metrics", metavar="PATH", help="Tulis snapshot metrik Prometheus ke file ini setelah selesai")
+    batch.set_defaults(func=_cmd_batch)
+
+    ui = sub.add_parser("ui", help="Jalankan aplikasi Streamlit")
+    ui.add_argument("streamlit_args", nargs=argparse.REMAINDER, help="Argumen tambahan untuk streamlit run")
+    ui.set_defaults(func=_cmd_ui)
+
+    serve = sub.add_parser("serve", help="Jalankan layanan HTTP JSON (analisis dan tips kilat)")
+    serve.add_argument("--host", default="127.0.0.1", help="Alamat bind (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8080, help="Port (default: 8080)")
+    serve.add_argument("--worker", type=int, help="Evaluasi bersamaan maksimum (default: SERVER_WORKER)")
+    serve.add_argument("--antrian", type=int, help="Panjang antrian sebelum ditolak 429 (default: SERVER_ANTRIAN_MAKS)")
+    serve.set_defaults(func=_cmd_serve)
+
+    contoh = sub.add_parser("contoh", help="Hitung artefak hasil evaluasi prompt contoh (untuk build/deploy)")
+    contoh.add_argument("-o", "--output", help="File artefak (default: CONTOH_PATH)")
+    contoh.add_argument("--paksa", action="store_true", help="Hitung ulang semua, termasuk yang masih segar")
+    contoh.set_defaults(func=_cmd_contoh)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = buat_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Client OpenAI bersama per proses dengan connection pool yang bisa di-tune.
+
+Semua PenilaiPrompt dalam satu proses memakai client (dan pool koneksi HTTP)
+yang sama, jadi rerun Streamlit atau sesi baru tidak membuka koneksi/TLS
+handshake baru. Statistik reuse dihitung lewat trace extension httpcore.
+"""
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, Tuple
+
+_lock = threading.Lock()
+_clients: Dict[Tuple, Any] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, Any]]" = weakref.WeakKeyDictionary()
+
+
+class StatistikKoneksi:
+    """Counter thread-safe untuk request HTTP dan koneksi TCP baru"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request = 0
+        self.koneksi_baru = 0
+        self.client_dibuat = 0
+
+    def catat(self, nama: str) -> None:
+        with self._lock:
+            if nama == "request":
+                self.request += 1
+            elif nama == "koneksi":
+                self.koneksi_baru += 1
+            elif nama == "client":
+                self.client_dibuat += 1
+
+    def trace(self, event: str, info: Dict[str, Any]) -> None:
+        # httpcore reports "connection.connect_tcp.complete" only when a new socket is opened
+        if event == "connection.connect_tcp.complete":
+            self.catat("koneksi")
+
+    async def atrace(self, event: str, info: Dict[str, Any]) -> None:
+        self.trace(event, info)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "request": self.request,
+                "koneksi_baru": self.koneksi_baru,
+                "koneksi_dipakai_ulang": max(self.request - self.koneksi_baru, 0),
+                "reuse_rate": 1 - self.koneksi_baru / self.request if self.request else 0.0,
+                "client_dibuat": self.client_dibuat,
+            }
+
+
+statistik = StatistikKoneksi()
+
+
+def _kunci(config: Dict[str, Any]) -> Tuple:
+    return (
+        config["api_key"],
+        config["http_max_connections"],
+        config["http_max_keepalive"],
+        config["http_keepalive_expiry"],
+        config["http_timeout"],
+        config["http_connect_timeout"],
+    )
+
+
+def _opsi_http(config: Dict[str, Any]) -> Dict[str, Any]:
+    import httpx
+
+    return dict(
+        limits=httpx.Limits(
+            max_connections=config["http_max_connections"],
+            max_keepalive_connections=config["http_max_keepalive"],
+            keepalive_expiry=config["http_keepalive_expiry"],
+        ),
+        timeout=httpx.Timeout(config["http_timeout"], connect=config["http_connect_timeout"]),
+    )
+
+
+def get_client(config: Dict[str, Any]):
+    """openai.OpenAI bersama untuk config ini; aman dipanggil dari banyak thread"""
+    kunci = _kunci(config)
+    with _lock:
+        client = _clients.get(kunci)
+        if client is None:
+            import openai
+
+            def hook(request):
+                statistik.catat("request")
+                request.extensions["trace"] = statistik.trace
+
+            http_client = openai.DefaultHttpxClient(event_hooks={"request": [hook]}, **_opsi_http(config))
+            # Retries are handled by penilai.resilience (jitter, Retry-After, circuit breaker)
+            client = openai.OpenAI(
+                api_key=config["api_key"], http_client=http_client, timeout=http_client.timeout, max_retries=0
+            )
+            _clients[kunci] = client
+            statistik.catat("client")
+        return client
+
+
+def get_async_client(config: Dict[str, Any]):
+    """openai.AsyncOpenAI bersama untuk event loop yang sedang berjalan
+
+    Koneksi async terikat ke event loop, jadi pool dibagi per loop, bukan per proses.
+    """
+    import openai
+
+    loop = asyncio.get_running_loop()
+    kunci = _kunci(config)
+    with _lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get(kunci)
+        if client is None:
+
+            async def hook(request):
+                statistik.catat("request")
+                request.extensions["trace"] = statistik.atrace
+
+            http_client = openai.DefaultAsyncHttpxClient(event_hooks={"request": [hook]}, **_opsi_http(config))
+            client = openai.AsyncOpenAI(
+                api_key=config["api_key"], http_client=http_client, timeout=http_client.timeout, max_retries=0
+            )
+            per_loop[kunci] = client
+            statistik.catat("client")
+        return client
+
+
+def statistik_koneksi() -> Dict[str, Any]:
+    """Snapshot metrik reuse koneksi untuk seluruh client bersama"""
+    return statistik.snapshot()
@@ -0,0 +1,108 @@
+import os
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from dotenv import load_dotenv
+
+from penilai.cache import DEFAULT_CACHE_PATH
+from penilai.riwayat import DEFAULT_RIWAYAT_PATH
+
+DEFAULT_CONTOH_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "contoh.json")
+
+
+def _bool(nilai: Any) -> bool:
+    if isinstance(nilai, bool):
+        return nilai
+    return str(nilai).lower() == "true"
+
+
+# Opsi tambahan: (kunci config, section secrets, nama di section, env var, default, konversi)
+_OPSI = [
+    ("cache_enabled", "cache", "enabled", "CACHE_ENABLED", True, _bool),
+    ("cache_path", "cache", "path", "CACHE_PATH", DEFAULT_CACHE_PATH, str),
+    ("cache_ttl", "cache", "ttl", "CACHE_TTL", 7 * 24 * 3600, float),
+    ("cache_max_entries", "cache", "max_entries", "CACHE_MAX_ENTRIES", 10000, int),
+    ("tips_mode", "app", "tips_mode", "TIPS_MODE", "terpisah", str),
+    ("streaming", "app", "streaming", "STREAMING", False, _bool),
+    # "paralel" scores each framework criterion and the rewrite as separate concurrent requests
+    ("analisis_mode", "app", "analisis_mode", "ANALISIS_MODE", "tunggal", str),
+    # None means "follow app_debug"; see penilai.metrics.metrik_aktif
+    ("metrics_enabled", "app", "metrics", "METRICS_ENABLED", None, _bool),
+    # 0 = no limit; set to the account's OpenAI limits to queue instead of hitting 429s
+    ("ratelimit_rpm", "ratelimit", "rpm", "RATELIMIT_RPM", 0, int),
+    ("ratelimit_tpm", "ratelimit", "tpm", "RATELIMIT_TPM", 0, int),
+    ("ratelimit_antrian_maks", "ratelimit", "antrian_maks", "RATELIMIT_ANTRIAN_MAKS", 200, int),
+    ("ratelimit_timeout", "ratelimit", "timeout", "RATELIMIT_TIMEOUT", 120.0, float),
+    ("retry_maks", "resilience", "retry_maks", "RETRY_MAKS", 2, int),
+    ("retry_backoff", "resilience", "retry_backoff", "RETRY_BACKOFF", 0.5, float),
+    ("breaker_ambang", "resilience", "breaker_ambang", "BREAKER_AMBANG", 0.5, float),
+    ("breaker_jeda", "resilience", "breaker_jeda", "BREAKER_JEDA", 30.0, float),
+    ("hedging", "resilience", "hedging", "HEDGING", False, _bool),
+    # Cascade: score with the cheap model first, escalate to OPENAI_MODEL near band cutoffs or on bad JSON
+    ("cascade", "cascade", "enabled", "CASCADE", False, _bool),
+    ("cascade_model", "cascade", "model", "CASCADE_MODEL", "gpt-4o-mini", str),
+    ("cascade_margin", "cascade", "margin", "CASCADE_MARGIN", 3.0, float),
+    ("cascade_kata_maks", "cascade", "kata_maks", "CASCADE_KATA_MAKS", 150, int),
+    # Near-duplicate index: reuse or preview analyses of prompts that differ only trivially
+    ("mirip_enabled", "mirip", "enabled", "MIRIP_ENABLED", True, _bool),
+    ("mirip_ambang", "mirip", "ambang", "MIRIP_AMBANG", 0.8, float),
+    # Input budget for the whole analysis request (0 = no limit) and cap on derived max_tokens (0 = uncapped)
+    ("anggaran_token_input", "anggaran", "token_input", "ANGGARAN_TOKEN_INPUT", 6000, int),
+    ("anggaran_token_keluaran", "anggaran", "token_keluaran", "ANGGARAN_TOKEN_KELUARAN", 8000, int),
+    # Model context window in tokens; 0 = look it up from the model name (penilai.anggaran.konteks_model)
+    ("anggaran_konteks", "anggaran", "konteks", "ANGGARAN_KONTEKS", 0, int),
+    # Append-only evaluation history with incrementally updated aggregates (dashboard view)
+    ("riwayat_enabled", "riwayat", "enabled", "RIWAYAT_ENABLED", True, _bool),
+    ("riwayat_path", "riwayat", "path", "RIWAYAT_PATH", DEFAULT_RIWAYAT_PATH, str),
+    # Precomputed results for the built-in sample prompts, refreshed in the background on model/template change
+    ("contoh_enabled", "contoh", "enabled", "CONTOH_ENABLED", True, _bool),
+    ("contoh_path", "contoh", "path", "CONTOH_PATH", DEFAULT_CONTOH_PATH, str),
+    # HTTP service (`prompt-scorer serve`): concurrent evaluations, bounded queue, shutdown drain time
+    ("server_worker", "server", "worker", "SERVER_WORKER", 16, int),
+    ("server_antrian_maks", "server", "antrian_maks", "SERVER_ANTRIAN_MAKS", 64, int),
+    ("server_batas_shutdown", "server", "batas_shutdown", "SERVER_BATAS_SHUTDOWN", 30.0, float),
+    ("server_timeout_baca", "server", "timeout_baca", "SERVER_TIMEOUT_BACA", 30.0, float),
+    ("http_max_connections", "http", "max_connections", "HTTP_MAX_CONNECTIONS", 100, int),
+    ("http_max_keepalive", "http", "max_keepalive", "HTTP_MAX_KEEPALIVE", 20, int),
+    ("http_keepalive_expiry", "http", "keepalive_expiry", "HTTP_KEEPALIVE_EXPIRY", 30.0, float),
+    ("http_timeout", "http", "timeout", "HTTP_TIMEOUT", 120.0, float),
+    ("http_connect_timeout", "http", "connect_timeout", "HTTP_CONNECT_TIMEOUT", 5.0, float),
+]
+
+
+def _baca_opsi(secrets: Optional[Mapping], section: str, nama: str, env: str, default: Any, cast: Callable) -> Any:
+    if secrets is not None:
+        try:
+            return cast(secrets[section][nama])
+        except (KeyError, FileNotFoundError, TypeError):
+            pass
+    nilai = os.getenv(env)
+    return cast(nilai) if nilai is not None else default
+
+
+def get_config(secrets: Optional[Mapping] = None) -> Dict[str, Any]:
+    """Get configuration from Streamlit secrets (if given) or environment variables"""
+    load_dotenv()
+    try:
+        if secrets is None:
+            raise KeyError("secrets")
+        # Streamlit secrets first (for Streamlit Cloud)
+        config = {
+            "api_key": secrets["openai"]["api_key"],
+            "model": secrets["openai"]["model"],
+            "temperature": secrets["openai"]["temperature"],
+            "app_title": secrets["app"]["title"],
+            "app_debug": secrets["app"]["debug"],
+        }
+    except (KeyError, FileNotFoundError):
+        # Fallback to environment variables (for local development)
+        config = {
+            "api_key": os.getenv("OPENAI_API_KEY"),
+            "model": os.getenv("OPENAI_MODEL", "gpt-4"),
+            "temperature": float(os.getenv("OPENAI_TEMPERATURE", "0.3")),
+            "app_title": os.getenv("APP_TITLE", "Penilai Prompt Engineering"),
+            "app_debug": os.getenv("APP_DEBUG", "False").lower() == "true",
+        }
+
+    for kunci, section, nama, env, default, cast in _OPSI:
+        config[kunci] = _baca_opsi(secrets, section, nama, env, default, cast)
+    return config
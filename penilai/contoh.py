@@ -0,0 +1,272 @@
+"""Prompt contoh bawaan beserta hasil evaluasi yang sudah dihitung (artefak berversi).
+
+Tombol contoh (Zero-Shot, Few-Shot, Chain of Thought, Tree of Thoughts)
+adalah input yang paling sering diklik saat demo. Analisis dan tips kilat
+keempatnya dihitung sekali (saat startup di background, atau saat build
+lewat `prompt-scorer contoh`) lalu disimpan di satu file JSON. Versi
+artefak adalah hash kunci cache analisis (prompt, model, temperature,
+template analisis) plus setelan dan template tips, jadi begitu template
+atau model berubah artefak lama dianggap basi dan dihitung ulang di
+background; sementara itu artefak terakhir tetap bisa ditampilkan.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from penilai.cache import normalisasi_prompt
+from penilai.config import DEFAULT_CONTOH_PATH
+from penilai.core import AnalisisError, PenilaiPrompt, tips_default
+from penilai.model import AnalisisPrompt, analisis_dari_dict
+from penilai.prescorer import tips_lokal
+from penilai.templates import SYSTEM_TIPS, TEMPLATE_TIPS
+
+logger = logging.getLogger(__name__)
+
+CONTOH_PROMPT: Dict[str, str] = {
+    "Zero-Shot": "Jelaskan konsep blockchain dalam 3 paragraf untuk pemula.",
+    "Few-Shot": """Ubah deskripsi produk menjadi caption Instagram yang menarik.
+
+Contoh 1:
+Produk: Tas kanvas ramah lingkungan
+Caption: Eco-friendly canvas bag 🌱 Style meets sustainability! Perfect untuk daily adventures. #EcoFashion #SustainableLiving
+
+Contoh 2:
+Produk: Botol minum stainless steel
+Caption: Stay hydrated in style! 💧 Our stainless steel bottle keeps drinks cold for 24hrs. #Hydration #EcoFriendly
+
+Sekarang buatkan untuk:
+Produk: Sepatu sneakers dari bahan daur ulang""",
+    "Chain of Thought": """Saya punya budget Rp 5.000.000 untuk liburan 4 hari 3 malam di Bali untuk 2 orang.
+
+Bantu saya buat rencana budget detail. Pikirkan step by step:
+1. Hitung alokasi untuk setiap kategori (transport, hotel, makan, aktivitas)
+2. Cari opsi yang sesuai budget untuk setiap kategori
+3. Hitung total dan pastikan tidak melebihi budget
+4. Berikan rekomendasi final dengan breakdown biaya""",
+    "Tree of Thoughts": """Saya ingin memulai bisnis online dengan modal Rp 10 juta.
+
+Eksplorasi 3 ide bisnis yang berbeda:
+1. E-commerce fashion
+2. Kursus online
+3. Jasa digital marketing
+
+Untuk setiap ide:
+- Jelaskan konsep bisnis
+- Breakdown modal yang dibutuhkan
+- Analisis target market
+- Proyeksi revenue 6 bulan
+- List risiko dan mitigasi
+
+Berikan rekomendasi bisnis mana yang paling potensial.""",
+}
+
+_FORMAT = 1
+# Settings that pick a different scorer (and so different artifact versions)
+_KUNCI_CONFIG = (
+    "model", "temperature", "tips_mode", "analisis_mode", "cascade", "cascade_model", "anggaran_token_input"
+)
+# Artifacts kept per sample, so switching between a few models/templates does not recompute
+_VERSI_PER_CONTOH = 4
+# After a refresh with failures, new sessions wait this long before trying again
+_JEDA_GAGAL = 300.0
+
+
+def nama_contoh(prompt: str) -> Optional[str]:
+    """Nama contoh bawaan yang teksnya sama dengan `prompt` (abaikan whitespace kosmetik), atau None"""
+    teks = normalisasi_prompt(prompt)
+    return next((nama for nama, isi in CONTOH_PROMPT.items() if normalisasi_prompt(isi) == teks), None)
+
+
+@dataclass
+class HasilContoh:
+    nama: str
+    prompt: str
+    analisis: AnalisisPrompt
+    tips: List[str]
+    versi: str
+    dibuat: float
+    # Made with the current model/template; False while a stale artifact is shown and a refresh runs
+    segar: bool
+
+
+class KoleksiContoh:
+    """Artefak hasil evaluasi prompt contoh untuk satu setelan penilai; thread-safe
+
+    Artefak dibaca ulang kalau file diubah proses lain (misal
+    `prompt-scorer contoh` saat deploy).
+    """
+
+    def __init__(self, penilai: PenilaiPrompt, path: str = DEFAULT_CONTOH_PATH):
+        self.penilai = penilai
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        self._artefak: Dict[str, Dict[str, Any]] = {}
+        self._mtime: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._jeda_sampai = 0.0
+        self._versi = {nama: self._hitung_versi(prompt) for nama, prompt in CONTOH_PROMPT.items()}
+        self.disajikan = 0
+        self.dihitung = 0
+
+    def _hitung_versi(self, prompt: str) -> str:
+        config = self.penilai.config
+        bahan = json.dumps(
+            [self.penilai.kunci_cache(prompt), config["tips_mode"], config["model"], SYSTEM_TIPS, TEMPLATE_TIPS],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(bahan.encode("utf-8")).hexdigest()[:16]
+
+    def versi(self, nama: str) -> str:
+        return self._versi[nama]
+
+    def _muat(self) -> None:
+        """Baca file artefak kalau berubah sejak terakhir dibaca (dipanggil dengan lock)"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Artefak contoh %s tidak bisa dibaca: %s", self.path, e)
+            return
+        self._mtime = mtime
+        self._artefak = data.get("artefak", {}) if data.get("format") == _FORMAT else {}
+
+    def _tulis(self) -> None:
+        """Tulis semua artefak secara atomik (dipanggil dengan lock)"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        sementara = f"{self.path}.{os.getpid()}.tmp"
+        with open(sementara, "w", encoding="utf-8") as f:
+            json.dump({"format": _FORMAT, "artefak": self._artefak}, f, ensure_ascii=False, indent=1)
+        os.replace(sementara, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def ambil(self, nama: str) -> Optional[HasilContoh]:
+        """Artefak versi saat ini, atau artefak terbaru versi lama (segar=False), atau None"""
+        if nama not in CONTOH_PROMPT:
+            return None
+        versi = self._versi[nama]
+        with self._lock:
+            self._muat()
+            entri = self._artefak.get(versi)
+            if entri is None:
+                lama = [e for e in self._artefak.values() if e["nama"] == nama]
+                entri = max(lama, key=lambda e: e["dibuat"]) if lama else None
+            if entri is None:
+                return None
+            self.disajikan += 1
+        return HasilContoh(
+            nama=nama,
+            prompt=CONTOH_PROMPT[nama],
+            analisis=analisis_dari_dict(entri["analisis"]),
+            tips=entri["tips"],
+            versi=entri["versi"],
+            dibuat=entri["dibuat"],
+            segar=entri["versi"] == versi,
+        )
+
+    def basi(self) -> List[str]:
+        """Contoh yang belum punya artefak untuk model/template saat ini"""
+        with self._lock:
+            self._muat()
+            return [nama for nama, versi in self._versi.items() if versi not in self._artefak]
+
+    def segarkan(self, paksa: bool = False) -> Dict[str, str]:
+        """Hitung artefak yang basi (atau semua kalau `paksa`); kembalikan status per contoh
+
+        Hasil fallback (analisis lokal atau tips cadangan saat API gagal)
+        tidak disimpan, jadi dicoba lagi pada penyegaran berikutnya.
+        """
+        status = {}
+        basi = set(CONTOH_PROMPT) if paksa else set(self.basi())
+        for nama, prompt in CONTOH_PROMPT.items():
+            if nama not in basi:
+                status[nama] = "segar"
+                continue
+            try:
+                analisis = self.penilai.analisis_prompt(prompt, pakai_cache=not paksa)
+                tips = self.penilai.tips_kilat(analisis, prompt)
+            except AnalisisError as e:
+                logger.warning("Artefak contoh %s gagal dihitung: %s", nama, e)
+                status[nama] = f"gagal: {e}"
+                continue
+            if analisis.sumber != "model" or tips in (tips_lokal(prompt), tips_default(analisis.skor)):
+                status[nama] = "gagal: hasil cadangan, tidak disimpan"
+                continue
+            versi = self._versi[nama]
+            entri = {"nama": nama, "versi": versi, "analisis": asdict(analisis), "tips": tips, "dibuat": time.time()}
+            with self._lock:
+                self._muat()
+                self._artefak[versi] = entri
+                # Oldest versions of this sample beyond the cap are dropped
+                lama = sorted((e for e in self._artefak.values() if e["nama"] == nama), key=lambda e: e["dibuat"])
+                for e in lama[:-_VERSI_PER_CONTOH]:
+                    del self._artefak[e["versi"]]
+                self.dihitung += 1
+                try:
+                    self._tulis()
+                except OSError as e:
+                    # Still served from memory for this process
+                    logger.warning("Artefak contoh tidak bisa ditulis ke %s: %s", self.path, e)
+                    status[nama] = f"gagal: {e}"
+                    continue
+            status[nama] = "dibuat"
+        return status
+
+    def _segarkan_background(self) -> None:
+        status = self.segarkan()
+        if any(s.startswith("gagal") for s in status.values()):
+            self._jeda_sampai = time.monotonic() + _JEDA_GAGAL
+
+    def segarkan_background(self) -> bool:
+        """Mulai penyegaran di thread background kalau ada artefak basi; True kalau thread dimulai"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() or time.monotonic() < self._jeda_sampai:
+                return False
+        if not self.basi():
+            return False
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._segarkan_background, name="penilai-contoh", daemon=True)
+            self._thread.start()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        basi = self.basi()
+        with self._lock:
+            return {
+                "path": self.path,
+                "artefak": len(self._artefak),
+                "basi": basi,
+                "menyegarkan": self._thread is not None and self._thread.is_alive(),
+                "disajikan": self.disajikan,
+                "dihitung": self.dihitung,
+            }
+
+
+_lock = threading.Lock()
+_koleksi: Dict[tuple, KoleksiContoh] = {}
+
+
+def get_koleksi_contoh(config: Dict[str, Any]) -> KoleksiContoh:
+    """Koleksi bersama per proses untuk setelan model/template di config
+
+    Memakai penilai sendiri dengan riwayat nonaktif: menghitung artefak
+    bukan evaluasi pengguna dan tidak boleh muncul di dashboard.
+    """
+    kunci = (config["contoh_path"], *(config[nama] for nama in _KUNCI_CONFIG))
+    with _lock:
+        if kunci not in _koleksi:
+            penilai = PenilaiPrompt(dict(config, riwayat_enabled=False), sesi="contoh")
+            _koleksi[kunci] = KoleksiContoh(penilai, config["contoh_path"])
+        return _koleksi[kunci]
@@ -0,0 +1,884 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from penilai.anggaran import (
+    TOKEN_KELUARAN_DASAR,
+    KeputusanAnggaran,
+    konteks_model,
+    max_token_keluaran,
+    penghitung_token,
+    terapkan_anggaran,
+    token_request_tetap,
+)
+from penilai.cache import CacheAnalisis, buat_kunci_cache, normalisasi_prompt
+from penilai.cascade import alasan_eskalasi, alasan_eskalasi_awal, pelacak_cascade
+from penilai.client import get_async_client, get_client, statistik_koneksi
+from penilai.config import get_config
+from penilai.metrics import metrik_aktif, registry, timer
+from penilai.mirip import IndeksMirip, PromptMirip, get_indeks_mirip
+from penilai.model import AnalisisPrompt, analisis_dari_dict
+from penilai.paralel import (
+    BOBOT_KRITERIA,
+    MAX_TOKEN_PERBAIKAN,
+    MODE_ANALISIS,
+    gabung_hasil,
+    max_token_kriteria,
+    validasi_kriteria,
+    validasi_perbaikan,
+)
+from penilai.prescorer import tips_lokal
+from penilai.ratelimit import (
+    TOKEN_KELUARAN_ANALISIS,
+    TOKEN_KELUARAN_TIPS,
+    AntrianError,
+    PenjadwalAPI,
+    Tiket,
+    get_penjadwal,
+    perkiraan_token_request,
+)
+from penilai.resilience import Resilien, SirkuitTerbuka, get_resilien
+from penilai.riwayat import RiwayatEvaluasi, get_riwayat
+from penilai.singleflight import PanggilanDibatalkan, singleflight
+from penilai.streaming import ParserJSONBertahap
+from penilai.templates import (
+    SYSTEM_ANALISIS,
+    SYSTEM_TIPS,
+    TEMPLATE_ANALISIS,
+    TEMPLATE_ANALISIS_GABUNG,
+    TEMPLATE_KRITERIA,
+    TEMPLATE_PERBAIKAN,
+    TEMPLATE_PERBAIKAN_GABUNG,
+    buat_prompt_analisis,
+    buat_prompt_tips,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AnalisisError(Exception):
+    """Gagal mendapatkan analisis yang valid dari model"""
+
+
+_cache_lock = threading.Lock()
+_cache_per_path: Dict[Any, CacheAnalisis] = {}
+
+
+def get_cache(config: Dict[str, Any]) -> CacheAnalisis:
+    """Cache analisis bersama untuk seluruh pemanggil dalam satu proses"""
+    kunci = (config["cache_path"], config["cache_max_entries"], config["cache_ttl"], config["cache_enabled"])
+    with _cache_lock:
+        if kunci not in _cache_per_path:
+            _cache_per_path[kunci] = CacheAnalisis(
+                path=config["cache_path"],
+                max_disk=config["cache_max_entries"],
+                ttl=config["cache_ttl"],
+                aktif=config["cache_enabled"]
+            )
+        return _cache_per_path[kunci]
+
+
+MODE_TIPS = ("terpisah", "gabung")
+
+_pool_lock = threading.Lock()
+_pool_paralel: Optional[ThreadPoolExecutor] = None
+
+
+def get_pool_paralel() -> ThreadPoolExecutor:
+    """Thread pool bersama untuk sub-request mode analisis paralel (versi sync)"""
+    global _pool_paralel
+    with _pool_lock:
+        if _pool_paralel is None:
+            _pool_paralel = ThreadPoolExecutor(max_workers=32, thread_name_prefix="penilai-kriteria")
+        return _pool_paralel
+
+
+class PenilaiPrompt:
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        cache: Optional[CacheAnalisis] = None,
+        sesi: Optional[str] = None,
+    ):
+        self.config = config if config is not None else get_config()
+        api_key = self.config["api_key"]
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY tidak ditemukan")
+        if self.config["tips_mode"] not in MODE_TIPS:
+            raise ValueError(f"tips_mode harus salah satu dari {MODE_TIPS}")
+        if self.config["analisis_mode"] not in MODE_ANALISIS:
+            raise ValueError(f"analisis_mode harus salah satu dari {MODE_ANALISIS}")
+        # "gabung" asks for the tips inside the analysis JSON: one model call instead of two
+        gabung = self.config["tips_mode"] == "gabung"
+        self.template_analisis = TEMPLATE_ANALISIS_GABUNG if gabung else TEMPLATE_ANALISIS
+        self.paralel = self.config["analisis_mode"] == "paralel"
+        self.template_perbaikan = TEMPLATE_PERBAIKAN_GABUNG if gabung else TEMPLATE_PERBAIKAN
+        # Request tokens around the user prompt (largest template in use), for the input budget
+        hitung, _ = penghitung_token(self.config["model"])
+        templates = [*TEMPLATE_KRITERIA.values(), self.template_perbaikan] if self.paralel else [self.template_analisis]
+        self._token_tetap = max(
+            token_request_tetap(hitung, SYSTEM_ANALISIS, buat_prompt_analisis("", template)) for template in templates
+        )
+        self._dasar_keluaran = TOKEN_KELUARAN_DASAR + (TOKEN_KELUARAN_TIPS if gabung else 0)
+        # One pooled client per process; openai itself is only imported on first use
+        self.client = get_client(self.config)
+        self.cache = cache if cache is not None else get_cache(self.config)
+        # Near-duplicate index over prompts already in the cache, to reuse or preview their analyses
+        self.indeks_mirip: Optional[IndeksMirip] = (
+            get_indeks_mirip(self.config, self.cache) if self.config["mirip_enabled"] and self.cache.aktif else None
+        )
+        # Requests from all sessions share one RPM/TPM budget, served round-robin per session
+        self.penjadwal = get_penjadwal(self.config)
+        # Retries, circuit breaker and hedging are shared too, so the breaker sees every session's errors
+        self.resilien = get_resilien(self.config)
+        # Every evaluation handed out is logged for the history/dashboard view
+        self.riwayat: Optional[RiwayatEvaluasi] = get_riwayat(self.config) if self.config["riwayat_enabled"] else None
+        self.sesi = sesi or uuid.uuid4().hex[:12]
+        # Optional callback(posisi, perkiraan_detik) while an analysis waits for its turn
+        self.saat_antri: Optional[Callable[[int, float], None]] = None
+        if metrik_aktif(self.config):
+            registry.aktif = True
+            registry.gauge("penilai_koneksi_reuse_rate", lambda: statistik_koneksi()["reuse_rate"],
+                           help="Rasio request HTTP yang memakai ulang koneksi")
+            registry.gauge("penilai_koneksi_baru", lambda: statistik_koneksi()["koneksi_baru"],
+                           help="Koneksi TCP baru yang dibuka client bersama")
+
+    @property
+    def async_client(self):
+        """AsyncOpenAI bersama untuk event loop yang sedang berjalan (batch/async)"""
+        return get_async_client(self.config)
+
+    def anggaran(self, prompt: str) -> KeputusanAnggaran:
+        """Keputusan anggaran token untuk prompt ini: teks yang dikirim ke model dan max_tokens analisis
+
+        Prompt yang membuat request melebihi ANGGARAN_TOKEN_INPUT dipangkas
+        per bagian; lihat penilai.anggaran.
+        """
+        return terapkan_anggaran(
+            prompt,
+            self.config["model"],
+            self._token_tetap,
+            self.config["anggaran_token_input"],
+            self.config["anggaran_token_keluaran"],
+            self._dasar_keluaran,
+            self._konteks(self.config["model"]),
+        )
+
+    def _konteks(self, model: str) -> int:
+        """Jendela konteks `model`; ANGGARAN_KONTEKS hanya berlaku untuk model utama"""
+        return konteks_model(model, self.config["anggaran_konteks"] if model == self.config["model"] else 0)
+
+    def _siapkan(self, prompt: str) -> str:
+        """Prompt yang dikirim untuk satu evaluasi; keputusan anggarannya dicatat di metrik"""
+        keputusan = self.anggaran(prompt)
+        registry.inc("penilai_anggaran_total", help="Evaluasi per keputusan anggaran token input",
+                     keputusan="dipangkas" if keputusan.dipangkas else "utuh")
+        if keputusan.dipangkas:
+            registry.inc("penilai_token_dipangkas_total", keputusan.token_prompt - keputusan.token_dikirim,
+                         help="Token prompt yang dipangkas sebelum dikirim ke model")
+        return keputusan.prompt
+
+    def _max_token_perbaikan(self, prompt: str) -> int:
+        """max_tokens sub-request versi perbaikan (mode paralel): ikut panjang prompt yang dikirim"""
+        keputusan = self.anggaran(prompt)
+        sisa = keputusan.konteks - keputusan.token_request
+        maks = max_token_keluaran(keputusan.token_dikirim, self.config["anggaran_token_keluaran"], 200, sisa)
+        return max(min(MAX_TOKEN_PERBAIKAN, sisa), maks)
+
+    def kunci_cache(self, prompt: str) -> str:
+        """Kunci cache untuk prompt ini dengan model dan template saat ini"""
+        # A trimmed prompt is keyed by the text actually sent, so changing the budget re-evaluates it
+        prompt = self.anggaran(prompt).prompt
+        model = self.config["model"]
+        template = self.template_analisis
+        if self.paralel:
+            # The merged result depends on every sub-template; each sub-result also has its own key
+            template = "\n".join([*TEMPLATE_KRITERIA.values(), self.template_perbaikan])
+        elif self.config["cascade"]:
+            # Cascade results may come from the cheap model; keep them apart from main-model entries
+            model = f"{self.config['cascade_model']}>{model}"
+        return buat_kunci_cache(prompt, model, self.config["temperature"], template)
+
+    def _request_analisis(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        template: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        with timer("template", panggilan="analisis"):
+            konten = buat_prompt_analisis(prompt, template or self.template_analisis)
+        request = dict(
+            model=model or self.config["model"],
+            messages=[
+                {"role": "system", "content": SYSTEM_ANALISIS},
+                {"role": "user", "content": konten}
+            ],
+            temperature=self.config["temperature"],
+            response_format={"type": "json_object"}
+        )
+        if max_tokens is None:
+            max_tokens = self.anggaran(prompt).max_tokens
+        if max_tokens:
+            request["max_tokens"] = max_tokens
+        return request
+
+    def _dari_cache(self, kunci: str, pakai_cache: bool) -> Optional[Dict[str, Any]]:
+        if not pakai_cache:
+            return None
+        with timer("cache_lookup"):
+            result = self.cache.get(kunci)
+        registry.inc("penilai_cache_total", help="Lookup cache analisis", hasil="hit" if result is not None else "miss")
+        return result
+
+    def cari_mirip(self, prompt: str) -> Optional[Tuple[PromptMirip, AnalisisPrompt]]:
+        """Analisis tersimpan dari prompt lain yang mirip (kemiripan >= MIRIP_AMBANG), atau None
+
+        Dipakai UI sebagai pratinjau instan sebelum memutuskan evaluasi baru.
+        Tidak pernah dipakai otomatis, termasuk prompt yang hanya beda tanda
+        baca atau kapitalisasi: hasilnya perkiraan, jadi pengguna yang memilih.
+        """
+        if self.indeks_mirip is None:
+            return None
+        with timer("cari_mirip"):
+            mirip = self.indeks_mirip.cari(prompt)
+        if mirip is None or normalisasi_prompt(mirip.prompt) == normalisasi_prompt(prompt):
+            return None
+        # Only analyses made with the current model/template settings count
+        result = self.cache.get(self.kunci_cache(mirip.prompt), catat=False)
+        return (mirip, analisis_dari_dict(result)) if result is not None else None
+
+    def catat_riwayat(self, prompt: str, analisis: AnalisisPrompt, sumber: Optional[str] = None) -> None:
+        """Catat evaluasi ke riwayat (kalau aktif); gagal tulis hanya di-log, analisis tetap dikembalikan"""
+        if self.riwayat is None:
+            return
+        try:
+            with timer("riwayat"):
+                self.riwayat.catat(prompt, analisis, sumber)
+        except sqlite3.Error as e:
+            logger.warning("Gagal mencatat riwayat evaluasi: %s", e)
+
+    def _simpan(self, kunci: str, prompt: str, result: Dict[str, Any]) -> None:
+        """Simpan hasil ke cache; gagal tulis (database terkunci, disk penuh) hanya di-log"""
+        try:
+            self.cache.set(kunci, prompt, result)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Gagal menyimpan analisis ke cache: %s", e)
+            return
+        if self.indeks_mirip is not None:
+            self.indeks_mirip.tambah(prompt)
+
+    @staticmethod
+    def _proses_respons(konten: str, usage: Any) -> Tuple[Dict[str, Any], AnalisisPrompt]:
+        registry.catat_usage("analisis", usage)
+        with timer("parse_json"):
+            result = json.loads(konten)
+        with timer("bangun_analisis"):
+            analisis = analisis_dari_dict(result)
+        return result, analisis
+
+    def _cadangan_sirkuit(self, kunci: str) -> Optional[Dict[str, Any]]:
+        """Saat circuit breaker terbuka: hasil cache (walau evaluasi ulang diminta) atau SirkuitTerbuka"""
+        if not self.resilien.breaker.terbuka():
+            return None
+        result = self.cache.get(kunci)
+        if result is None:
+            raise SirkuitTerbuka("API sedang bermasalah, memakai analisis lokal sementara")
+        registry.inc("penilai_breaker_cadangan_total", help="Hasil cache yang dipakai saat breaker terbuka")
+        return result
+
+    def _request_ulang_terpotong(self, request: Dict[str, Any], usage: Any, panggilan: str) -> Dict[str, Any]:
+        """Request ulang dengan max_tokens dua kali lipat untuk jawaban yang terpotong (finish_reason "length")
+
+        Batas baru tidak melebihi sisa jendela konteks model setelah request.
+        AnalisisError kalau request tidak punya max_tokens (batasnya dari
+        model sendiri) atau konteks tidak muat batas yang lebih besar:
+        mengulang tidak akan membantu.
+        """
+        # The cut-off answer still cost tokens
+        registry.catat_usage("analisis", usage)
+        registry.inc("penilai_jawaban_terpotong_total", help="Jawaban analisis yang terpotong di max_tokens",
+                     panggilan=panggilan)
+        max_tokens = request.get("max_tokens")
+        if not max_tokens:
+            raise AnalisisError("Jawaban model terpotong karena melebihi batas keluaran model")
+        hitung, _ = penghitung_token(request["model"])
+        konteks = self._konteks(request["model"])
+        baru = min(max_tokens * 2, konteks - token_request_tetap(hitung, *(p["content"] for p in request["messages"])))
+        if baru <= max_tokens:
+            raise AnalisisError(
+                f"Jawaban model terpotong di max_tokens={max_tokens} dan jendela konteks {request['model']} "
+                f"({konteks} token) tidak muat batas lebih besar; turunkan ANGGARAN_TOKEN_INPUT atau perpendek prompt"
+            )
+        logger.warning("Jawaban %s terpotong di max_tokens=%d, diulang dengan %d", panggilan, max_tokens, baru)
+        return dict(request, max_tokens=baru)
+
+    @staticmethod
+    def _terpotong(request: Dict[str, Any]) -> AnalisisError:
+        return AnalisisError(
+            f"Jawaban model tetap terpotong di max_tokens={request.get('max_tokens')}; "
+            "naikkan ANGGARAN_TOKEN_KELUARAN atau isi 0 untuk tanpa batas"
+        )
+
+    def _panggil_model(
+        self,
+        request: Dict[str, Any],
+        tier: Optional[str] = None,
+        panggilan: str = "analisis",
+        lapor_antrian: bool = True,
+        ulang_terpotong: bool = True,
+    ) -> Tuple[str, Any]:
+        """Satu chat completion analisis lewat penjadwal dan resilience; kembalikan (konten, usage)
+
+        `panggilan` memisahkan pelacak latency (p95 hedging) dan label metrik
+        untuk request yang ukurannya beda jauh, misal tier murah cascade atau
+        sub-request mode paralel. Jawaban yang terpotong di max_tokens
+        diulang sekali dengan batas dua kali lipat.
+        """
+        fungsi = self.penjadwal.per_percobaan(
+            self.sesi,
+            perkiraan_token_request(request, TOKEN_KELUARAN_ANALISIS),
+            lambda tiket: self.client.chat.completions.create(**request),
+            self.saat_antri if lapor_antrian else None,
+        )
+        mulai = time.perf_counter()
+        with timer("api", panggilan=panggilan):
+            response = self.resilien.panggil(fungsi, panggilan=panggilan)
+        if tier is not None:
+            pelacak_cascade.catat_panggilan(
+                tier, request["model"], self.config["model"], time.perf_counter() - mulai, response.usage
+            )
+        if response.choices[0].finish_reason == "length":
+            if not ulang_terpotong:
+                raise self._terpotong(request)
+            request = self._request_ulang_terpotong(request, response.usage, panggilan)
+            return self._panggil_model(request, tier, panggilan, lapor_antrian, ulang_terpotong=False)
+        return response.choices[0].message.content, response.usage
+
+    def _periksa_murah(self, konten: str, usage: Any) -> Optional[str]:
+        """Alasan eskalasi untuk jawaban model murah, atau None jika jawabannya dipakai"""
+        try:
+            result = json.loads(konten)
+        except ValueError:
+            result = None
+        alasan = alasan_eskalasi(result, self.config["cascade_margin"])
+        if alasan is not None:
+            # The discarded cheap answer still cost tokens
+            registry.catat_usage("analisis", usage)
+        return alasan
+
+    def _analisis_cascade(self, prompt: str) -> Tuple[Dict[str, Any], AnalisisPrompt]:
+        """Model murah dulu; ulang di model utama jika alasan_eskalasi(_awal) menemukan alasan"""
+        alasan = alasan_eskalasi_awal(prompt, self.config["cascade_kata_maks"])
+        if alasan is None:
+            try:
+                respons = self._panggil_model(
+                    self._request_analisis(prompt, self.config["cascade_model"]),
+                    tier="murah",
+                    panggilan="analisis_murah",
+                )
+                alasan = self._periksa_murah(*respons)
+            except (AntrianError, SirkuitTerbuka):
+                raise
+            except Exception as e:
+                logger.warning("Model cascade gagal, eskalasi ke model utama: %s", e)
+                alasan = "error_model_murah"
+            if alasan is None:
+                pelacak_cascade.catat_keputusan(None)
+                return self._proses_respons(*respons)
+        hasil = self._proses_respons(*self._panggil_model(self._request_analisis(prompt), tier="utama"))
+        pelacak_cascade.catat_keputusan(alasan)
+        return hasil
+
+    def _sub_analisis(
+        self,
+        prompt: str,
+        template: str,
+        max_tokens: int,
+        validasi: Callable[[Any], Dict[str, Any]],
+        pakai_cache: bool,
+        lapor_antrian: bool = True,
+    ) -> Dict[str, Any]:
+        """Satu sub-request mode paralel; hasil yang valid di-cache dengan kuncinya sendiri"""
+        kunci = buat_kunci_cache(prompt, self.config["model"], self.config["temperature"], template)
+        result = self._dari_cache(kunci, pakai_cache)
+        if result is not None:
+            return result
+        request = self._request_analisis(prompt, template=template, max_tokens=max_tokens)
+        konten, usage = self._panggil_model(request, panggilan="analisis_paralel", lapor_antrian=lapor_antrian)
+        registry.catat_usage("analisis", usage)
+        with timer("parse_json"):
+            result = validasi(json.loads(konten))
+        self.cache.set(kunci, prompt, result)
+        return result
+
+    @staticmethod
+    def _gabung_paralel(
+        kriteria: Dict[str, Dict[str, Any]], perbaikan: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], AnalisisPrompt]:
+        with timer("bangun_analisis"):
+            result = gabung_hasil(kriteria, perbaikan)
+            return result, analisis_dari_dict(result)
+
+    def _analisis_paralel(self, prompt: str, pakai_cache: bool) -> Tuple[Dict[str, Any], AnalisisPrompt]:
+        """Lima kriteria di thread pool, versi perbaikan di thread pemanggil; latency = sub-request terlama"""
+        pool = get_pool_paralel()
+        # Only the calling thread reports queue position: UI callbacks are not safe from pool threads
+        futures = {
+            nama: pool.submit(
+                self._sub_analisis, prompt, TEMPLATE_KRITERIA[nama], max_token_kriteria(nama),
+                lambda result, nama=nama: validasi_kriteria(nama, result), pakai_cache, False,
+            )
+            for nama in BOBOT_KRITERIA
+        }
+        try:
+            perbaikan = self._sub_analisis(
+                prompt, self.template_perbaikan, self._max_token_perbaikan(prompt), validasi_perbaikan, pakai_cache
+            )
+            kriteria = {nama: future.result() for nama, future in futures.items()}
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+            raise
+        return self._gabung_paralel(kriteria, perbaikan)
+
+    def _panggil_analisis(
+        self, prompt: str, kunci: str, pakai_cache: bool = True
+    ) -> Tuple[Dict[str, Any], AnalisisPrompt]:
+        try:
+            cadangan = self._cadangan_sirkuit(kunci)
+            if cadangan is not None:
+                return cadangan, analisis_dari_dict(cadangan)
+            dikirim = self._siapkan(prompt)
+            if self.paralel:
+                result, analisis = self._analisis_paralel(dikirim, pakai_cache)
+            elif self.config["cascade"]:
+                result, analisis = self._analisis_cascade(dikirim)
+            else:
+                result, analisis = self._proses_respons(*self._panggil_model(self._request_analisis(dikirim)))
+
+        except Exception as e:
+            registry.inc("penilai_panggilan_api_total", help="Panggilan API per status", panggilan="analisis", status="gagal")
+            raise AnalisisError(f"Error saat menganalisis prompt: {str(e)}") from e
+
+        registry.inc("penilai_panggilan_api_total", help="Panggilan API per status", panggilan="analisis", status="sukses")
+        # Only cache results that parsed cleanly; bypass still refreshes the stored entry
+        self._simpan(kunci, prompt, result)
+        return result, analisis
+
+    def analisis_prompt(self, prompt: str, pakai_cache: bool = True) -> AnalisisPrompt:
+        """Analisis prompt berdasarkan konteks penggunaan
+
+        Pemanggilan bersamaan untuk prompt (dan setelan model) yang sama
+        digabung jadi satu panggilan API; semua pemanggil menerima hasil
+        atau AnalisisError yang sama.
+        """
+
+        kunci = self.kunci_cache(prompt)
+        result = self._dari_cache(kunci, pakai_cache)
+        if result is not None:
+            analisis = analisis_dari_dict(result)
+            self.catat_riwayat(prompt, analisis, "cache")
+            return analisis
+
+        try:
+            _, analisis = singleflight.jalankan(kunci, lambda: self._panggil_analisis(prompt, kunci, pakai_cache))
+        except PanggilanDibatalkan as e:
+            raise AnalisisError(str(e)) from e
+        self.catat_riwayat(prompt, analisis)
+        return analisis
+
+    def analisis_prompt_stream(self, prompt: str, pakai_cache: bool = True) -> Iterator[Tuple[str, Any]]:
+        """Analisis dengan streaming; yield (field, nilai) begitu tiap field JSON lengkap
+
+        Urutan field mengikuti template (skor, jenis_tugas, ..., versi_perbaikan).
+        Event terakhir selalu ("selesai", AnalisisPrompt) dengan hasil yang sama
+        persis seperti analisis_prompt(). Kalau prompt yang sama sedang
+        dianalisis pemanggil lain, hasil panggilan itu yang diputar ulang.
+        Pada mode cascade dan mode analisis paralel hasil akhir baru diketahui
+        setelah semua panggilan selesai, jadi field baru di-yield di akhir.
+        """
+
+        kunci = self.kunci_cache(prompt)
+        result = self._dari_cache(kunci, pakai_cache)
+        if result is not None:
+            analisis = analisis_dari_dict(result)
+            self.catat_riwayat(prompt, analisis, "cache")
+            yield from result.items()
+            yield "selesai", analisis
+            return
+
+        if self.paralel or self.config["cascade"]:
+            try:
+                result, analisis = singleflight.jalankan(
+                    kunci, lambda: self._panggil_analisis(prompt, kunci, pakai_cache)
+                )
+            except PanggilanDibatalkan as e:
+                raise AnalisisError(str(e)) from e
+            self.catat_riwayat(prompt, analisis)
+            yield from result.items()
+            yield "selesai", analisis
+            return
+
+        try:
+            result = self._cadangan_sirkuit(kunci)
+        except SirkuitTerbuka as e:
+            raise AnalisisError(f"Error saat menganalisis prompt: {str(e)}") from e
+        if result is not None:
+            analisis = analisis_dari_dict(result)
+            self.catat_riwayat(prompt, analisis)
+            yield from result.items()
+            yield "selesai", analisis
+            return
+
+        panggilan, pemimpin = singleflight.mulai(kunci)
+        if not pemimpin:
+            try:
+                result, analisis = panggilan.tunggu()
+            except PanggilanDibatalkan as e:
+                raise AnalisisError(str(e)) from e
+            self.catat_riwayat(prompt, analisis)
+            yield from result.items()
+            yield "selesai", analisis
+            return
+
+        try:
+            try:
+                request = self._request_analisis(self._siapkan(prompt))
+                # Usage only arrives with the last chunk, so remember which attempt's ticket opened the stream
+                tiket_dipakai: List[Tiket] = []
+
+                def buka_stream(tiket: Tiket):
+                    tiket_dipakai.append(tiket)
+                    return self.client.chat.completions.create(
+                        **request, stream=True, stream_options={"include_usage": True}
+                    )
+
+                fungsi = self.penjadwal.per_percobaan(
+                    self.sesi, perkiraan_token_request(request, TOKEN_KELUARAN_ANALISIS), buka_stream, self.saat_antri
+                )
+                mulai = time.perf_counter()
+                # Only opening the stream is retried; a stream that breaks midway cannot be replayed
+                stream = self.resilien.panggil(fungsi, hedging=False)
+                parser = ParserJSONBertahap()
+                usage = None
+                finish_reason = None
+                try:
+                    for chunk in stream:
+                        # With include_usage the final chunk carries usage and no choices
+                        usage = chunk.usage or usage
+                        if chunk.choices and chunk.choices[0].finish_reason:
+                            finish_reason = chunk.choices[0].finish_reason
+                        if not chunk.choices or not chunk.choices[0].delta.content:
+                            continue
+                        if not parser.buffer:
+                            registry.observe("penilai_tahap_durasi_detik", time.perf_counter() - mulai,
+                                             tahap="api_token_pertama", panggilan="analisis")
+                        yield from parser.feed(chunk.choices[0].delta.content)
+                finally:
+                    stream.close()
+                registry.observe("penilai_tahap_durasi_detik", time.perf_counter() - mulai, tahap="api", panggilan="analisis")
+                self.penjadwal.catat_pemakaian(tiket_dipakai[-1], usage)
+
+                if finish_reason == "length":
+                    # Fields already yielded stay valid; the rest comes from one non-streamed retry
+                    request = self._request_ulang_terpotong(request, usage, "analisis")
+                    result, analisis = self._proses_respons(*self._panggil_model(request, ulang_terpotong=False))
+                else:
+                    result, analisis = self._proses_respons(parser.buffer, usage)
+
+            except Exception as e:
+                registry.inc("penilai_panggilan_api_total", help="Panggilan API per status", panggilan="analisis", status="gagal")
+                raise AnalisisError(f"Error saat menganalisis prompt: {str(e)}") from e
+
+        except BaseException as e:
+            # Also covers the consumer abandoning the generator mid-stream
+            singleflight.selesai(kunci, panggilan, error=e)
+            raise
+
+        # Release waiters before touching storage, so nothing after this point can strand them
+        singleflight.selesai(kunci, panggilan, hasil=(result, analisis))
+        registry.inc("penilai_panggilan_api_total", help="Panggilan API per status", panggilan="analisis", status="sukses")
+        self._simpan(kunci, prompt, result)
+        self.catat_riwayat(prompt, analisis)
+        yield "selesai", analisis
+
+    async def _panggil_model_async(
+        self,
+        request: Dict[str, Any],
+        tier: Optional[str] = None,
+        panggilan: str = "analisis",
+        ulang_terpotong: bool = True,
+    ) -> Tuple[str, Any]:
+        fungsi = await self.penjadwal.per_percobaan_async(
+            self.sesi,
+            perkiraan_token_request(request, TOKEN_KELUARAN_ANALISIS),
+            lambda tiket: self.async_client.chat.completions.create(**request),
+            self.saat_antri,
+        )
+        mulai = time.perf_counter()
+        with timer("api", panggilan=panggilan):
+            response = await self.resilien.panggil_async(fungsi, panggilan=panggilan)
+        if tier is not None:
+            pelacak_cascade.catat_panggilan(
+                tier, request["model"], self.config["model"], time.perf_counter() - mulai, response.usage
+            )
+        if response.choices[0].finish_reason == "length":
+            if not ulang_terpotong:
+                raise self._terpotong(request)
+            request = self._request_ulang_terpotong(request, response.usage, panggilan)
+            return await self._panggil_model_async(request, tier, panggilan, ulang_terpotong=False)
+        return response.choices[0].message.content, response.usage
+
+    async def _analisis_cascade_async(self, prompt: str) -> Tuple[Dict[str, Any], AnalisisPrompt]:
+        """Versi async dari _analisis_cascade"""
+        alasan = alasan_eskalasi_awal(prompt, self.config["cascade_kata_maks"])
+        if alasan is None:
+            try:
+                respons = await self._panggil_model_async(
+                    self._request_analisis(prompt, self.config["cascade_model"]),
+                    tier="murah",
+                    panggilan="analisis_murah",
+                )
+                alasan = self._periksa_murah(*respons)
+            except (AntrianError, SirkuitTerbuka):
+                raise
+            except Exception as e:
+                logger.warning("Model cascade gagal, eskalasi ke model utama: %s", e)
+                alasan = "error_model_murah"
+            if alasan is None:
+                pelacak_cascade.catat_keputusan(None)
+                return self._proses_respons(*respons)
+        hasil = self._proses_respons(*await self._panggil_model_async(self._request_analisis(prompt), tier="utama"))
+        pelacak_cascade.catat_keputusan(alasan)
+        return hasil
+
+    async def _sub_analisis_async(
+        self,
+        prompt: str,
+        template: str,
+        max_tokens: int,
+        validasi: Callable[[Any], Dict[str, Any]],
+        pakai_cache: bool,
+    ) -> Dict[str, Any]:
+        """Versi async dari _sub_analisis"""
+        kunci = buat_kunci_cache(prompt, self.config["model"], self.config["temperature"], template)
+        result = await asyncio.to_thread(self._dari_cache, kunci, pakai_cache)
+        if result is not None:
+            return result
+        request = self._request_analisis(prompt, template=template, max_tokens=max_tokens)
+        konten, usage = await self._panggil_model_async(request, panggilan="analisis_paralel")
+        registry.catat_usage("analisis", usage)
+        with timer("parse_json"):
+            result = validasi(json.loads(konten))
+        await asyncio.to_thread(self.cache.set, kunci, prompt, result)
+        return result
+
+    async def _analisis_paralel_async(self, prompt: str, pakai_cache: bool) -> Tuple[Dict[str, Any], AnalisisPrompt]:
+        """Versi async dari _analisis_paralel; semua sub-request di event loop yang sama"""
+        *hasil, perbaikan = await asyncio.gather(
+            *(
+                self._sub_analisis_async(
+                    prompt, TEMPLATE_KRITERIA[nama], max_token_kriteria(nama),
+                    lambda result, nama=nama: validasi_kriteria(nama, result), pakai_cache,
+                )
+                for nama in BOBOT_KRITERIA
+            ),
+            self._sub_analisis_async(
+                prompt, self.template_perbaikan, self._max_token_perbaikan(prompt), validasi_perbaikan, pakai_cache
+            ),
+        )
+        return self._gabung_paralel(dict(zip(BOBOT_KRITERIA, hasil)), perbaikan)
+
+    async def _panggil_analisis_async(
+        self, prompt: str, kunci: str, pakai_cache: bool = True
+    ) -> Tuple[Dict[str, Any], AnalisisPrompt]:
+        try:
+            cadangan = await asyncio.to_thread(self._cadangan_sirkuit, kunci)
+            if cadangan is not None:
+                return cadangan, analisis_dari_dict(cadangan)
+            dikirim = self._siapkan(prompt)
+            if self.paralel:
+                result, analisis = await self._analisis_paralel_async(dikirim, pakai_cache)
+            elif self.config["cascade"]:
+                result, analisis = await self._analisis_cascade_async(dikirim)
+            else:
+                result, analisis = self._proses_respons(
+                    *await self._panggil_model_async(self._request_analisis(dikirim))
+                )
+
+        except Exception as e:
+            registry.inc("penilai_panggilan_api_total", help="Panggilan API per status", panggilan="analisis", status="gagal")
+            raise AnalisisError(f"Error saat menganalisis prompt: {str(e)}") from e
+
+        registry.inc("penilai_panggilan_api_total", help="Panggilan API per status", panggilan="analisis", status="sukses")
+        await asyncio.to_thread(self._simpan, kunci, prompt, result)
+        return result, analisis
+
+    async def analisis_prompt_async(self, prompt: str, pakai_cache: bool = True) -> AnalisisPrompt:
+        """Versi async dari analisis_prompt memakai AsyncOpenAI
+
+        Cache SQLite dan riwayat dijalankan di thread
+        lain supaya tidak memblok event loop (layanan HTTP, batch).
+        """
+
+        kunci = self.kunci_cache(prompt)
+        result = await asyncio.to_thread(self._dari_cache, kunci, pakai_cache)
+        if result is not None:
+            analisis = analisis_dari_dict(result)
+            await asyncio.to_thread(self.catat_riwayat, prompt, analisis, "cache")
+            return analisis
+
+        try:
+            _, analisis = await singleflight.jalankan_async(
+                kunci, lambda: self._panggil_analisis_async(prompt, kunci, pakai_cache)
+            )
+        except PanggilanDibatalkan as e:
+            raise AnalisisError(str(e)) from e
+        await asyncio.to_thread(self.catat_riwayat, prompt, analisis)
+        return analisis
+
+    def tips_kilat(self, analisis: AnalisisPrompt, prompt_asli: str) -> List[str]:
+        """Tips kilat memakai client dan model milik penilai ini"""
+        if analisis.tips_kilat:
+            return analisis.tips_kilat
+        return generate_tips_kilat(
+            analisis,
+            self.client,
+            self.anggaran(prompt_asli).prompt,
+            model=self.config["model"],
+            sesi=self.sesi,
+            penjadwal=self.penjadwal,
+            resilien=self.resilien,
+        )
+
+    async def tips_kilat_async(self, analisis: AnalisisPrompt, prompt_asli: str) -> List[str]:
+        """Versi async dari tips_kilat"""
+        if analisis.tips_kilat:
+            return analisis.tips_kilat
+        return await generate_tips_kilat_async(
+            analisis,
+            self.async_client,
+            self.anggaran(prompt_asli).prompt,
+            model=self.config["model"],
+            sesi=self.sesi,
+            penjadwal=self.penjadwal,
+            resilien=self.resilien,
+        )
+
+
+def tips_default(skor: int) -> List[str]:
+    """Tips cadangan berdasarkan skor saat API tidak bisa dipakai"""
+    if skor < 30:
+        return [
+            "🎯 Jelasin tujuan kamu lebih detail biar AI paham maksudnya",
+            "📝 Kasih instruksi yang step-by-step, biar AI gak bingung",
+            "🌟 Tambahin konteks yang lebih lengkap untuk hasil yang lebih baik"
+        ]
+    elif skor < 50:
+        return [
+            "📋 Tambahin 1-2 contoh biar AI tau persis yang kamu mau",
+            "🧠 Minta AI jelasin 'langkah demi langkah'",
+            "📐 Tentuin format output yang spesifik"
+        ]
+    elif skor < 75:
+        return [
+            "🎭 Kasih peran ke AI (misal: 'Kamu adalah ahli marketing')",
+            "🌳 Minta AI pertimbangkan beberapa opsi",
+            "✨ Sebutin tone yang diinginkan"
+        ]
+    else:
+        return [
+            "👑 Pertahanin konsistensi struktur yang udah bagus ini",
+            "🔮 Coba eksplorasi teknik lanjutan",
+            "💡 Eksperimen dengan variasi yang lebih kompleks"
+        ]
+
+
+def parse_tips(tips_text: str) -> List[str]:
+    """Pecah respons tips menjadi maksimal 4 baris rekomendasi"""
+    tips = [tip.strip() for tip in tips_text.split('\n') if tip.strip() and not tip.strip().startswith('#')]
+    return tips[:4]  # Maximum 4 tips
+
+
+def _request_tips(analisis: AnalisisPrompt, prompt_asli: str, model: Optional[str]) -> Dict[str, Any]:
+    with timer("template", panggilan="tips"):
+        konten = buat_prompt_tips(analisis, prompt_asli)
+    return dict(
+        model=model or get_config()["model"],
+        messages=[
+            {"role": "system", "content": SYSTEM_TIPS},
+            {"role": "user", "content": konten}
+        ],
+        temperature=0.7,
+        max_tokens=300
+    )
+
+
+def generate_tips_kilat(
+    analisis: AnalisisPrompt,
+    client,
+    prompt_asli: str,
+    model: Optional[str] = None,
+    sesi: str = "default",
+    penjadwal: Optional[PenjadwalAPI] = None,
+    resilien: Optional[Resilien] = None,
+) -> List[str]:
+    """Generate tips kilat berdasarkan analisis AI dan prompt asli"""
+    try:
+        request = _request_tips(analisis, prompt_asli, model)
+        penjadwal = penjadwal or get_penjadwal(get_config())
+        resilien = resilien or get_resilien(get_config())
+        fungsi = penjadwal.per_percobaan(
+            sesi,
+            perkiraan_token_request(request, TOKEN_KELUARAN_TIPS),
+            lambda tiket: client.chat.completions.create(**request),
+        )
+        with timer("api", panggilan="tips"):
+            response = resilien.panggil(fungsi, panggilan="tips")
+        registry.catat_usage("tips", response.usage)
+        registry.inc("penilai_panggilan_api_total", help="Panggilan API per status", panggilan="tips", status="sukses")
+        return parse_tips(response.choices[0].message.content)
+
+    except Exception as e:
+        registry.inc("penilai_panggilan_api_total", help="Panggilan API per status", panggilan="tips", status="gagal")
+        # Fallback ke tips lokal per prompt (atau tips default) jika API error
+        logger.warning("Tips kilat gagal, memakai tips lokal: %s", e)
+        return tips_lokal(prompt_asli) or tips_default(analisis.skor)
+
+
+async def generate_tips_kilat_async(
+    analisis: AnalisisPrompt,
+    client,
+    prompt_asli: str,
+    model: Optional[str] = None,
+    sesi: str = "default",
+    penjadwal: Optional[PenjadwalAPI] = None,
+    resilien: Optional[Resilien] = None,
+) -> List[str]:
+    """Versi async dari generate_tips_kilat; client berupa AsyncOpenAI"""
+    try:
+        request = _request_tips(analisis, prompt_asli, model)
+        penjadwal = penjadwal or get_penjadwal(get_config())
+        resilien = resilien or get_resilien(get_config())
+        fungsi = await penjadwal.per_percobaan_async(
+            sesi,
+            perkiraan_token_request(request, TOKEN_KELUARAN_TIPS),
+            lambda tiket: client.chat.completions.create(**request),
+        )
+        with timer("api", panggilan="tips"):
+            response = await resilien.panggil_async(fungsi, panggilan="tips")
+        registry.catat_usage("tips", response.usage)
+        registry.inc("penilai_panggilan_api_total", help="Panggilan API per status", panggilan="tips", status="sukses")
+        return parse_tips(response.choices[0].message.content)
+
+    except Exception as e:
+        registry.inc("penilai_panggilan_api_total", help="Panggilan API per status", panggilan="tips", status="gagal")
+        logger.warning("Tips kilat gagal, memakai tips lokal: %s", e)
+        return tips_lokal(prompt_asli) or tips_default(analisis.skor)
@@ -0,0 +1,211 @@
+"""Instrumentasi latency per tahap dan pemakaian token.
+
+Registry bersama per proses mencatat histogram durasi (dengan kuantil
+p50/p95/p99 dari sampel terbaru) dan counter. Setiap observasi juga
+dikirim sebagai log JSON terstruktur ke logger `penilai.metrics`.
+Nonaktif secara default; dinyalakan oleh APP_DEBUG atau METRICS_ENABLED.
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUCKET_DETIK = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+KUANTIL = (0.5, 0.95, 0.99)
+
+_Label = Tuple[Tuple[str, str], ...]
+
+
+def _label(labels: Dict[str, Any]) -> _Label:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_label(label: _Label, **tambahan: str) -> str:
+    pasangan = list(label) + list(tambahan.items())
+    if not pasangan:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pasangan) + "}"
+
+
+class Histogram:
+    """Histogram kumulatif ala Prometheus plus sampel terbaru untuk kuantil"""
+
+    def __init__(self, bucket: Tuple[float, ...] = BUCKET_DETIK, sampel: int = 2048):
+        self.bucket = bucket
+        self.hitungan_bucket = [0] * len(bucket)
+        self.count = 0
+        self.sum = 0.0
+        self.sampel: Deque[float] = deque(maxlen=sampel)
+
+    def observe(self, nilai: float) -> None:
+        self.count += 1
+        self.sum += nilai
+        self.sampel.append(nilai)
+        for i, batas in enumerate(self.bucket):
+            if nilai <= batas:
+                self.hitungan_bucket[i] += 1
+
+    def kuantil(self, q: float) -> float:
+        if not self.sampel:
+            return 0.0
+        data = sorted(self.sampel)
+        return data[min(int(q * len(data)), len(data) - 1)]
+
+
+class Registry:
+    """Kumpulan histogram, counter, dan gauge untuk satu proses"""
+
+    def __init__(self):
+        self.aktif = False
+        self._lock = threading.Lock()
+        self._histogram: Dict[str, Dict[_Label, Histogram]] = {}
+        self._counter: Dict[str, Dict[_Label, float]] = {}
+        self._gauge: Dict[str, Callable[[], float]] = {}
+        self._help: Dict[str, str] = {}
+
+    def observe(self, nama: str, nilai: float, help: str = "", **labels: Any) -> None:
+        if not self.aktif:
+            return
+        label = _label(labels)
+        with self._lock:
+            seri = self._histogram.setdefault(nama, {})
+            if label not in seri:
+                seri[label] = Histogram()
+            seri[label].observe(nilai)
+            if help:
+                self._help.setdefault(nama, help)
+        logger.info(json.dumps({"metric": nama, "nilai": round(nilai, 6), **labels}, ensure_ascii=False))
+
+    def inc(self, nama: str, nilai: float = 1, help: str = "", **labels: Any) -> None:
+        if not self.aktif:
+            return
+        label = _label(labels)
+        with self._lock:
+            seri = self._counter.setdefault(nama, {})
+            seri[label] = seri.get(label, 0) + nilai
+            if help:
+                self._help.setdefault(nama, help)
+
+    def gauge(self, nama: str, fungsi: Callable[[], float], help: str = "") -> None:
+        """Daftarkan gauge yang nilainya dibaca saat snapshot"""
+        with self._lock:
+            self._gauge[nama] = fungsi
+            if help:
+                self._help[nama] = help
+
+    @contextmanager
+    def timer(self, tahap: str, **labels: Any) -> Iterator[None]:
+        """Catat durasi blok kode sebagai tahap evaluasi"""
+        if not self.aktif:
+            yield
+            return
+        mulai = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(
+                "penilai_tahap_durasi_detik",
+                time.perf_counter() - mulai,
+                help="Durasi tiap tahap evaluasi prompt",
+                tahap=tahap,
+                **labels,
+            )
+
+    def catat_usage(self, panggilan: str, usage: Any) -> None:
+        """Catat token prompt/completion dari objek usage respons OpenAI"""
+        if not self.aktif or usage is None:
+            return
+        for jenis in ("prompt", "completion"):
+            self.inc(
+                "penilai_token_total",
+                getattr(usage, f"{jenis}_tokens", 0) or 0,
+                help="Token yang dipakai per jenis panggilan",
+                panggilan=panggilan,
+                jenis=jenis,
+            )
+        logger.info(json.dumps({
+            "metric": "penilai_token",
+            "panggilan": panggilan,
+            "prompt_tokens": getattr(usage, "prompt_tokens", None),
+            "completion_tokens": getattr(usage, "completion_tokens", None),
+        }))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Ringkasan p50/p95/p99 per seri histogram plus semua counter"""
+        with self._lock:
+            hasil: Dict[str, Any] = {}
+            for nama, seri in self._histogram.items():
+                for label, h in seri.items():
+                    kunci = nama + _format_label(label)
+                    hasil[kunci] = {
+                        "count": h.count,
+                        "sum": round(h.sum, 6),
+                        **{f"p{int(q * 100)}": round(h.kuantil(q), 6) for q in KUANTIL},
+                    }
+            for nama, seri in self._counter.items():
+                for label, nilai in seri.items():
+                    hasil[nama + _format_label(label)] = nilai
+            gauge = dict(self._gauge)
+        for nama, fungsi in gauge.items():
+            hasil[nama] = fungsi()
+        return hasil
+
+    def prometheus(self) -> str:
+        """Snapshot dalam format teks eksposisi Prometheus"""
+        baris: List[str] = []
+        with self._lock:
+            for nama, seri in self._histogram.items():
+                baris.append(f"# HELP {nama} {self._help.get(nama, nama)}")
+                baris.append(f"# TYPE {nama} histogram")
+                for label, h in seri.items():
+                    for batas, jumlah in zip(h.bucket, h.hitungan_bucket):
+                        baris.append(f"{nama}_bucket{_format_label(label, le=str(batas))} {jumlah}")
+                    baris.append(f'{nama}_bucket{_format_label(label, le="+Inf")} {h.count}')
+                    baris.append(f"{nama}_sum{_format_label(label)} {h.sum:.6f}")
+                    baris.append(f"{nama}_count{_format_label(label)} {h.count}")
+                # Quantiles from recent samples, exposed as a separate summary metric
+                nama_kuantil = f"{nama}_kuantil"
+                baris.append(f"# HELP {nama_kuantil} {self._help.get(nama, nama)} (kuantil sampel terbaru)")
+                baris.append(f"# TYPE {nama_kuantil} summary")
+                for label, h in seri.items():
+                    for q in KUANTIL:
+                        baris.append(f"{nama_kuantil}{_format_label(label, quantile=str(q))} {h.kuantil(q):.6f}")
+                    # A summary needs its own _sum/_count series; like client libraries, these are cumulative
+                    baris.append(f"{nama_kuantil}_sum{_format_label(label)} {h.sum:.6f}")
+                    baris.append(f"{nama_kuantil}_count{_format_label(label)} {h.count}")
+            for nama, seri in self._counter.items():
+                baris.append(f"# HELP {nama} {self._help.get(nama, nama)}")
+                baris.append(f"# TYPE {nama} counter")
+                for label, nilai in seri.items():
+                    baris.append(f"{nama}{_format_label(label)} {nilai:g}")
+            gauge = dict(self._gauge)
+            help_gauge = {nama: self._help.get(nama, nama) for nama in gauge}
+        for nama, fungsi in gauge.items():
+            baris.append(f"# HELP {nama} {help_gauge[nama]}")
+            baris.append(f"# TYPE {nama} gauge")
+            baris.append(f"{nama} {fungsi():g}")
+        return "\n".join(baris) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histogram.clear()
+            self._counter.clear()
+
+
+registry = Registry()
+
+
+def metrik_aktif(config: Dict[str, Any]) -> bool:
+    """METRICS_ENABLED jika diset, selain itu ikut APP_DEBUG"""
+    nilai: Optional[bool] = config.get("metrics_enabled")
+    return bool(config.get("app_debug")) if nilai is None else nilai
+
+
+def timer(tahap: str, **labels: Any):
+    """Shortcut registry.timer untuk registry bersama"""
+    return registry.timer(tahap, **labels)
@@ -0,0 +1,190 @@
+"""Indeks prompt mirip (near-duplicate) untuk memakai ulang analisis lama.
+
+Setiap prompt yang pernah dinilai diringkas jadi sidik MinHash dari
+himpunan kata dan pasangan kata (bigram) teks yang sudah dinormalisasi
+(huruf kecil, tanpa tanda baca, spasi dirapikan). Kemiripan dua prompt
+adalah perkiraan Jaccard kedua himpunan itu: prompt yang hanya beda spasi,
+tanda baca, atau kapitalisasi identik; edit satu kata pada prompt 30 kata
+masih sekitar 0,9. Sidik dibuat dengan one-permutation hashing (satu hash
+per fitur, dibagi ke `BIN` bin) supaya cukup satu lintasan, lalu dipecah
+jadi `PITA` pita untuk LSH: hanya prompt yang sama persis di minimal satu
+pita yang dibandingkan, sehingga lookup tetap di bawah 1 ms pada 100 ribu
+prompt (`python -m benchmarks.bench_mirip`).
+"""
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+BIN = 32
+PITA = 8
+_BARIS = BIN // PITA
+_BIT_BIN = BIN.bit_length() - 1
+_MASK = (1 << 64) - 1
+# Above every genuine bin value (hash >> _BIT_BIN)
+_KOSONG = 1 << (64 - _BIT_BIN)
+_BUKAN_KATA = re.compile(r"[^\w\s]+")
+_SPASI = re.compile(r"\s+")
+
+
+def normalisasi_mirip(prompt: str) -> str:
+    """Teks pembanding: huruf kecil, tanda baca jadi spasi, spasi beruntun dirapikan"""
+    teks = unicodedata.normalize("NFKC", prompt).lower()
+    return _SPASI.sub(" ", _BUKAN_KATA.sub(" ", teks)).strip()
+
+
+def sidik_minhash(teks: str) -> Tuple[int, ...]:
+    """Sidik MinHash `BIN` nilai dari kata + bigram kata `teks` (sudah dinormalisasi)
+
+    Memakai hash() bawaan: sidik hanya konsisten dalam satu proses, dan
+    indeks memang dibangun ulang dari teks prompt setiap kali proses mulai.
+    """
+    kata = teks.split()
+    sidik = [_KOSONG] * BIN
+    for fitur in (*kata, *zip(kata, kata[1:])) or ("",):
+        h = hash(fitur) & _MASK
+        nilai = h >> _BIT_BIN
+        if nilai < sidik[h & (BIN - 1)]:
+            sidik[h & (BIN - 1)] = nilai
+    # Densify: an empty bin borrows the next filled bin to its right (wrapping), offset past the range
+    # of genuine values by the hop count so borrowed and genuine values never collide
+    asli = sidik[:]
+    for i in range(BIN):
+        if asli[i] == _KOSONG:
+            hop = next(hop for hop in range(1, BIN) if asli[(i + hop) % BIN] != _KOSONG)
+            sidik[i] = asli[(i + hop) % BIN] + hop * _KOSONG
+    return tuple(sidik)
+
+
+def kemiripan(sidik_a: Tuple[int, ...], sidik_b: Tuple[int, ...]) -> float:
+    """Perkiraan kemiripan Jaccard: porsi bin yang nilainya sama"""
+    return sum(a == b for a, b in zip(sidik_a, sidik_b)) / BIN
+
+
+def _pita(sidik: Tuple[int, ...]) -> List[int]:
+    return [hash(sidik[i:i + _BARIS]) for i in range(0, BIN, _BARIS)]
+
+
+@dataclass
+class PromptMirip:
+    prompt: str
+    kemiripan: float
+    # Same text after normalisasi_mirip: only whitespace, punctuation or case changed
+    identik: bool
+
+
+class IndeksMirip:
+    """Indeks MinHash LSH untuk prompt yang pernah dinilai; thread-safe
+
+    `ambang` adalah kemiripan minimal (0-1) untuk dianggap mirip. Entri
+    tertua dibuang begitu isi melebihi `maks`.
+    """
+
+    def __init__(self, ambang: float = 0.8, maks: int = 100_000):
+        if not 0 < ambang <= 1:
+            raise ValueError("ambang kemiripan harus di antara 0 dan 1")
+        self.ambang = ambang
+        self.maks = maks
+        # One dict per band: band hash -> ids sharing it (almost always a single id)
+        self._bucket: List[Dict[int, List[int]]] = [{} for _ in range(PITA)]
+        # id -> (sidik, normalized text, prompt); insertion order doubles as eviction order
+        self._entri: "OrderedDict[int, Tuple[Tuple[int, ...], str, str]]" = OrderedDict()
+        self._id_teks: Dict[str, int] = {}
+        self._id_berikut = 0
+        self._lock = threading.Lock()
+        self.dimuat = False
+        self.lookup = 0
+        self.ketemu = 0
+
+    def __len__(self) -> int:
+        return len(self._entri)
+
+    def _hapus(self, id_: int) -> None:
+        sidik, teks, _ = self._entri.pop(id_)
+        del self._id_teks[teks]
+        for kunci, bucket in zip(_pita(sidik), self._bucket):
+            isi = bucket[kunci]
+            isi.remove(id_)
+            if not isi:
+                del bucket[kunci]
+
+    def _tambah(self, prompt: str, teks: str, sidik: Tuple[int, ...]) -> None:
+        lama = self._id_teks.get(teks)
+        if lama is not None:
+            self._hapus(lama)
+        id_ = self._id_berikut
+        self._id_berikut += 1
+        self._entri[id_] = (sidik, teks, prompt)
+        self._id_teks[teks] = id_
+        for kunci, bucket in zip(_pita(sidik), self._bucket):
+            bucket.setdefault(kunci, []).append(id_)
+        while len(self._entri) > self.maks:
+            self._hapus(next(iter(self._entri)))
+
+    def tambah(self, prompt: str) -> None:
+        """Daftarkan prompt yang baru dinilai (prompt sama persis hanya menyegarkan entrinya)"""
+        teks = normalisasi_mirip(prompt)
+        sidik = sidik_minhash(teks)
+        with self._lock:
+            self._tambah(prompt, teks, sidik)
+
+    def muat(self, prompts: Iterable[str]) -> None:
+        """Isi indeks dari daftar prompt lama (urut dari yang tertua)"""
+        for prompt in prompts:
+            self.tambah(prompt)
+        self.dimuat = True
+
+    def cari_sidik(self, sidik: Tuple[int, ...], teks: str = "") -> Optional[PromptMirip]:
+        """Entri termirip dengan kemiripan >= ambang, atau None"""
+        pita = _pita(sidik)
+        with self._lock:
+            self.lookup += 1
+            id_ = self._id_teks.get(teks)
+            if id_ is not None:
+                self.ketemu += 1
+                return PromptMirip(prompt=self._entri[id_][2], kemiripan=1.0, identik=True)
+            kandidat = {id_ for kunci, bucket in zip(pita, self._bucket) for id_ in bucket.get(kunci, ())}
+            terbaik, nilai_terbaik = None, self.ambang
+            for id_ in kandidat:
+                nilai = kemiripan(sidik, self._entri[id_][0])
+                if nilai >= nilai_terbaik:
+                    terbaik, nilai_terbaik = id_, nilai
+            if terbaik is None:
+                return None
+            self.ketemu += 1
+            return PromptMirip(prompt=self._entri[terbaik][2], kemiripan=nilai_terbaik, identik=False)
+
+    def cari(self, prompt: str) -> Optional[PromptMirip]:
+        """Prompt lama yang paling mirip dengan `prompt`, atau None"""
+        teks = normalisasi_mirip(prompt)
+        return self.cari_sidik(sidik_minhash(teks), teks)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entri": len(self._entri),
+                "dimuat": self.dimuat,
+                "ambang": self.ambang,
+                "lookup": self.lookup,
+                "ketemu": self.ketemu,
+            }
+
+
+_lock = threading.Lock()
+_indeks: Dict[Tuple, IndeksMirip] = {}
+
+
+def get_indeks_mirip(config: Dict[str, Any], cache) -> IndeksMirip:
+    """Indeks bersama per proses; diisi di background dari kolom prompt tabel cache"""
+    kunci = (cache.path, config["mirip_ambang"], config["cache_max_entries"])
+    with _lock:
+        if kunci in _indeks:
+            return _indeks[kunci]
+        indeks = _indeks[kunci] = IndeksMirip(config["mirip_ambang"], maks=config["cache_max_entries"])
+    # Fingerprinting thousands of stored prompts takes a moment; lookups just see a partial index meanwhile
+    threading.Thread(
+        target=lambda: indeks.muat(cache.daftar_prompt()), name="penilai-indeks-mirip", daemon=True
+    ).start()
+    return indeks
@@ -0,0 +1,62 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List
+
+
+# Teknik Prompt Engineering
+class TeknikPrompt(Enum):
+    ZERO_SHOT = "Zero-Shot"
+    FEW_SHOT = "Few-Shot"
+    CHAIN_OF_THOUGHT = "Chain of Thought"
+    TREE_OF_THOUGHTS = "Tree of Thoughts"
+
+@dataclass
+class TeknikInfo:
+    teknik: str
+    alasan: str
+
+@dataclass
+class AnalisisPrompt:
+    skor: int
+    jenis_tugas: str
+    teknik_sesuai: List[str]
+    teknik_ditemukan: List[TeknikInfo]
+    teknik_disarankan: List[TeknikInfo]
+    kelebihan: List[str]
+    kekurangan: List[str]
+    rekomendasi: List[str]
+    versi_perbaikan: str
+    # Hanya terisi pada mode tips "gabung" (tips ikut di respons analisis)
+    tips_kilat: List[str] = field(default_factory=list)
+    # "model" untuk hasil GPT, "lokal" untuk fallback dari pra-penilaian lokal
+    sumber: str = "model"
+    # Hanya terisi pada mode analisis "paralel": skor 0-100 per kriteria framework
+    skor_kriteria: Dict[str, int] = field(default_factory=dict)
+
+def analisis_dari_dict(result: Dict) -> AnalisisPrompt:
+    """Bangun AnalisisPrompt dari dict JSON hasil model"""
+    # Parse teknik_ditemukan and teknik_disarankan
+    teknik_ditemukan = [
+        TeknikInfo(teknik=item["teknik"], alasan=item["alasan"])
+        for item in result["teknik_ditemukan"]
+    ] if result["teknik_ditemukan"] else []
+
+    teknik_disarankan = [
+        TeknikInfo(teknik=item["teknik"], alasan=item["alasan"])
+        for item in result["teknik_disarankan"]
+    ] if result["teknik_disarankan"] else []
+
+    return AnalisisPrompt(
+        skor=result["skor"],
+        jenis_tugas=result["jenis_tugas"],
+        teknik_sesuai=result["teknik_sesuai"],
+        teknik_ditemukan=teknik_ditemukan,
+        teknik_disarankan=teknik_disarankan,
+        kelebihan=result["kelebihan"],
+        kekurangan=result["kekurangan"],
+        rekomendasi=result["rekomendasi"],
+        versi_perbaikan=result["versi_perbaikan"],
+        tips_kilat=[tip.strip() for tip in result.get("tips_kilat") or [] if tip.strip()][:4],
+        sumber=result.get("sumber", "model"),
+        skor_kriteria=result.get("skor_kriteria") or {}
+    )
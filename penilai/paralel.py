@@ -0,0 +1,81 @@
+"""Mode analisis paralel: lima kriteria framework + versi perbaikan sebagai request terpisah.
+
+Tiap sub-request kecil dan dibatasi max_tokens, jalan bersamaan, dan
+di-cache sendiri-sendiri. Skor total dihitung lokal dari skor per kriteria
+dengan bobot 25/20/20/20/15, lalu hasilnya digabung jadi dict yang sama
+bentuknya dengan respons mode tunggal (plus `skor_kriteria`).
+"""
+from typing import Any, Dict, List
+
+from penilai.templates import KRITERIA
+
+MODE_ANALISIS = ("tunggal", "paralel")
+
+BOBOT_KRITERIA = {nama: bobot for nama, _, bobot, _ in KRITERIA}
+
+# Output caps per sub-request; the technique criterion also classifies the task
+MAX_TOKEN_KRITERIA = 300
+MAX_TOKEN_TEKNIK = 500
+MAX_TOKEN_PERBAIKAN = 800
+
+# Cap on merged recommendations, same as "3-4 saran" in the single-call template
+_REKOMENDASI_MAKS = 4
+
+
+def max_token_kriteria(nama: str) -> int:
+    return MAX_TOKEN_TEKNIK if nama == "technique" else MAX_TOKEN_KRITERIA
+
+
+def validasi_kriteria(nama: str, result: Any) -> Dict[str, Any]:
+    """Kembalikan result jika sesuai skema sub-request kriteria, selain itu ValueError"""
+    if not isinstance(result, dict):
+        raise ValueError(f"kriteria {nama}: respons bukan objek JSON")
+    skor = result.get("skor")
+    if isinstance(skor, bool) or not isinstance(skor, (int, float)) or not 0 <= skor <= 100:
+        raise ValueError(f"kriteria {nama}: skor tidak valid: {skor!r}")
+    for kunci in ("kelebihan", "kekurangan", "rekomendasi"):
+        if not isinstance(result.get(kunci, []), list):
+            raise ValueError(f"kriteria {nama}: {kunci} bukan list")
+    return result
+
+
+def validasi_perbaikan(result: Any) -> Dict[str, Any]:
+    if not isinstance(result, dict) or not isinstance(result.get("versi_perbaikan"), str):
+        raise ValueError("perbaikan: versi_perbaikan tidak ada")
+    return result
+
+
+def skor_total(skor_kriteria: Dict[str, float]) -> int:
+    """Skor 0-100 dari skor per kriteria (masing-masing 0-100) dengan BOBOT_KRITERIA"""
+    return round(sum(skor_kriteria[nama] * bobot for nama, bobot in BOBOT_KRITERIA.items()) / 100)
+
+
+def _teknik(daftar: Any) -> List[Dict[str, str]]:
+    return [item for item in daftar or [] if isinstance(item, dict) and "teknik" in item and "alasan" in item]
+
+
+def _daftar(hasil: Dict[str, Dict[str, Any]], urutan: List[str], kunci: str) -> List[str]:
+    return [item for nama in urutan for item in hasil[nama].get(kunci) or [] if isinstance(item, str) and item.strip()]
+
+
+def gabung_hasil(kriteria: Dict[str, Dict[str, Any]], perbaikan: Dict[str, Any]) -> Dict[str, Any]:
+    """Satukan hasil per kriteria dan versi perbaikan jadi dict hasil analisis"""
+    skor_kriteria = {nama: round(kriteria[nama]["skor"]) for nama in BOBOT_KRITERIA}
+    # Weakest criteria first, so the capped recommendation list targets the biggest gains
+    terlemah = sorted(BOBOT_KRITERIA, key=lambda nama: (skor_kriteria[nama], -BOBOT_KRITERIA[nama]))
+    teknik = kriteria["technique"]
+    result = {
+        "skor": skor_total(skor_kriteria),
+        "jenis_tugas": teknik.get("jenis_tugas") or "belum diketahui",
+        "teknik_sesuai": teknik.get("teknik_sesuai") or [],
+        "teknik_ditemukan": _teknik(teknik.get("teknik_ditemukan")),
+        "teknik_disarankan": _teknik(teknik.get("teknik_disarankan")),
+        "kelebihan": _daftar(kriteria, list(BOBOT_KRITERIA), "kelebihan"),
+        "kekurangan": _daftar(kriteria, terlemah, "kekurangan"),
+        "rekomendasi": _daftar(kriteria, terlemah, "rekomendasi")[:_REKOMENDASI_MAKS],
+        "versi_perbaikan": perbaikan["versi_perbaikan"],
+        "skor_kriteria": skor_kriteria,
+    }
+    if perbaikan.get("tips_kilat"):
+        result["tips_kilat"] = perbaikan["tips_kilat"]
+    return result
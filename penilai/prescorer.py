@@ -0,0 +1,168 @@
+"""Pra-penilaian lokal yang deterministik: deteksi teknik dan fitur struktur prompt.
+
+Murni regex, tanpa panggilan jaringan, jadi hasilnya keluar dalam hitungan
+mikrodetik. Dipakai sebagai hasil sementara selama model bekerja dan sebagai
+fallback per prompt saat API tidak bisa dihubungi.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from penilai.model import AnalisisPrompt, TeknikInfo, TeknikPrompt
+
+# Patterns run on the lower-cased prompt; cheaper than re.IGNORECASE on every alternation
+_F = re.MULTILINE
+
+# Blok contoh: "Contoh 1:", "Example:", atau pasangan Input/Output berulang
+_CONTOH = re.compile(r"^\s*(?:contoh|example|sample)\s*\d*\s*:", _F)
+_PASANGAN_IO = re.compile(r"^\s*(?:input|masukan|pertanyaan|q)\s*:", _F)
+_LANGKAH = re.compile(
+    r"step[\s-]by[\s-]step|langkah demi langkah|langkah[\s-]langkah|tahap demi tahap|"
+    r"pikirkan (?:secara )?(?:bertahap|runtut)|think (?:through|carefully)|jelaskan (?:alasan|penalaran)|reasoning",
+    _F,
+)
+_EKSPLORASI = re.compile(
+    r"eksplorasi|explore|beberapa (?:ide|opsi|alternatif|pendekatan|skenario)|"
+    r"\d+ (?:ide|opsi|alternatif|pendekatan|skenario)|bandingkan|compare|pertimbangkan|alternatives?",
+    _F,
+)
+_BUTIR_BERNOMOR = re.compile(r"^\s*(?:\d+|[a-z])[.)]\s+\S", _F)
+_BUTIR = re.compile(r"^\s*[-*•]\s+\S", _F)
+_FORMAT = re.compile(
+    r"\b\d+\s*(?:paragraf|kalimat|kata|poin|bullet|baris|paragraphs?|sentences?|words?)\b|"
+    r"\bformat\b|\bjson\b|\btabel\b|\btable\b|\bbullet|\bnumbered\b|\bmarkdown\b|\bbreakdown\b|\bdaftar\b",
+    _F,
+)
+_PERAN = re.compile(
+    r"\b(?:kamu|anda|you)\s+(?:adalah|are)\b|\bact as\b|\bbertindak sebagai\b|\bberperan sebagai\b|\bsebagai seorang\b",
+    _F,
+)
+_AUDIENS = re.compile(r"\buntuk (?:pemula|anak|siswa|mahasiswa|profesional|orang awam|audiens|target)|\btarget\b|\baudien", _F)
+_BATASAN = re.compile(
+    r"\bmaksimal\b|\bminimal\b|\bmaximum\b|\bminimum\b|\bjangan\b|\bhindari\b|\btidak boleh\b|\bdon'?t\b|\bavoid\b|"
+    r"\bbudget\b|\bmodal\b|\bbatas\b|\bhanya\b|\bonly\b",
+    _F,
+)
+
+# Bobot fitur untuk skor perkiraan
+_BOBOT = {
+    "peran": 10,
+    "format_output": 15,
+    "contoh": 10,
+    "langkah": 10,
+    "opsi": 5,
+    "konteks": 10,
+    "batasan": 10,
+}
+_SKOR_DASAR = 25
+# Local estimates never reach the "Excellent" bands (tips >= 80, meter >= 90): only the model may award them
+_SKOR_LOKAL_MAKS = 79
+
+_TIPS_FITUR = {
+    "format_output": "📐 Tentuin format output yang spesifik (jumlah paragraf, bullet, tabel, atau JSON)",
+    "konteks": "🌟 Tambahin konteks: siapa target audiensnya dan hasilnya mau dipakai buat apa",
+    "peran": "🎭 Kasih peran ke AI (misal: 'Kamu adalah ahli marketing')",
+    "batasan": "🚧 Sebutin batasan yang jelas (panjang maksimal, hal yang harus dihindari)",
+    "contoh": "📋 Tambahin 1-2 contoh biar AI tau persis format yang kamu mau",
+    "langkah": "🧠 Minta AI mikir 'step by step' kalau tugasnya butuh penalaran",
+    "opsi": "🌳 Minta AI pertimbangkan beberapa opsi sebelum kasih rekomendasi",
+}
+
+
+@dataclass
+class PraAnalisis:
+    teknik: List[TeknikInfo]
+    fitur: Dict[str, bool]
+    skor_perkiraan: int
+    jumlah_kata: int
+    tips: List[str] = field(default_factory=list)
+
+
+def _kutip(match: Optional[re.Match], prompt: str) -> str:
+    if match is None:
+        return ""
+    awal = prompt.rfind("\n", 0, match.start()) + 1
+    akhir = prompt.find("\n", match.end())
+    baris = prompt[awal:akhir if akhir != -1 else len(prompt)].strip()
+    return f' ("{baris[:80]}")'
+
+
+def pra_analisis(prompt: str) -> PraAnalisis:
+    """Deteksi teknik TeknikPrompt dan fitur struktur prompt secara lokal"""
+    teks = prompt.lower()
+    jumlah_kata = len(teks.split())
+    contoh = _CONTOH.search(teks)
+    jumlah_contoh = len(_CONTOH.findall(teks))
+    if not jumlah_contoh:
+        jumlah_io = len(_PASANGAN_IO.findall(teks))
+        jumlah_contoh = jumlah_io if jumlah_io >= 2 else 0
+    langkah = _LANGKAH.search(teks)
+    eksplorasi = _EKSPLORASI.search(teks)
+    butir_bernomor = len(_BUTIR_BERNOMOR.findall(teks))
+    # lower() can change length for a few Unicode characters; quote from the same text the offsets came from
+    asal = prompt if len(teks) == len(prompt) else teks
+
+    fitur = {
+        "contoh": jumlah_contoh > 0,
+        "langkah": langkah is not None,
+        "opsi": butir_bernomor >= 2 or len(_BUTIR.findall(teks)) >= 2,
+        "format_output": _FORMAT.search(teks) is not None,
+        "peran": _PERAN.search(teks) is not None,
+        "konteks": jumlah_kata >= 25 or _AUDIENS.search(teks) is not None,
+        "batasan": _BATASAN.search(teks) is not None,
+    }
+
+    teknik: List[TeknikInfo] = []
+    if jumlah_contoh:
+        teknik.append(TeknikInfo(
+            teknik=TeknikPrompt.FEW_SHOT.value,
+            alasan=f"Terdeteksi {jumlah_contoh} blok contoh{_kutip(contoh, asal)}"
+        ))
+    if langkah:
+        teknik.append(TeknikInfo(
+            teknik=TeknikPrompt.CHAIN_OF_THOUGHT.value,
+            alasan=f"Ada instruksi penalaran bertahap{_kutip(langkah, asal)}"
+        ))
+    if eksplorasi and butir_bernomor >= 2:
+        teknik.append(TeknikInfo(
+            teknik=TeknikPrompt.TREE_OF_THOUGHTS.value,
+            alasan=f"Meminta eksplorasi beberapa cabang/opsi{_kutip(eksplorasi, asal)}"
+        ))
+    if not teknik:
+        teknik.append(TeknikInfo(
+            teknik=TeknikPrompt.ZERO_SHOT.value,
+            alasan="Instruksi langsung tanpa contoh maupun penalaran bertahap"
+        ))
+
+    skor = _SKOR_DASAR + sum(bobot for nama, bobot in _BOBOT.items() if fitur[nama])
+    if jumlah_kata < 8:
+        skor -= 10
+    skor = max(0, min(skor, _SKOR_LOKAL_MAKS))
+
+    tips = [_TIPS_FITUR[nama] for nama in _TIPS_FITUR if not fitur[nama]][:4]
+    return PraAnalisis(teknik=teknik, fitur=fitur, skor_perkiraan=skor, jumlah_kata=jumlah_kata, tips=tips)
+
+
+def tips_lokal(prompt: str) -> List[str]:
+    """Tips spesifik untuk prompt ini berdasarkan fitur yang belum ada"""
+    return pra_analisis(prompt).tips
+
+
+def analisis_lokal(prompt: str) -> AnalisisPrompt:
+    """AnalisisPrompt sementara dari pra-analisis lokal, untuk fallback saat API gagal"""
+    pra = pra_analisis(prompt)
+    ada = [nama.replace("_", " ") for nama, nilai in pra.fitur.items() if nilai]
+    kurang = [nama.replace("_", " ") for nama, nilai in pra.fitur.items() if not nilai]
+    return AnalisisPrompt(
+        skor=pra.skor_perkiraan,
+        jenis_tugas="belum diketahui (analisis lokal)",
+        teknik_sesuai=[t.teknik for t in pra.teknik],
+        teknik_ditemukan=pra.teknik,
+        teknik_disarankan=[],
+        kelebihan=[f"Prompt sudah punya {nama}" for nama in ada],
+        kekurangan=[f"Belum ada {nama}" for nama in kurang],
+        rekomendasi=pra.tips,
+        versi_perbaikan="",
+        tips_kilat=pra.tips,
+        sumber="lokal"
+    )
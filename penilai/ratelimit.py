@@ -0,0 +1,356 @@
+"""Penjadwal panggilan API bersama: token bucket RPM + TPM dengan antrian adil per sesi.
+
+Setiap panggilan chat completion meminta izin dulu dengan perkiraan jumlah
+token. Izin diberikan bergiliran (round-robin) antar sesi, jadi satu
+pengguna yang mengirim banyak prompt tidak bisa menghabiskan kuota
+pengguna lain. Kalau antrian terlalu panjang atau menunggu terlalu lama,
+request ditolak lebih awal (backpressure) alih-alih menumpuk jadi 429.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from penilai.metrics import registry
+
+T = TypeVar("T")
+
+# Bucket size as seconds of quota: allows short bursts without front-loading a whole minute
+_DETIK_LEDAKAN = 10.0
+# Rough chars-per-token for mixed Indonesian/English text
+_KARAKTER_PER_TOKEN = 3.5
+# Expected completion sizes when the request does not cap max_tokens
+TOKEN_KELUARAN_ANALISIS = 800
+TOKEN_KELUARAN_TIPS = 300
+
+
+class AntrianError(Exception):
+    """Request ditolak penjadwal: antrian penuh atau menunggu terlalu lama"""
+
+
+def perkiraan_token(*teks: str, keluaran: int = 0) -> int:
+    """Perkiraan kasar token prompt (dari panjang teks) ditambah token keluaran"""
+    return int(sum(len(t) for t in teks) / _KARAKTER_PER_TOKEN) + keluaran
+
+
+def perkiraan_token_request(request: Dict[str, Any], keluaran: int) -> int:
+    """Perkiraan token untuk kwargs chat.completions.create; max_tokens menggantikan `keluaran` jika ada"""
+    return perkiraan_token(
+        *(pesan["content"] for pesan in request["messages"]),
+        keluaran=request.get("max_tokens") or keluaran,
+    )
+
+
+class TokenBucket:
+    """Token bucket klasik; tidak thread-safe sendiri, dijaga oleh lock penjadwal"""
+
+    def __init__(self, per_menit: float, detik_ledakan: float = _DETIK_LEDAKAN):
+        self.per_detik = per_menit / 60
+        self.kapasitas = max(1.0, self.per_detik * detik_ledakan)
+        self.isi = self.kapasitas
+        self._terakhir = time.monotonic()
+
+    def _isi_ulang(self, sekarang: float) -> None:
+        self.isi = min(self.kapasitas, self.isi + (sekarang - self._terakhir) * self.per_detik)
+        self._terakhir = sekarang
+
+    def tunggu_untuk(self, jumlah: float, sekarang: float) -> float:
+        """Detik sampai `jumlah` tersedia (0 jika sudah cukup)"""
+        self._isi_ulang(sekarang)
+        jumlah = min(jumlah, self.kapasitas)
+        return 0.0 if self.isi >= jumlah else (jumlah - self.isi) / self.per_detik
+
+    def ambil(self, jumlah: float) -> None:
+        self.isi -= min(jumlah, self.kapasitas)
+
+    def koreksi(self, selisih: float) -> None:
+        # Negative balance is allowed: underestimated calls are paid back before the next grant
+        self.isi = min(self.kapasitas, self.isi + selisih)
+
+
+class Tiket:
+    """Satu permintaan izin di antrian penjadwal"""
+
+    def __init__(self, sesi: str, token: int):
+        self.sesi = sesi
+        self.token = token
+        self.diberi = False
+        self.dibuat = time.monotonic()
+
+
+class PenjadwalAPI:
+    """Antrian round-robin per sesi di depan dua token bucket (request dan token per menit)
+
+    rpm/tpm 0 berarti tanpa batas untuk dimensi itu; kalau keduanya 0,
+    minta() langsung memberi izin tanpa antri.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, antrian_maks: int = 200, timeout: float = 120.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.antrian_maks = antrian_maks
+        self.timeout = timeout
+        self._bucket_request = TokenBucket(rpm) if rpm else None
+        self._bucket_token = TokenBucket(tpm) if tpm else None
+        self._cond = threading.Condition()
+        # Ring of sessions with waiting tickets; the first session is served next
+        self._antrian: "OrderedDict[str, Deque[Tiket]]" = OrderedDict()
+        self._panjang = 0
+        self.diberi = 0
+        self.ditolak = 0
+        self.total_tunggu = 0.0
+        registry.gauge("penilai_antrian_panjang", lambda: self._panjang, help="Request yang sedang antri di penjadwal")
+
+    @property
+    def aktif(self) -> bool:
+        return self._bucket_request is not None or self._bucket_token is not None
+
+    def _tunggu_bucket(self, tiket: Tiket, sekarang: float) -> float:
+        tunggu = 0.0
+        if self._bucket_request is not None:
+            tunggu = max(tunggu, self._bucket_request.tunggu_untuk(1, sekarang))
+        if self._bucket_token is not None:
+            tunggu = max(tunggu, self._bucket_token.tunggu_untuk(tiket.token, sekarang))
+        return tunggu
+
+    def _bagikan(self) -> float:
+        """Beri izin sebanyak mungkin secara round-robin; kembalikan detik sampai giliran berikutnya"""
+        sekarang = time.monotonic()
+        while self._antrian:
+            sesi, antrian = next(iter(self._antrian.items()))
+            tiket = antrian[0]
+            tunggu = self._tunggu_bucket(tiket, sekarang)
+            if tunggu > 0:
+                return tunggu
+            if self._bucket_request is not None:
+                self._bucket_request.ambil(1)
+            if self._bucket_token is not None:
+                self._bucket_token.ambil(tiket.token)
+            antrian.popleft()
+            self._panjang -= 1
+            tiket.diberi = True
+            self.diberi += 1
+            self.total_tunggu += sekarang - tiket.dibuat
+            if antrian:
+                self._antrian.move_to_end(sesi)
+            else:
+                del self._antrian[sesi]
+            self._cond.notify_all()
+        return 0.0
+
+    def _posisi(self, tiket: Tiket) -> int:
+        """Posisi 1-based tiket dalam urutan round-robin yang akan datang"""
+        antrian = self._antrian.get(tiket.sesi)
+        if not antrian:
+            return 0
+        ke = antrian.index(tiket)
+        # Every session serves one ticket per round: all earlier rounds, then sessions ahead in this round
+        posisi = sum(min(len(lain), ke) for lain in self._antrian.values())
+        for sesi, lain in self._antrian.items():
+            if sesi == tiket.sesi:
+                break
+            if len(lain) > ke:
+                posisi += 1
+        return posisi + 1
+
+    def _daftar(self, sesi: str, token: int) -> Tiket:
+        if self.antrian_maks and self._panjang >= self.antrian_maks:
+            self.ditolak += 1
+            registry.inc("penilai_ratelimit_ditolak_total", help="Request yang ditolak penjadwal", alasan="antrian_penuh")
+            raise AntrianError(f"Server sedang sibuk: {self._panjang} request mengantri, coba lagi sebentar lagi")
+        if self._bucket_token is not None:
+            token = min(token, int(self._bucket_token.kapasitas))
+        tiket = Tiket(sesi, token)
+        self._antrian.setdefault(sesi, deque()).append(tiket)
+        self._panjang += 1
+        return tiket
+
+    def _batalkan(self, tiket: Tiket, alasan: str) -> None:
+        antrian = self._antrian.get(tiket.sesi)
+        if antrian and tiket in antrian:
+            antrian.remove(tiket)
+            self._panjang -= 1
+            if not antrian:
+                del self._antrian[tiket.sesi]
+        self.ditolak += 1
+        registry.inc("penilai_ratelimit_ditolak_total", help="Request yang ditolak penjadwal", alasan=alasan)
+        self._cond.notify_all()
+
+    def _selesai_antri(self, tiket: Tiket) -> Tiket:
+        registry.observe("penilai_antrian_tunggu_detik", time.monotonic() - tiket.dibuat,
+                         help="Lama menunggu izin dari penjadwal")
+        return tiket
+
+    def _lapor_antri(self, tiket: Tiket, saat_antri: Callable[[int, float], None], posisi: int, perkiraan: float) -> None:
+        """Panggil callback UI tanpa memegang lock; tiket dibatalkan kalau callback melempar (misal rerun Streamlit)"""
+        try:
+            saat_antri(posisi, perkiraan)
+        except BaseException:
+            with self._cond:
+                if not tiket.diberi:
+                    self._batalkan(tiket, "dibatalkan")
+            raise
+
+    def minta(
+        self,
+        sesi: str,
+        token: int,
+        saat_antri: Optional[Callable[[int, float], None]] = None,
+    ) -> Tiket:
+        """Blok sampai boleh memanggil API; saat_antri(posisi, perkiraan_detik) dipanggil selama menunggu"""
+        if not self.aktif:
+            return Tiket(sesi, token)
+        batas = time.monotonic() + self.timeout
+        with self._cond:
+            tiket = self._daftar(sesi, token)
+        posisi_terakhir = None
+        while True:
+            with self._cond:
+                tunggu = self._bagikan()
+                if tiket.diberi:
+                    return self._selesai_antri(tiket)
+                sisa = batas - time.monotonic()
+                if sisa <= 0:
+                    self._batalkan(tiket, "timeout")
+                    raise AntrianError(f"Menunggu giliran API lebih dari {self.timeout:.0f} detik")
+                posisi = self._posisi(tiket)
+                if saat_antri is None or posisi == posisi_terakhir:
+                    self._cond.wait(min(tunggu or sisa, sisa))
+                    continue
+                perkiraan = self.perkiraan_tunggu(posisi)
+            # Outside the lock: a slow UI update must not stall scheduling for other sessions
+            posisi_terakhir = posisi
+            self._lapor_antri(tiket, saat_antri, posisi, perkiraan)
+
+    async def minta_async(
+        self,
+        sesi: str,
+        token: int,
+        saat_antri: Optional[Callable[[int, float], None]] = None,
+    ) -> Tiket:
+        """Versi async dari minta(); menunggu dengan asyncio.sleep, tidak memblok loop"""
+        if not self.aktif:
+            return Tiket(sesi, token)
+        batas = time.monotonic() + self.timeout
+        with self._cond:
+            tiket = self._daftar(sesi, token)
+        posisi_terakhir = None
+        try:
+            while True:
+                with self._cond:
+                    tunggu = self._bagikan()
+                    if tiket.diberi:
+                        return self._selesai_antri(tiket)
+                    sisa = batas - time.monotonic()
+                    if sisa <= 0:
+                        self._batalkan(tiket, "timeout")
+                        raise AntrianError(f"Menunggu giliran API lebih dari {self.timeout:.0f} detik")
+                    posisi = self._posisi(tiket)
+                    perkiraan = self.perkiraan_tunggu(posisi)
+                if saat_antri is not None and posisi != posisi_terakhir:
+                    posisi_terakhir = posisi
+                    self._lapor_antri(tiket, saat_antri, posisi, perkiraan)
+                # Grants from other threads do not wake us; cap the sleep so we notice them
+                await asyncio.sleep(min(tunggu or 0.05, sisa, 0.25))
+        except asyncio.CancelledError:
+            with self._cond:
+                if not tiket.diberi:
+                    self._batalkan(tiket, "dibatalkan")
+            raise
+
+    def catat_pemakaian(self, tiket: Tiket, usage: Any) -> None:
+        """Koreksi bucket token dengan usage sebenarnya dari respons"""
+        total = getattr(usage, "total_tokens", None)
+        if self._bucket_token is None or total is None:
+            return
+        with self._cond:
+            self._bucket_token.koreksi(tiket.token - total)
+
+    def per_percobaan(
+        self,
+        sesi: str,
+        token: int,
+        fungsi: Callable[[Tiket], T],
+        saat_antri: Optional[Callable[[int, float], None]] = None,
+    ) -> Callable[[], T]:
+        """Bungkus fungsi(tiket) supaya tiap percobaan (retry maupun hedge) membayar tiketnya sendiri
+
+        Tiket pertama diminta sekarang juga; percobaan berikutnya mengantri
+        lagi. Usage respons dicatat per percobaan, termasuk hedge yang kalah
+        tapi tetap selesai di thread-nya.
+        """
+        pemilik = threading.get_ident()
+        awal = [self.minta(sesi, token, saat_antri)]
+
+        def sekali() -> T:
+            try:
+                tiket = awal.pop()
+            except IndexError:
+                # UI callbacks are only safe from the caller's thread, not from the hedging pool
+                lapor = saat_antri if threading.get_ident() == pemilik else None
+                tiket = self.minta(sesi, token, lapor)
+            hasil = fungsi(tiket)
+            self.catat_pemakaian(tiket, getattr(hasil, "usage", None))
+            return hasil
+
+        return sekali
+
+    async def per_percobaan_async(
+        self,
+        sesi: str,
+        token: int,
+        fungsi: Callable[[Tiket], Awaitable[T]],
+        saat_antri: Optional[Callable[[int, float], None]] = None,
+    ) -> Callable[[], Awaitable[T]]:
+        """Versi async dari per_percobaan(); hedge yang kalah di-cancel jadi tiketnya tidak dikoreksi"""
+        awal = [await self.minta_async(sesi, token, saat_antri)]
+
+        async def sekali() -> T:
+            tiket = awal.pop() if awal else await self.minta_async(sesi, token, saat_antri)
+            hasil = await fungsi(tiket)
+            self.catat_pemakaian(tiket, getattr(hasil, "usage", None))
+            return hasil
+
+        return sekali
+
+    def perkiraan_tunggu(self, posisi: int) -> float:
+        """Perkiraan kasar detik sampai request di posisi ini dilayani (dipanggil dengan lock)"""
+        per_detik = []
+        if self._bucket_request is not None:
+            per_detik.append(self._bucket_request.per_detik)
+        if self._bucket_token is not None:
+            rata = max(1, sum(t.token for a in self._antrian.values() for t in a) / max(self._panjang, 1))
+            per_detik.append(self._bucket_token.per_detik / rata)
+        return posisi / min(per_detik) if per_detik else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "aktif": self.aktif,
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "antri": self._panjang,
+                "sesi_antri": len(self._antrian),
+                "diberi": self.diberi,
+                "ditolak": self.ditolak,
+                "rata_tunggu_detik": self.total_tunggu / self.diberi if self.diberi else 0.0,
+            }
+
+
+_lock = threading.Lock()
+_penjadwal: Dict[Tuple, PenjadwalAPI] = {}
+
+
+def get_penjadwal(config: Dict[str, Any]) -> PenjadwalAPI:
+    """Penjadwal bersama untuk seluruh sesi dalam satu proses (per setelan limit)"""
+    kunci = (
+        config["ratelimit_rpm"],
+        config["ratelimit_tpm"],
+        config["ratelimit_antrian_maks"],
+        config["ratelimit_timeout"],
+    )
+    with _lock:
+        if kunci not in _penjadwal:
+            _penjadwal[kunci] = PenjadwalAPI(*kunci)
+        return _penjadwal[kunci]
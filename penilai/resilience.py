@@ -0,0 +1,378 @@
+"""Lapisan ketahanan di sekitar panggilan chat completion.
+
+- Retry dengan exponential backoff + full jitter untuk error yang memang
+  layak diulang (koneksi, timeout, 408/409/429/5xx), menghormati Retry-After.
+- Circuit breaker: kalau rasio error dalam jendela waktu melonjak, panggilan
+  berikutnya langsung ditolak (SirkuitTerbuka) supaya pemanggil bisa segera
+  memakai hasil cache/lokal alih-alih menunggu timeout.
+- Hedging opsional: kalau request pertama belum selesai melewati p95 latency
+  yang teramati, kirim request kedua dan pakai jawaban yang datang duluan.
+"""
+import asyncio
+import email.utils
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from penilai.metrics import registry
+
+T = TypeVar("T")
+
+_STATUS_DIULANG = (408, 409, 429)
+
+
+class SirkuitTerbuka(Exception):
+    """Circuit breaker sedang terbuka; panggilan API dilewati sementara"""
+
+
+def bisa_diulang(error: BaseException) -> bool:
+    """True untuk error sementara: koneksi/timeout, 408, 409, 429, dan 5xx"""
+    import openai
+
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    status = getattr(error, "status_code", None)
+    return status in _STATUS_DIULANG or (status is not None and status >= 500)
+
+
+def _angka(nilai: str) -> Optional[float]:
+    """Angka detik yang aman untuk time.sleep (tidak negatif, bukan nan/inf), atau None"""
+    try:
+        detik = float(nilai)
+    except ValueError:
+        return None
+    return max(0.0, detik) if math.isfinite(detik) else None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Jeda (detik) yang diminta server lewat header Retry-After / retry-after-ms"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    nilai = headers.get("retry-after-ms")
+    if nilai:
+        detik = _angka(nilai)
+        if detik is not None:
+            return detik / 1000
+    nilai = headers.get("retry-after")
+    if not nilai:
+        return None
+    detik = _angka(nilai)
+    if detik is not None:
+        return detik
+    try:
+        tanggal = email.utils.parsedate_to_datetime(nilai)
+    except (TypeError, ValueError):
+        # Garbage header: fall back to the normal backoff instead of failing the retry
+        return None
+    return max(0.0, tanggal.timestamp() - time.time()) if tanggal else None
+
+
+class PemutusSirkuit:
+    """Circuit breaker berbasis rasio error dalam jendela waktu
+
+    tertutup -> terbuka saat error >= `ambang` dari minimal `minimal` panggilan
+    dalam `jendela` detik terakhir; setelah `jeda` detik jadi setengah terbuka
+    dan satu panggilan percobaan menentukan apakah kembali tertutup.
+    """
+
+    def __init__(self, ambang: float = 0.5, minimal: int = 5, jendela: float = 60.0, jeda: float = 30.0):
+        self.ambang = ambang
+        self.minimal = minimal
+        self.jendela = jendela
+        self.jeda = jeda
+        self.status = "tertutup"
+        self._lock = threading.Lock()
+        self._hasil: Deque[Tuple[float, bool]] = deque()
+        self._dibuka = 0.0
+        self._percobaan = False
+        self.trip = 0
+
+    def _buang_lama(self, sekarang: float) -> None:
+        while self._hasil and self._hasil[0][0] < sekarang - self.jendela:
+            self._hasil.popleft()
+
+    def terbuka(self) -> bool:
+        """True jika panggilan saat ini pasti ditolak (tanpa memakai slot percobaan)"""
+        with self._lock:
+            if self.status == "terbuka":
+                return time.monotonic() - self._dibuka < self.jeda
+            return self.status == "setengah" and self._percobaan
+
+    def izinkan(self) -> None:
+        """Lempar SirkuitTerbuka jika panggilan tidak boleh dilakukan sekarang"""
+        with self._lock:
+            if self.status == "tertutup":
+                return
+            if self.status == "terbuka":
+                sisa = self.jeda - (time.monotonic() - self._dibuka)
+                if sisa > 0:
+                    raise SirkuitTerbuka(f"API sedang bermasalah, panggilan dijeda {sisa:.0f} detik lagi")
+                self.status = "setengah"
+            if self._percobaan:
+                raise SirkuitTerbuka("API sedang dicoba ulang, tunggu hasil panggilan percobaan")
+            self._percobaan = True
+
+    def catat(self, sukses: bool) -> None:
+        with self._lock:
+            sekarang = time.monotonic()
+            if self.status == "setengah":
+                self._percobaan = False
+                if sukses:
+                    self.status = "tertutup"
+                    self._hasil.clear()
+                else:
+                    self._buka(sekarang)
+                return
+            self._hasil.append((sekarang, sukses))
+            self._buang_lama(sekarang)
+            gagal = sum(1 for _, ok in self._hasil if not ok)
+            if self.status == "tertutup" and len(self._hasil) >= self.minimal and gagal / len(self._hasil) >= self.ambang:
+                self._buka(sekarang)
+
+    def lepas(self) -> None:
+        """Kembalikan slot percobaan yang dibatalkan sebelum ada hasil"""
+        with self._lock:
+            self._percobaan = False
+
+    def _buka(self, sekarang: float) -> None:
+        self.status = "terbuka"
+        self._dibuka = sekarang
+        self.trip += 1
+        registry.inc("penilai_breaker_trip_total", help="Berapa kali circuit breaker terbuka")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._buang_lama(time.monotonic())
+            gagal = sum(1 for _, ok in self._hasil if not ok)
+            return {
+                "status": self.status,
+                "rasio_error": gagal / len(self._hasil) if self._hasil else 0.0,
+                "panggilan_di_jendela": len(self._hasil),
+                "trip": self.trip,
+            }
+
+
+class PelacakLatency:
+    """Sampel latency sukses terbaru untuk menentukan batas hedging (p95)"""
+
+    def __init__(self, sampel: int = 200, minimal: int = 20):
+        self.minimal = minimal
+        self._lock = threading.Lock()
+        self._sampel: Deque[float] = deque(maxlen=sampel)
+
+    def catat(self, detik: float) -> None:
+        with self._lock:
+            self._sampel.append(detik)
+
+    def p95(self) -> Optional[float]:
+        """None sampai sampel cukup; hedging belum aktif selama itu"""
+        with self._lock:
+            if len(self._sampel) < self.minimal:
+                return None
+            data = sorted(self._sampel)
+        return data[min(int(0.95 * len(data)), len(data) - 1)]
+
+
+class Resilien:
+    """Retry + circuit breaker + hedging untuk satu jenis panggilan API"""
+
+    def __init__(
+        self,
+        retry_maks: int = 2,
+        backoff_dasar: float = 0.5,
+        backoff_maks: float = 20.0,
+        hedging: bool = False,
+        breaker: Optional[PemutusSirkuit] = None,
+    ):
+        self.retry_maks = retry_maks
+        self.backoff_dasar = backoff_dasar
+        self.backoff_maks = backoff_maks
+        self.hedging = hedging
+        self.breaker = breaker or PemutusSirkuit()
+        # Separate trackers: tips calls are much shorter and would drag the analysis p95 down
+        self.latency: Dict[str, PelacakLatency] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.retry = 0
+        self.hedge_dikirim = 0
+        self.hedge_menang = 0
+
+    def _pelacak(self, panggilan: str) -> PelacakLatency:
+        with self._lock:
+            return self.latency.setdefault(panggilan, PelacakLatency())
+
+    def _jeda(self, percobaan: int, error: BaseException) -> float:
+        diminta = retry_after(error)
+        if diminta is not None:
+            # Honour the server's hint, capped so a bogus header cannot park a worker for minutes
+            return min(diminta, self.backoff_maks * 3)
+        # Full jitter: spreads retries from many sessions instead of synchronising them
+        return random.uniform(0, min(self.backoff_maks, self.backoff_dasar * 2 ** percobaan))
+
+    def _gagal(self, error: BaseException, percobaan: int, panggilan: str) -> float:
+        """Catat kegagalan; kembalikan jeda sebelum retry, atau lempar ulang jika tidak diulang"""
+        diulang = bisa_diulang(error)
+        # Client errors (400/401/...) mean upstream answered, so they count as healthy for the breaker
+        self.breaker.catat(not diulang)
+        if not diulang or percobaan >= self.retry_maks:
+            raise error
+        with self._lock:
+            self.retry += 1
+        registry.inc("penilai_retry_total", help="Retry panggilan API", panggilan=panggilan)
+        return self._jeda(percobaan, error)
+
+    def panggil(self, fungsi: Callable[[], T], panggilan: str = "analisis", hedging: Optional[bool] = None) -> T:
+        """Jalankan fungsi() dengan retry, breaker, dan (opsional) hedging"""
+        for percobaan in range(self.retry_maks + 1):
+            self.breaker.izinkan()
+            try:
+                hasil = self._sekali(fungsi, panggilan, self.hedging if hedging is None else hedging)
+            except Exception as e:
+                time.sleep(self._gagal(e, percobaan, panggilan))
+                continue
+            except BaseException:
+                self.breaker.lepas()
+                raise
+            self.breaker.catat(True)
+            return hasil
+        raise AssertionError("unreachable")
+
+    def _sekali(self, fungsi: Callable[[], T], panggilan: str, hedging: bool) -> T:
+        pelacak = self._pelacak(panggilan)
+        batas = pelacak.p95() if hedging else None
+        mulai = time.perf_counter()
+        if batas is None:
+            hasil = fungsi()
+            pelacak.catat(time.perf_counter() - mulai)
+            return hasil
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="penilai-hedge")
+        pertama = self._pool.submit(fungsi)
+        selesai, _ = wait([pertama], timeout=batas)
+        if selesai:
+            hasil = pertama.result()
+            pelacak.catat(time.perf_counter() - mulai)
+            return hasil
+
+        self._catat_hedge(panggilan, "dikirim")
+        kedua = self._pool.submit(fungsi)
+        sisa = [pertama, kedua]
+        error: Optional[BaseException] = None
+        while sisa:
+            selesai, tertunda = wait(sisa, return_when=FIRST_COMPLETED)
+            for future in selesai:
+                if future.exception() is None:
+                    if future is kedua:
+                        self._catat_hedge(panggilan, "menang")
+                    pelacak.catat(time.perf_counter() - mulai)
+                    # The loser keeps running in its worker thread; its response is simply dropped
+                    return future.result()
+                error = error or future.exception()
+            sisa = list(tertunda)
+        raise error
+
+    async def panggil_async(
+        self, fungsi: Callable[[], Awaitable[T]], panggilan: str = "analisis", hedging: Optional[bool] = None
+    ) -> T:
+        """Versi async dari panggil(); request yang kalah di-cancel"""
+        for percobaan in range(self.retry_maks + 1):
+            self.breaker.izinkan()
+            try:
+                hasil = await self._sekali_async(fungsi, panggilan, self.hedging if hedging is None else hedging)
+            except Exception as e:
+                await asyncio.sleep(self._gagal(e, percobaan, panggilan))
+                continue
+            except BaseException:
+                self.breaker.lepas()
+                raise
+            self.breaker.catat(True)
+            return hasil
+        raise AssertionError("unreachable")
+
+    async def _sekali_async(self, fungsi: Callable[[], Awaitable[T]], panggilan: str, hedging: bool) -> T:
+        pelacak = self._pelacak(panggilan)
+        batas = pelacak.p95() if hedging else None
+        mulai = time.perf_counter()
+        if batas is None:
+            hasil = await fungsi()
+            pelacak.catat(time.perf_counter() - mulai)
+            return hasil
+
+        pertama = asyncio.ensure_future(fungsi())
+        selesai, _ = await asyncio.wait([pertama], timeout=batas)
+        if selesai:
+            hasil = pertama.result()
+            pelacak.catat(time.perf_counter() - mulai)
+            return hasil
+
+        self._catat_hedge(panggilan, "dikirim")
+        kedua = asyncio.ensure_future(fungsi())
+        sisa = {pertama, kedua}
+        error: Optional[BaseException] = None
+        try:
+            while sisa:
+                selesai, sisa = await asyncio.wait(sisa, return_when=asyncio.FIRST_COMPLETED)
+                for task in selesai:
+                    if task.exception() is None:
+                        if task is kedua:
+                            self._catat_hedge(panggilan, "menang")
+                        pelacak.catat(time.perf_counter() - mulai)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in (pertama, kedua):
+                task.cancel()
+
+    def _catat_hedge(self, panggilan: str, hasil: str) -> None:
+        with self._lock:
+            if hasil == "dikirim":
+                self.hedge_dikirim += 1
+            else:
+                self.hedge_menang += 1
+        registry.inc("penilai_hedge_total", help="Request hedging yang dikirim / menang", panggilan=panggilan, hasil=hasil)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hasil = {
+                "retry": self.retry,
+                "hedging": self.hedging,
+                "hedge_dikirim": self.hedge_dikirim,
+                "hedge_menang": self.hedge_menang,
+            }
+            pelacak = dict(self.latency)
+        hasil["p95_detik"] = {nama: p.p95() for nama, p in pelacak.items()}
+        hasil["breaker"] = self.breaker.stats()
+        return hasil
+
+
+_lock = threading.Lock()
+_resilien: Dict[Tuple, Resilien] = {}
+
+
+def get_resilien(config: Dict[str, Any]) -> Resilien:
+    """Lapisan ketahanan bersama per proses; breaker-nya berlaku untuk semua sesi"""
+    kunci = (
+        config["retry_maks"],
+        config["retry_backoff"],
+        config["hedging"],
+        config["breaker_ambang"],
+        config["breaker_jeda"],
+    )
+    with _lock:
+        if kunci not in _resilien:
+            _resilien[kunci] = Resilien(
+                retry_maks=config["retry_maks"],
+                backoff_dasar=config["retry_backoff"],
+                hedging=config["hedging"],
+                breaker=PemutusSirkuit(ambang=config["breaker_ambang"], jeda=config["breaker_jeda"]),
+            )
+        return _resilien[kunci]
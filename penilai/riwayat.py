@@ -0,0 +1,288 @@
+"""Riwayat evaluasi: log append-only di SQLite plus agregat yang diperbarui saat insert.
+
+Setiap analisis yang dihasilkan (dari model, cache, prompt mirip, atau
+fallback lokal) dicatat sebagai satu baris ringkas: skor, jenis tugas,
+teknik yang ditemukan (bitmask TeknikPrompt), sumber, dan cuplikan prompt;
+analisis lengkap tetap di cache. Tabel `agregat` menyimpan jumlah dan total
+skor per dimensi (distribusi skor, teknik, sumber, per hari), baik untuk
+seluruh riwayat maupun per jenis tugas, dan diperbarui dalam transaksi yang
+sama dengan insert. Ringkasan dashboard jadi cukup membaca beberapa ratus
+baris agregat, dan daftar riwayat memakai indeks skor, jenis tugas, dan
+waktu, sehingga tetap di bawah 1 detik pada 1 juta evaluasi
+(`python -m benchmarks.bench_riwayat`).
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from penilai.model import AnalisisPrompt, TeknikPrompt
+
+DEFAULT_RIWAYAT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "prompt-scorer", "riwayat.sqlite3")
+
+# Bit i of the teknik column: the i-th TeknikPrompt member was found in the prompt; the next bit
+# marks techniques the model named outside TeknikPrompt
+_TEKNIK_LAIN = "Lainnya"
+_BIT_TEKNIK = {teknik.value: 1 << i for i, teknik in enumerate(TeknikPrompt)}
+_BIT_TEKNIK[_TEKNIK_LAIN] = 1 << len(TeknikPrompt)
+_PEMISAH_TEKNIK = re.compile(r"[\s_-]+")
+_PANJANG_CUPLIKAN = 120
+# Aggregate rows with jenis_tugas = _SEMUA cover the whole history
+_SEMUA = ""
+
+
+class EntriRiwayat(NamedTuple):
+    id: int
+    dibuat: float
+    skor: int
+    jenis_tugas: str
+    teknik: Tuple[str, ...]
+    sumber: str
+    cuplikan: str
+
+
+def normalisasi_jenis(jenis_tugas: str) -> str:
+    """Jenis tugas dari model ditulis bebas; samakan kapitalisasi dan spasi supaya bisa dikelompokkan"""
+    return " ".join(str(jenis_tugas).lower().split())[:60] or "lainnya"
+
+
+def _kunci_teknik(nama: str) -> str:
+    """Kunci pencocokan nama teknik: "Few-shot", "chain_of_thought", "Tree of Thought" sama dengan TeknikPrompt"""
+    return _PEMISAH_TEKNIK.sub("", str(nama)).casefold().rstrip("s")
+
+
+_BIT_KUNCI = {_kunci_teknik(teknik.value): 1 << i for i, teknik in enumerate(TeknikPrompt)}
+
+
+def bitmask_teknik(analisis: AnalisisPrompt) -> int:
+    """Bitmask teknik yang ditemukan; nama di luar TeknikPrompt dihitung di bit _TEKNIK_LAIN"""
+    bit = {_BIT_KUNCI.get(_kunci_teknik(t.teknik), _BIT_TEKNIK[_TEKNIK_LAIN]) for t in analisis.teknik_ditemukan
+           if str(t.teknik).strip()}
+    return sum(bit)
+
+
+def nama_teknik(bitmask: int) -> Tuple[str, ...]:
+    return tuple(nama for nama, bit in _BIT_TEKNIK.items() if bitmask & bit)
+
+
+def kelompok_skor(skor: int) -> int:
+    """Rentang skor per 10: 0 untuk 0-9, ..., 9 untuk 90-100"""
+    return min(max(int(skor), 0) // 10, 9)
+
+
+def _cuplikan(prompt: str) -> str:
+    teks = " ".join(prompt.split())
+    return teks if len(teks) <= _PANJANG_CUPLIKAN else teks[:_PANJANG_CUPLIKAN].rstrip() + "…"
+
+
+class RiwayatEvaluasi:
+    """Penyimpanan riwayat evaluasi; thread-safe, satu koneksi SQLite per instance"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_RIWAYAT_PATH):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.jumlah_tulis = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # History rows are not precious: a power loss may drop the last commit, never corrupt the file
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS evaluasi (
+                    id INTEGER PRIMARY KEY,
+                    dibuat REAL NOT NULL,
+                    skor INTEGER NOT NULL,
+                    jenis_tugas TEXT NOT NULL,
+                    teknik INTEGER NOT NULL,
+                    sumber TEXT NOT NULL,
+                    cuplikan TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_evaluasi_skor ON evaluasi (skor);
+                CREATE INDEX IF NOT EXISTS idx_evaluasi_jenis ON evaluasi (jenis_tugas);
+                CREATE INDEX IF NOT EXISTS idx_evaluasi_dibuat ON evaluasi (dibuat);
+                CREATE TABLE IF NOT EXISTS agregat (
+                    jenis_tugas TEXT NOT NULL,
+                    dimensi TEXT NOT NULL,
+                    nilai TEXT NOT NULL,
+                    jumlah INTEGER NOT NULL,
+                    total_skor INTEGER NOT NULL,
+                    PRIMARY KEY (jenis_tugas, dimensi, nilai)
+                ) WITHOUT ROWID;
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def catat(
+        self, prompt: str, analisis: AnalisisPrompt, sumber: Optional[str] = None, dibuat: Optional[float] = None
+    ) -> None:
+        """Tambahkan satu evaluasi; sumber default mengikuti analisis.sumber"""
+        self.catat_banyak([(prompt, analisis, sumber, dibuat)])
+
+    def catat_banyak(
+        self, entri: Iterable[Tuple[str, AnalisisPrompt, Optional[str], Optional[float]]]
+    ) -> int:
+        """Tambahkan banyak evaluasi dalam satu transaksi; kembalikan jumlah baris"""
+        sekarang = time.time()
+        baris = []
+        agregat: Dict[Tuple[str, str, str], List[int]] = {}
+
+        def tambah(jenis: str, dimensi: str, nilai: str, skor: int) -> None:
+            for kunci in ((_SEMUA, dimensi, nilai), (jenis, dimensi, nilai)):
+                isi = agregat.setdefault(kunci, [0, 0])
+                isi[0] += 1
+                isi[1] += skor
+
+        for prompt, analisis, sumber, dibuat in entri:
+            dibuat = sekarang if dibuat is None else dibuat
+            skor = int(analisis.skor)
+            jenis = normalisasi_jenis(analisis.jenis_tugas)
+            teknik = bitmask_teknik(analisis)
+            sumber = sumber or analisis.sumber
+            baris.append((dibuat, skor, jenis, teknik, sumber, _cuplikan(prompt)))
+            # Per-dimension counts, folded per batch so a bulk insert upserts each key once
+            tambah(jenis, "total", "", skor)
+            tambah(jenis, "skor", str(kelompok_skor(skor)), skor)
+            tambah(jenis, "sumber", sumber, skor)
+            tambah(jenis, "hari", time.strftime("%Y-%m-%d", time.localtime(dibuat)), skor)
+            for nama in nama_teknik(teknik) or ("-",):
+                tambah(jenis, "teknik", nama, skor)
+        if not baris:
+            return 0
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT INTO evaluasi (dibuat, skor, jenis_tugas, teknik, sumber, cuplikan) VALUES (?, ?, ?, ?, ?, ?)",
+                    baris,
+                )
+                db.executemany(
+                    """
+                    INSERT INTO agregat (jenis_tugas, dimensi, nilai, jumlah, total_skor) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (jenis_tugas, dimensi, nilai)
+                    DO UPDATE SET jumlah = jumlah + excluded.jumlah, total_skor = total_skor + excluded.total_skor
+                    """,
+                    [(*kunci, jumlah, total) for kunci, (jumlah, total) in agregat.items()],
+                )
+            self.jumlah_tulis += len(baris)
+        return len(baris)
+
+    def ringkasan(self, jenis_tugas: Optional[str] = None, hari: int = 30) -> Dict[str, Any]:
+        """Statistik dashboard dari tabel agregat (seluruh riwayat, atau satu jenis tugas)
+
+        Berisi total, rata-rata skor, distribusi skor per rentang 10, jumlah
+        per teknik/jenis tugas/sumber (beserta rata-rata skornya), dan jumlah
+        per hari untuk `hari` hari terakhir yang ada datanya.
+        """
+        with self._lock:
+            baris = self._db().execute(
+                "SELECT dimensi, nilai, jumlah, total_skor FROM agregat WHERE jenis_tugas = ?",
+                (_SEMUA if jenis_tugas is None else normalisasi_jenis(jenis_tugas),),
+            ).fetchall()
+            jenis = [] if jenis_tugas is not None else self._db().execute(
+                "SELECT jenis_tugas, jumlah, total_skor FROM agregat"
+                " WHERE jenis_tugas != ? AND dimensi = 'total' ORDER BY jumlah DESC",
+                (_SEMUA,),
+            ).fetchall()
+
+        per_dimensi: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        for dimensi, nilai, jumlah, total_skor in baris:
+            per_dimensi.setdefault(dimensi, {})[nilai] = (jumlah, total_skor)
+
+        def daftar(isi: Dict[str, Tuple[int, int]]) -> List[Dict[str, Any]]:
+            urut = sorted(isi.items(), key=lambda item: -item[1][0])
+            return [{"nama": nama, "jumlah": j, "rata_skor": round(t / j, 1)} for nama, (j, t) in urut]
+
+        total, total_skor = per_dimensi.get("total", {}).get("", (0, 0))
+        skor = per_dimensi.get("skor", {})
+        return {
+            "total": total,
+            "rata_skor": round(total_skor / total, 1) if total else 0.0,
+            "distribusi_skor": {
+                f"{i * 10}-{i * 10 + 9 if i < 9 else 100}": skor.get(str(i), (0, 0))[0] for i in range(10)
+            },
+            "teknik": daftar(per_dimensi.get("teknik", {})),
+            "jenis_tugas": [{"nama": n, "jumlah": j, "rata_skor": round(t / j, 1)} for n, j, t in jenis],
+            "sumber": daftar(per_dimensi.get("sumber", {})),
+            "per_hari": {
+                tanggal: jumlah
+                for tanggal, (jumlah, _) in sorted(per_dimensi.get("hari", {}).items())[-hari:]
+            },
+        }
+
+    def daftar(
+        self,
+        batas: int = 50,
+        jenis_tugas: Optional[str] = None,
+        skor_min: Optional[int] = None,
+        skor_maks: Optional[int] = None,
+        sejak: Optional[float] = None,
+        sampai: Optional[float] = None,
+        sebelum_id: Optional[int] = None,
+    ) -> List[EntriRiwayat]:
+        """Evaluasi terbaru dulu, dengan filter opsional
+
+        Halaman berikutnya: `sebelum_id` = id entri terakhir halaman sebelumnya.
+        """
+        syarat, argumen = [], []
+        for kolom, operator, nilai in (
+            ("jenis_tugas", "=", None if jenis_tugas is None else normalisasi_jenis(jenis_tugas)),
+            ("skor", ">=", skor_min),
+            ("skor", "<=", skor_maks),
+            ("dibuat", ">=", sejak),
+            ("dibuat", "<", sampai),
+            ("id", "<", sebelum_id),
+        ):
+            if nilai is not None:
+                syarat.append(f"{kolom} {operator} ?")
+                argumen.append(nilai)
+        where = " WHERE " + " AND ".join(syarat) if syarat else ""
+        with self._lock:
+            baris = self._db().execute(
+                "SELECT id, dibuat, skor, jenis_tugas, teknik, sumber, cuplikan FROM evaluasi"
+                f"{where} ORDER BY id DESC LIMIT ?",
+                (*argumen, batas),
+            ).fetchall()
+        return [
+            EntriRiwayat(id_, dibuat, skor, jenis, nama_teknik(teknik), sumber, cuplikan)
+            for id_, dibuat, skor, jenis, teknik, sumber, cuplikan in baris
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            baris = self._db().execute(
+                "SELECT jumlah FROM agregat WHERE jenis_tugas = ? AND dimensi = 'total'", (_SEMUA,)
+            ).fetchone()
+        return baris[0] if baris else 0
+
+    def clear(self) -> None:
+        """Hapus seluruh riwayat beserta agregatnya"""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM evaluasi")
+                db.execute("DELETE FROM agregat")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "entri": len(self), "ditulis_proses_ini": self.jumlah_tulis}
+
+
+_lock = threading.Lock()
+_riwayat: Dict[str, RiwayatEvaluasi] = {}
+
+
+def get_riwayat(config: Dict[str, Any]) -> RiwayatEvaluasi:
+    """Riwayat bersama per proses untuk path di config"""
+    with _lock:
+        path = config["riwayat_path"]
+        if path not in _riwayat:
+            _riwayat[path] = RiwayatEvaluasi(path)
+        return _riwayat[path]
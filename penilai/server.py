@@ -0,0 +1,329 @@
+"""Layanan HTTP JSON untuk tool internal lain: analisis prompt dan tips kilat.
+
+Satu event loop asyncio (asyncio streams, tanpa framework web). Request
+analisis/tips masuk ke antrian terbatas yang dikerjakan sejumlah worker
+lewat jalur async PenilaiPrompt. Kalau antrian penuh, request langsung
+ditolak 429 beserta kedalaman antrian (backpressure) alih-alih menumpuk;
+saat shutdown request baru ditolak 503 sementara pekerjaan yang sudah
+diterima diselesaikan dulu.
+
+    prompt-scorer serve --port 8080 --worker 16 --antrian 64
+
+Endpoint:
+    POST /v1/analisis  {"prompt": "...", "tips": false, "pakai_cache": true}
+    POST /v1/tips      {"prompt": "...", "analisis": {...}}   (analisis opsional)
+    GET  /healthz      status, kedalaman antrian, worker sibuk
+    GET  /metrics      metrik format Prometheus
+"""
+import asyncio
+import json
+import logging
+import math
+import signal
+import time
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Set, Tuple, Union
+
+from penilai.core import AnalisisError, PenilaiPrompt
+from penilai.metrics import registry
+from penilai.model import analisis_dari_dict
+from penilai.ratelimit import AntrianError
+from penilai.resilience import SirkuitTerbuka
+
+logger = logging.getLogger(__name__)
+
+RUTE_KERJA = {"/v1/analisis": "analisis", "/v1/tips": "tips"}
+_RUTE = (*RUTE_KERJA, "/healthz", "/metrics")
+
+# Request bodies above this are refused with 413 (a prompt is text, not a document upload)
+BATAS_BODY = 1_000_000
+
+
+class _PermintaanBuruk(Exception):
+    def __init__(self, status: int, pesan: str):
+        super().__init__(pesan)
+        self.status = status
+
+
+@dataclass
+class _Tugas:
+    jenis: str
+    data: Dict[str, Any]
+    hasil: asyncio.Future
+    diterima: float = field(default_factory=time.monotonic)
+
+
+Respons = Tuple[int, Union[Dict[str, Any], str], Dict[str, str]]
+
+
+class LayananPenilai:
+    """Server HTTP di atas satu PenilaiPrompt dengan antrian kerja terbatas"""
+
+    def __init__(self, penilai: PenilaiPrompt, worker: int = 16, antrian_maks: int = 64, timeout_baca: float = 30.0):
+        if worker < 1 or antrian_maks < 1:
+            raise ValueError("worker dan antrian_maks minimal 1")
+        self.penilai = penilai
+        self.jumlah_worker = worker
+        self.antrian_maks = antrian_maks
+        self.timeout_baca = timeout_baca
+        self._antrian: Optional[asyncio.Queue] = None
+        self._worker: list = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._koneksi: Set[asyncio.StreamWriter] = set()
+        self._berhenti = False
+        self.sibuk = 0
+        # Requests currently inside a handler (queued, running, or writing the response)
+        self._aktif = 0
+        # Moving average of job time, for Retry-After on 429
+        self._rata_durasi = 1.0
+        self.diterima = 0
+        self.ditolak = 0
+
+    @property
+    def kedalaman(self) -> int:
+        return self._antrian.qsize() if self._antrian is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "status": "berhenti" if self._berhenti else "ok",
+            "antrian": self.kedalaman,
+            "antrian_maks": self.antrian_maks,
+            "worker": self.jumlah_worker,
+            "worker_sibuk": self.sibuk,
+            "koneksi": len(self._koneksi),
+            "diterima": self.diterima,
+            "ditolak": self.ditolak,
+            "rata_durasi_detik": round(self._rata_durasi, 3),
+        }
+
+    async def mulai(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        """Buka socket dan jalankan worker; kembalikan asyncio server (port asli di .sockets)"""
+        self._antrian = asyncio.Queue(maxsize=self.antrian_maks)
+        self._worker = [asyncio.ensure_future(self._kerja()) for _ in range(self.jumlah_worker)]
+        self._server = await asyncio.start_server(self._layani_koneksi, host, port)
+        registry.gauge("penilai_server_antrian", lambda: self.kedalaman, help="Kedalaman antrian kerja server HTTP")
+        registry.gauge("penilai_server_worker_sibuk", lambda: self.sibuk, help="Worker server HTTP yang sedang bekerja")
+        return self._server
+
+    async def berhenti(self, batas_detik: float = 30.0) -> None:
+        """Graceful shutdown: tolak request baru, selesaikan yang sudah diterima, lalu tutup koneksi"""
+        self._berhenti = True
+        if self._server is not None:
+            self._server.close()
+        batas = time.monotonic() + batas_detik
+        # Queued and running jobs finish, and their responses are written, before connections close
+        while self._aktif and time.monotonic() < batas:
+            await asyncio.sleep(0.05)
+        if self._aktif:
+            logger.warning("Shutdown: %d request belum selesai setelah %.0f detik", self._aktif, batas_detik)
+        for tugas in self._worker:
+            tugas.cancel()
+        await asyncio.gather(*self._worker, return_exceptions=True)
+        for writer in list(self._koneksi):
+            writer.close()
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def _kerja(self) -> None:
+        while True:
+            tugas: _Tugas = await self._antrian.get()
+            try:
+                # The caller may have gone away while the job was queued
+                if tugas.hasil.done():
+                    continue
+                self.sibuk += 1
+                mulai = time.monotonic()
+                try:
+                    tugas.hasil.set_result(await self._kerjakan(tugas.jenis, tugas.data))
+                except Exception as e:
+                    if not tugas.hasil.done():
+                        tugas.hasil.set_exception(e)
+                finally:
+                    self.sibuk -= 1
+                    self._rata_durasi = 0.9 * self._rata_durasi + 0.1 * (time.monotonic() - mulai)
+            finally:
+                self._antrian.task_done()
+
+    async def _kerjakan(self, jenis: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = data["prompt"]
+        if jenis == "tips" and data.get("analisis") is not None:
+            analisis = analisis_dari_dict(data["analisis"])
+        else:
+            analisis = await self.penilai.analisis_prompt_async(prompt, pakai_cache=data.get("pakai_cache", True))
+        hasil: Dict[str, Any] = {"analisis": asdict(analisis)} if jenis == "analisis" else {}
+        if jenis == "tips" or data.get("tips"):
+            hasil["tips"] = await self.penilai.tips_kilat_async(analisis, prompt)
+        return hasil
+
+    def _tolak(self, status: int, pesan: str) -> Respons:
+        self.ditolak += 1
+        header = {}
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            # Time for the workers to drain what is ahead of the caller
+            header["Retry-After"] = str(max(1, math.ceil(self.kedalaman / self.jumlah_worker * self._rata_durasi)))
+        return status, {"error": pesan, "antrian": self.kedalaman, "antrian_maks": self.antrian_maks}, header
+
+    async def _kerja_http(self, jenis: str, body: bytes) -> Respons:
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "body bukan JSON"}, {}
+        if not isinstance(data, dict) or not isinstance(data.get("prompt"), str) or not data["prompt"].strip():
+            return HTTPStatus.BAD_REQUEST, {"error": "field 'prompt' (string) wajib diisi"}, {}
+        if jenis == "tips" and data.get("analisis") is not None:
+            try:
+                analisis_dari_dict(data["analisis"])
+            except (KeyError, TypeError, ValueError) as e:
+                return HTTPStatus.BAD_REQUEST, {"error": f"field 'analisis' tidak valid: {e}"}, {}
+
+        if self._berhenti:
+            return self._tolak(HTTPStatus.SERVICE_UNAVAILABLE, "server sedang berhenti")
+        tugas = _Tugas(jenis, data, asyncio.get_running_loop().create_future())
+        try:
+            self._antrian.put_nowait(tugas)
+        except asyncio.QueueFull:
+            return self._tolak(HTTPStatus.TOO_MANY_REQUESTS, "antrian penuh, coba lagi nanti")
+        self.diterima += 1
+        try:
+            hasil = await tugas.hasil
+        except AnalisisError as e:
+            if isinstance(e.__cause__, AntrianError):
+                return self._tolak(HTTPStatus.TOO_MANY_REQUESTS, str(e))
+            if isinstance(e.__cause__, SirkuitTerbuka):
+                return self._tolak(HTTPStatus.SERVICE_UNAVAILABLE, str(e))
+            return HTTPStatus.BAD_GATEWAY, {"error": str(e)}, {}
+        finally:
+            # A cancelled handler (client gone) leaves a done future, which the worker skips
+            tugas.hasil.cancel()
+        hasil["antrian_detik"] = round(time.monotonic() - tugas.diterima, 3)
+        return HTTPStatus.OK, hasil, {}
+
+    async def _tangani(self, metode: str, path: str, body: bytes) -> Respons:
+        path = path.split("?", 1)[0]
+        if path == "/healthz":
+            status = HTTPStatus.SERVICE_UNAVAILABLE if self._berhenti else HTTPStatus.OK
+            return status, self.stats(), {}
+        if path == "/metrics":
+            return HTTPStatus.OK, registry.prometheus(), {}
+        jenis = RUTE_KERJA.get(path)
+        if jenis is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"tidak ada endpoint {path}"}, {}
+        if metode != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "pakai POST"}, {"Allow": "POST"}
+        return await self._kerja_http(jenis, body)
+
+    @staticmethod
+    async def _baca_permintaan(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        baris = await reader.readline()
+        if not baris:
+            return None
+        try:
+            metode, path, _ = baris.decode("latin-1").split()
+        except ValueError:
+            raise _PermintaanBuruk(HTTPStatus.BAD_REQUEST, "request line tidak valid")
+        header: Dict[str, str] = {}
+        while True:
+            baris = await reader.readline()
+            if baris in (b"\r\n", b"\n", b""):
+                break
+            nama, _, nilai = baris.decode("latin-1").partition(":")
+            header[nama.strip().lower()] = nilai.strip()
+        if "chunked" in header.get("transfer-encoding", "").lower():
+            raise _PermintaanBuruk(HTTPStatus.LENGTH_REQUIRED, "kirim body dengan Content-Length")
+        try:
+            panjang = int(header.get("content-length") or 0)
+        except ValueError:
+            raise _PermintaanBuruk(HTTPStatus.BAD_REQUEST, "Content-Length tidak valid")
+        if panjang > BATAS_BODY:
+            raise _PermintaanBuruk(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body lebih dari {BATAS_BODY} byte")
+        body = await reader.readexactly(panjang) if panjang else b""
+        return metode.upper(), path, header, body
+
+    @staticmethod
+    def _respons(status: int, isi: Union[Dict[str, Any], str], header: Dict[str, str], tutup: bool) -> bytes:
+        if isinstance(isi, str):
+            body, jenis = isi.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body, jenis = json.dumps(isi, ensure_ascii=False).encode("utf-8"), "application/json"
+        baris = [
+            f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}",
+            f"Content-Type: {jenis}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'close' if tutup else 'keep-alive'}",
+            *(f"{nama}: {nilai}" for nama, nilai in header.items()),
+        ]
+        return ("\r\n".join(baris) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _layani_koneksi(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._koneksi.add(writer)
+        try:
+            while not self._berhenti:
+                try:
+                    # Bounds both idle keep-alive connections and clients that trickle a request in
+                    permintaan = await asyncio.wait_for(self._baca_permintaan(reader), self.timeout_baca)
+                except _PermintaanBuruk as e:
+                    writer.write(self._respons(e.status, {"error": str(e)}, {}, tutup=True))
+                    await writer.drain()
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+                    break
+                if permintaan is None:
+                    break
+                metode, path, header, body = permintaan
+                self._aktif += 1
+                try:
+                    mulai = time.perf_counter()
+                    try:
+                        status, isi, header_balas = await self._tangani(metode, path, body)
+                    except Exception as e:
+                        logger.exception("Request %s %s gagal", metode, path)
+                        status, isi, header_balas = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}, {}
+                    rute = path.split("?", 1)[0]
+                    if rute not in _RUTE:
+                        rute = "lain"
+                    registry.inc("penilai_server_request_total", help="Request server HTTP per rute dan status",
+                                 rute=rute, status=int(status))
+                    registry.observe("penilai_server_durasi_detik", time.perf_counter() - mulai,
+                                     help="Durasi request server HTTP (termasuk antri)", rute=rute)
+                    tutup = header.get("connection", "").lower() == "close" or self._berhenti
+                    writer.write(self._respons(status, isi, header_balas, tutup))
+                    await writer.drain()
+                finally:
+                    self._aktif -= 1
+                if tutup:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._koneksi.discard(writer)
+            writer.close()
+
+
+async def layani(
+    penilai: PenilaiPrompt,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    worker: int = 16,
+    antrian_maks: int = 64,
+    batas_shutdown: float = 30.0,
+    timeout_baca: float = 30.0,
+) -> None:
+    """Jalankan layanan sampai SIGINT/SIGTERM, lalu shutdown dengan rapi"""
+    layanan = LayananPenilai(penilai, worker=worker, antrian_maks=antrian_maks, timeout_baca=timeout_baca)
+    server = await layanan.mulai(host, port)
+    alamat = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    logger.info("Layanan penilai mendengarkan di %s (%d worker, antrian %d)", alamat, worker, antrian_maks)
+    berhenti = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinyal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sinyal, berhenti.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C still raises KeyboardInterrupt out of asyncio.run
+            pass
+    try:
+        await berhenti.wait()
+    finally:
+        logger.info("Berhenti: menyelesaikan %d request di antrian", layanan.kedalaman + layanan.sibuk)
+        await layanan.berhenti(batas_shutdown)
@@ -0,0 +1,154 @@
+"""Penggabungan panggilan identik yang sedang berjalan (singleflight).
+
+Kalau banyak sesi mengevaluasi prompt yang sama pada saat bersamaan (misal
+satu kelas workshop menekan tombol sample yang sama), hanya pemanggil
+pertama yang benar-benar memanggil API. Pemanggil lain untuk kunci yang
+sama menunggu panggilan itu dan menerima hasil -- atau error -- yang sama.
+Bekerja lintas thread (sesi Streamlit) maupun lintas event loop (batch).
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from penilai.metrics import registry
+
+
+class PanggilanDibatalkan(Exception):
+    """Pemimpin panggilan dibatalkan sebelum hasilnya ada"""
+
+
+class Panggilan:
+    """Satu panggilan yang sedang berjalan; ditunggu oleh pemanggil lain dengan kunci sama"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._selesai = threading.Event()
+        self._futures: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.hasil: Any = None
+        self.error: Optional[BaseException] = None
+
+    def _akhiri(self, hasil: Any, error: Optional[BaseException]) -> None:
+        with self._lock:
+            self.hasil = hasil
+            self.error = error
+            self._selesai.set()
+            futures, self._futures = self._futures, []
+        for loop, future in futures:
+            try:
+                loop.call_soon_threadsafe(self._isi_future, future)
+            except RuntimeError:
+                pass  # waiter's loop already closed; nobody left to notify
+
+    def _isi_future(self, future: asyncio.Future) -> None:
+        if future.done():
+            return
+        if self.error is not None:
+            future.set_exception(self.error)
+        else:
+            future.set_result(self.hasil)
+
+    def tunggu(self, timeout: Optional[float] = None) -> Any:
+        """Blok sampai pemimpin selesai; kembalikan hasilnya atau lempar error-nya"""
+        if not self._selesai.wait(timeout):
+            raise TimeoutError("Menunggu panggilan yang sedang berjalan melewati batas waktu")
+        if self.error is not None:
+            raise self.error
+        return self.hasil
+
+    async def tunggu_async(self) -> Any:
+        """Versi async dari tunggu(); tidak memblok event loop"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            sudah = self._selesai.is_set()
+            if not sudah:
+                self._futures.append((loop, future))
+        if sudah:
+            self._isi_future(future)
+        return await future
+
+
+class Singleflight:
+    """Registry panggilan yang sedang berjalan per kunci, dengan counter penghematan"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._berjalan: Dict[str, Panggilan] = {}
+        self.pemimpin = 0
+        self.bergabung = 0
+        self.gagal = 0
+
+    def mulai(self, kunci: str) -> Tuple[Panggilan, bool]:
+        """Ambil panggilan untuk kunci ini; True jika pemanggil ini pemimpinnya
+
+        Pemimpin wajib memanggil selesai() -- juga saat gagal -- supaya
+        penunggu tidak menggantung.
+        """
+        with self._lock:
+            panggilan = self._berjalan.get(kunci)
+            pemimpin = panggilan is None
+            if pemimpin:
+                panggilan = self._berjalan[kunci] = Panggilan()
+                self.pemimpin += 1
+            else:
+                self.bergabung += 1
+        registry.inc("penilai_singleflight_total", help="Panggilan analisis per peran singleflight",
+                     peran="pemimpin" if pemimpin else "bergabung")
+        return panggilan, pemimpin
+
+    def selesai(self, kunci: str, panggilan: Panggilan, hasil: Any = None, error: Optional[BaseException] = None) -> None:
+        """Lepas kunci dan bangunkan semua penunggu dengan hasil atau error"""
+        if error is not None and not isinstance(error, Exception):
+            # Cancellation/GeneratorExit belongs to the leader only; waiters get a regular error
+            error = PanggilanDibatalkan("Panggilan analisis yang ditunggu dibatalkan")
+        with self._lock:
+            if self._berjalan.get(kunci) is panggilan:
+                del self._berjalan[kunci]
+            if error is not None:
+                self.gagal += 1
+        panggilan._akhiri(hasil, error)
+
+    def jalankan(self, kunci: str, fungsi: Callable[[], Any]) -> Any:
+        """Jalankan fungsi() sekali untuk semua pemanggil bersamaan dengan kunci yang sama"""
+        panggilan, pemimpin = self.mulai(kunci)
+        if not pemimpin:
+            return panggilan.tunggu()
+        try:
+            hasil = fungsi()
+        except BaseException as e:
+            self.selesai(kunci, panggilan, error=e)
+            raise
+        self.selesai(kunci, panggilan, hasil=hasil)
+        return hasil
+
+    async def jalankan_async(self, kunci: str, fungsi: Callable[[], Awaitable[Any]]) -> Any:
+        """Versi async dari jalankan(); bisa bergabung dengan panggilan dari thread/loop lain"""
+        panggilan, pemimpin = self.mulai(kunci)
+        if not pemimpin:
+            return await panggilan.tunggu_async()
+        try:
+            hasil = await fungsi()
+        except BaseException as e:
+            self.selesai(kunci, panggilan, error=e)
+            raise
+        self.selesai(kunci, panggilan, hasil=hasil)
+        return hasil
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.pemimpin + self.bergabung
+            return {
+                "berjalan": len(self._berjalan),
+                "panggilan_api": self.pemimpin,
+                "panggilan_dihemat": self.bergabung,
+                "gagal": self.gagal,
+                "rasio_hemat": self.bergabung / total if total else 0.0,
+            }
+
+
+singleflight = Singleflight()
+
+
+def statistik_singleflight() -> Dict[str, Any]:
+    """Snapshot jumlah panggilan analisis yang digabung untuk seluruh proses"""
+    return singleflight.stats()
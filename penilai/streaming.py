@@ -0,0 +1,101 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class ParserJSONBertahap:
+    """Parser bertahap untuk satu objek JSON yang datang per potongan (stream).
+
+    Setiap field level teratas dikembalikan oleh feed() begitu nilainya
+    lengkap, tanpa menunggu objek ditutup. Field bersarang tidak dipecah:
+    list/objek dikembalikan utuh setelah kurung penutupnya diterima.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.hasil = {}
+        self.selesai = False
+        self._pos = 0
+        self._state = "awal"  # awal -> kunci -> titik_dua -> nilai -> koma -> ...
+        self._kunci: Optional[str] = None
+        self._mulai = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, potongan: str) -> List[Tuple[str, Any]]:
+        """Tambahkan potongan teks; kembalikan field (kunci, nilai) yang baru lengkap"""
+        self.buffer += potongan
+        baru: List[Tuple[str, Any]] = []
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf) and not self.selesai:
+            c = buf[i]
+            state = self._state
+
+            if state == "awal":
+                if c == "{":
+                    self._state = "kunci"
+            elif state == "kunci":
+                if c == '"':
+                    self._state = "string_kunci"
+                    self._mulai = i
+                elif c == "}":
+                    self.selesai = True
+            elif state == "string_kunci":
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._kunci = json.loads(buf[self._mulai:i + 1])
+                    self._state = "titik_dua"
+            elif state == "titik_dua":
+                if c == ":":
+                    self._state = "mulai_nilai"
+            elif state == "mulai_nilai":
+                if not c.isspace():
+                    self._state = "nilai"
+                    self._mulai = i
+                    self._depth = 0
+                    self._in_string = False
+                    continue  # re-process this char as part of the value
+            elif state == "nilai":
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif c == "\\":
+                        self._escape = True
+                    elif c == '"':
+                        self._in_string = False
+                        if self._depth == 0:
+                            self._emit(buf[self._mulai:i + 1], baru)
+                elif c == '"':
+                    self._in_string = True
+                elif c in "{[":
+                    self._depth += 1
+                elif c in "}]":
+                    if self._depth == 0:
+                        # Closing brace of the outer object ends a number/literal value
+                        self._emit(buf[self._mulai:i], baru)
+                        self.selesai = True
+                    else:
+                        self._depth -= 1
+                        if self._depth == 0:
+                            self._emit(buf[self._mulai:i + 1], baru)
+                elif c == "," and self._depth == 0:
+                    self._emit(buf[self._mulai:i], baru)
+                    self._state = "kunci"
+            elif state == "koma":
+                if c == ",":
+                    self._state = "kunci"
+                elif c == "}":
+                    self.selesai = True
+            i += 1
+        self._pos = i
+        return baru
+
+    def _emit(self, teks: str, baru: List[Tuple[str, Any]]) -> None:
+        nilai = json.loads(teks)
+        self.hasil[self._kunci] = nilai
+        baru.append((self._kunci, nilai))
+        self._state = "koma"
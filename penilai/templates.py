@@ -0,0 +1,236 @@
+from penilai.model import AnalisisPrompt
+
+SYSTEM_ANALISIS = "Kamu adalah senior prompt engineering evaluator dengan pengalaman 10+ tahun. Berikan penilaian yang profesional, objektif, dan konstruktif. Fokus pada detail teknis yang konkret dan actionable insights. Jangan terlalu murah memberikan skor tinggi - gunakan standar industri yang ketat. Bahasa tetap ramah tapi profesional dan to-the-point."
+
+# Template analisis; {prompt} diisi prompt pengguna. Teks template ikut menjadi bagian kunci cache.
+TEMPLATE_ANALISIS = """
+        Kamu adalah evaluator prompt engineering yang sangat berpengalaman dan detail. Analisis prompt berikut dengan standar profesional yang tinggi.
+
+        FRAMEWORK EVALUASI:
+        
+        1. CLARITY & SPECIFICITY (25 poin):
+           - Apakah tujuan jelas dan spesifik? 
+           - Apakah instruksi mudah dipahami?
+           - Apakah ada ambiguitas yang bisa membingungkan AI?
+        
+        2. CONTEXT & BACKGROUND (20 poin):
+           - Apakah konteks cukup untuk AI memahami situasi?
+           - Apakah ada informasi penting yang hilang?
+           - Apakah target audience/use case jelas?
+        
+        3. STRUCTURE & ORGANIZATION (20 poin):
+           - Apakah prompt terstruktur dengan baik?
+           - Apakah ada logical flow yang jelas?
+           - Apakah format output ditentukan dengan jelas?
+        
+        4. TECHNIQUE APPROPRIATENESS (20 poin):
+           - Apakah teknik prompt engineering yang digunakan sesuai dengan jenis tugas?
+           - Zero-Shot: Untuk tugas sederhana/umum
+           - Few-Shot: Untuk format/style specific tasks  
+           - Chain of Thought: Untuk reasoning/problem solving
+           - Tree of Thoughts: Untuk creative/exploratory tasks
+        
+        5. COMPLETENESS & CONSTRAINTS (15 poin):
+           - Apakah semua parameter/constraints sudah disebutkan?
+           - Apakah ada guardrails untuk mencegah output yang tidak diinginkan?
+           - Apakah length/format requirements jelas?
+        
+        PENILAIAN YANG REALISTIS:
+        - Skor 90-100: Exceptional - hampir tidak ada yang perlu diperbaiki
+        - Skor 80-89: Very Good - minor improvements saja
+        - Skor 70-79: Good - beberapa area perlu diperbaiki
+        - Skor 60-69: Fair - cukup banyak yang bisa ditingkatkan
+        - Skor 50-59: Poor - banyak masalah fundamental
+        - Skor <50: Very Poor - perlu dirombak total
+        
+        Berikan feedback yang:
+        1. KONSTRUKTIF - fokus pada solusi, bukan hanya kritik
+        2. ACTIONABLE - berikan langkah konkret untuk perbaikan
+        3. BALANCED - sebutkan apa yang sudah baik sebelum kritik
+        4. SPECIFIC - hindari feedback generic, berikan contoh konkret
+        
+        Berikan respons dalam format JSON:
+        {{
+            "skor": <0-100, berdasarkan framework di atas>,
+            "jenis_tugas": "<kategorisasi spesifik: creative writing, data analysis, code generation, problem solving, etc>",
+            "teknik_sesuai": ["teknik yang paling cocok untuk jenis tugas ini"],
+            "teknik_ditemukan": [
+                {{
+                    "teknik": "nama teknik",
+                    "alasan": "penjelasan spesifik mengapa terdeteksi sebagai teknik ini, dengan kutipan bagian prompt yang relevan"
+                }}
+            ],
+            "teknik_disarankan": [
+                {{
+                    "teknik": "nama teknik yang disarankan",
+                    "alasan": "penjelasan mengapa teknik ini akan meningkatkan hasil, dan bagaimana implementasinya"
+                }}
+            ],
+            "kelebihan": ["poin kuat yang sudah bagus - sebutkan dengan spesifik"],
+            "kekurangan": ["masalah konkret yang perlu diperbaiki - dengan penjelasan"],
+            "rekomendasi": ["3-4 saran improvement yang paling impactful"],
+            "versi_perbaikan": "prompt yang sudah diperbaiki dengan menerapkan rekomendasi"
+        }}
+        
+        PENTING untuk teknik_disarankan:
+        - Jika teknik yang disarankan SUDAH digunakan dengan baik dalam prompt, berikan pujian dan jelaskan bahwa teknik tersebut sudah optimal
+        - Jika teknik belum digunakan, berikan saran konkret bagaimana mengimplementasikannya
+        - Jangan menyarankan teknik yang sudah ada kecuali perlu peningkatan
+        
+        Prompt yang dianalisis:
+        \"\"\"
+        {prompt}
+        \"\"\"
+        
+        Berikan evaluasi yang honest dan membangun dalam bahasa Indonesia.
+        """
+
+# Mode "gabung": tips kilat diminta di JSON yang sama supaya cukup satu round trip ke model
+TEMPLATE_ANALISIS_GABUNG = TEMPLATE_ANALISIS.replace(
+    '''"versi_perbaikan": "prompt yang sudah diperbaiki dengan menerapkan rekomendasi"''',
+    '''"versi_perbaikan": "prompt yang sudah diperbaiki dengan menerapkan rekomendasi",
+            "tips_kilat": ["3-4 tips kilat, satu kalimat per item, diawali emoji yang relevan"]'''
+).replace(
+    '''        Prompt yang dianalisis:''',
+    '''        PENTING untuk tips_kilat:
+        - SPESIFIK untuk prompt ini dan ACTIONABLE - bisa langsung diterapkan
+        - Fokus pada perbaikan yang paling berdampak sesuai jenis tugas
+        - Contoh: "🎯 Tambahkan definisi spesifik tentang 'analisis mendalam' - sebutkan aspek apa saja yang harus dianalisis"
+        
+        Prompt yang dianalisis:'''
+)
+
+# Mode analisis "paralel": tiap kriteria framework dinilai lewat request kecil sendiri.
+# (nama, judul, bobot, pertanyaan); bobot sama dengan FRAMEWORK EVALUASI di TEMPLATE_ANALISIS
+KRITERIA = (
+    ("clarity", "CLARITY & SPECIFICITY", 25, """
+           - Apakah tujuan jelas dan spesifik?
+           - Apakah instruksi mudah dipahami?
+           - Apakah ada ambiguitas yang bisa membingungkan AI?"""),
+    ("context", "CONTEXT & BACKGROUND", 20, """
+           - Apakah konteks cukup untuk AI memahami situasi?
+           - Apakah ada informasi penting yang hilang?
+           - Apakah target audience/use case jelas?"""),
+    ("structure", "STRUCTURE & ORGANIZATION", 20, """
+           - Apakah prompt terstruktur dengan baik?
+           - Apakah ada logical flow yang jelas?
+           - Apakah format output ditentukan dengan jelas?"""),
+    ("technique", "TECHNIQUE APPROPRIATENESS", 20, """
+           - Apakah teknik prompt engineering yang digunakan sesuai dengan jenis tugas?
+           - Zero-Shot: Untuk tugas sederhana/umum
+           - Few-Shot: Untuk format/style specific tasks
+           - Chain of Thought: Untuk reasoning/problem solving
+           - Tree of Thoughts: Untuk creative/exploratory tasks"""),
+    ("completeness", "COMPLETENESS & CONSTRAINTS", 15, """
+           - Apakah semua parameter/constraints sudah disebutkan?
+           - Apakah ada guardrails untuk mencegah output yang tidak diinginkan?
+           - Apakah length/format requirements jelas?"""),
+)
+
+_KERANGKA_KRITERIA = """
+        Kamu adalah evaluator prompt engineering yang sangat berpengalaman dan detail. Nilai SATU aspek saja dari prompt berikut dengan standar profesional yang tinggi.
+
+        ASPEK: <judul>
+<pertanyaan>
+
+        Skor 90-100 exceptional, 80-89 very good, 70-79 good, 60-69 fair, 50-59 poor, <50 very poor.
+
+        Berikan respons dalam format JSON yang singkat:
+        {{
+            "skor": <0-100 untuk aspek ini saja>,
+            "kelebihan": ["maksimal 2 poin kuat yang spesifik untuk aspek ini"],
+            "kekurangan": ["maksimal 2 masalah konkret untuk aspek ini"],
+            "rekomendasi": ["maksimal 2 saran perbaikan untuk aspek ini"]<tambahan>
+        }}
+
+        Prompt yang dianalisis:
+        \"\"\"
+        {prompt}
+        \"\"\"
+
+        Berikan evaluasi yang honest dan membangun dalam bahasa Indonesia.
+        """
+
+# The technique criterion also classifies the task, as the single-call template does
+_TAMBAHAN_TEKNIK = """,
+            "jenis_tugas": "<kategorisasi spesifik: creative writing, data analysis, code generation, problem solving, etc>",
+            "teknik_sesuai": ["teknik yang paling cocok untuk jenis tugas ini"],
+            "teknik_ditemukan": [{{"teknik": "nama teknik", "alasan": "alasan singkat dengan kutipan prompt"}}],
+            "teknik_disarankan": [{{"teknik": "nama teknik", "alasan": "alasan singkat dan cara menerapkannya"}}]"""
+
+TEMPLATE_KRITERIA = {
+    nama: _KERANGKA_KRITERIA.replace("<judul>", f"{judul} (bobot {bobot} dari 100)")
+    .replace("<pertanyaan>", pertanyaan.strip("\n"))
+    .replace("<tambahan>", _TAMBAHAN_TEKNIK if nama == "technique" else "")
+    for nama, judul, bobot, pertanyaan in KRITERIA
+}
+
+TEMPLATE_PERBAIKAN = """
+        Kamu adalah evaluator prompt engineering yang sangat berpengalaman. Tulis ulang prompt berikut supaya unggul di semua aspek: clarity & specificity, context & background, structure & organization, technique appropriateness, dan completeness & constraints.
+
+        Berikan respons dalam format JSON:
+        {{
+            "versi_perbaikan": "prompt yang sudah diperbaiki, siap dipakai"
+        }}
+
+        Prompt yang diperbaiki:
+        \"\"\"
+        {prompt}
+        \"\"\"
+
+        Tulis versi perbaikan dalam bahasa yang sama dengan prompt asli.
+        """
+
+# Mode tips "gabung" on the rewrite call, which has the most output budget to spare
+TEMPLATE_PERBAIKAN_GABUNG = TEMPLATE_PERBAIKAN.replace(
+    '''"versi_perbaikan": "prompt yang sudah diperbaiki, siap dipakai"''',
+    '''"versi_perbaikan": "prompt yang sudah diperbaiki, siap dipakai",
+            "tips_kilat": ["3-4 tips kilat untuk prompt asli, satu kalimat per item, diawali emoji yang relevan"]'''
+)
+
+SYSTEM_TIPS = "Kamu adalah guru prompt engineering yang memberikan tips praktis dan spesifik. Berikan tips yang actionable dan mudah dipahami."
+
+# Template tips kilat; diisi lewat buat_prompt_tips()
+TEMPLATE_TIPS = """
+    Berdasarkan evaluasi prompt berikut:
+
+    PROMPT ASLI:
+    \"\"\"{prompt_asli}\"\"\"
+
+    HASIL ANALISIS:
+    - Skor: {skor}/100
+    - Jenis tugas: {jenis_tugas}
+    - Teknik ditemukan: {teknik_ditemukan}
+    - Teknik disarankan: {teknik_disarankan}
+    - Kekurangan utama: {kekurangan}
+
+    Berikan 3-4 rekomendasi perbaikan yang:
+    1. SPESIFIK untuk prompt ini - jangan generic
+    2. ACTIONABLE - bisa langsung diterapkan
+    3. PRIORITAS TINGGI - fokus pada perbaikan yang paling berdampak
+    4. KONTEKSTUAL - sesuai dengan jenis tugas dan tujuan prompt
+
+    Format: satu rekomendasi per baris, mulai dengan emoji yang relevan.
+    Gunakan bahasa profesional tapi tetap mudah dipahami.
+    
+    Contoh format yang diinginkan:
+    🎯 Tambahkan definisi spesifik tentang "analisis mendalam" - sebutkan aspek apa saja yang harus dianalisis
+    📝 Spesifikasi format output dengan struktur yang jelas (bullets, numbered list, atau paragraf)
+
+    Respons hanya berupa list rekomendasi, tanpa penjelasan tambahan.
+    """
+
+def buat_prompt_analisis(prompt: str, template: str = TEMPLATE_ANALISIS) -> str:
+    """Isi template analisis dengan prompt pengguna"""
+    return template.format(prompt=prompt)
+
+def buat_prompt_tips(analisis: AnalisisPrompt, prompt_asli: str) -> str:
+    """Isi template tips kilat dengan ringkasan hasil analisis"""
+    return TEMPLATE_TIPS.format(
+        prompt_asli=prompt_asli,
+        skor=analisis.skor,
+        jenis_tugas=analisis.jenis_tugas,
+        teknik_ditemukan=', '.join([t.teknik for t in analisis.teknik_ditemukan]) if analisis.teknik_ditemukan else 'Tidak ada',
+        teknik_disarankan=', '.join([t.teknik for t in analisis.teknik_disarankan]) if analisis.teknik_disarankan else 'Tidak ada',
+        kekurangan='; '.join(analisis.kekurangan[:3]) if analisis.kekurangan else 'Tidak ada'
+    )
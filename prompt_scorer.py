@@ -1,38 +1,37 @@
-import streamlit as st
-import openai
-from typing import Dict, List, Tuple
-import json
-import os
-from dataclasses import dataclass
-from enum import Enum
-from dotenv import load_dotenv
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
-# Load environment variables
-load_dotenv()
+import streamlit as st
 
-# Configuration - Streamlit Cloud compatible
-def get_config():
-    """Get configuration from Streamlit secrets or environment variables"""
-    try:
-        # Try Streamlit secrets first (for Streamlit Cloud)
-        return {
-            "api_key": st.secrets["openai"]["api_key"],
-            "model": st.secrets["openai"]["model"],
-            "temperature": st.secrets["openai"]["temperature"],
-            "app_title": st.secrets["app"]["title"],
-            "app_debug": st.secrets["app"]["debug"]
-        }
-    except (KeyError, FileNotFoundError):
-        # Fallback to environment variables (for local development)
-        return {
-            "api_key": os.getenv("OPENAI_API_KEY"),
-            "model": os.getenv("OPENAI_MODEL", "gpt-4"),
-            "temperature": float(os.getenv("OPENAI_TEMPERATURE", "0.3")),
-            "app_title": os.getenv("APP_TITLE", "Penilai Prompt Engineering"),
-            "app_debug": os.getenv("APP_DEBUG", "False").lower() == "true"
-        }
+from penilai import (
+    CONTOH_PROMPT,
+    KRITERIA,
+    AnalisisError,
+    AntrianError,
+    AnalisisPrompt,
+    HasilContoh,
+    KeputusanAnggaran,
+    KoleksiContoh,
+    PenilaiPrompt,
+    PraAnalisis,
+    PromptMirip,
+    RiwayatEvaluasi,
+    analisis_lokal,
+    get_config,
+    get_koleksi_contoh,
+    nama_contoh,
+    pra_analisis,
+    registry,
+    statistik_cascade,
+    statistik_koneksi,
+    statistik_singleflight,
+    tips_default,
+    tips_lokal
+)
+from penilai.metrics import timer
 
-config = get_config()
+config = get_config(st.secrets)
 
 st.set_page_config(
     page_title=config["app_title"],
@@ -40,237 +39,89 @@ st.set_page_config(
     layout="wide"
 )
 
-# Teknik Prompt Engineering
-class TeknikPrompt(Enum):
-    ZERO_SHOT = "Zero-Shot"
-    FEW_SHOT = "Few-Shot"
-    CHAIN_OF_THOUGHT = "Chain of Thought"
-    TREE_OF_THOUGHTS = "Tree of Thoughts"
-
-@dataclass
-class TeknikInfo:
-    teknik: str
-    alasan: str
-
-@dataclass
-class AnalisisPrompt:
-    skor: int
-    jenis_tugas: str
-    teknik_sesuai: List[str]
-    teknik_ditemukan: List[TeknikInfo]
-    teknik_disarankan: List[TeknikInfo]
-    kelebihan: List[str]
-    kekurangan: List[str]
-    rekomendasi: List[str]
-    versi_perbaikan: str
-
-class PenilaiPrompt:
-    def __init__(self):
-        api_key = config["api_key"]
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY tidak ditemukan")
-        self.client = openai.OpenAI(api_key=api_key)
-        
-    def analisis_prompt(self, prompt: str) -> AnalisisPrompt:
-        """Analisis prompt berdasarkan konteks penggunaan"""
-        
-        prompt_analisis = f"""
-        Kamu adalah evaluator prompt engineering yang sangat berpengalaman dan detail. Analisis prompt berikut dengan standar profesional yang tinggi.
-
-        FRAMEWORK EVALUASI:
-        
-        1. CLARITY & SPECIFICITY (25 poin):
-           - Apakah tujuan jelas dan spesifik? 
-           - Apakah instruksi mudah dipahami?
-           - Apakah ada ambiguitas yang bisa membingungkan AI?
-        
-        2. CONTEXT & BACKGROUND (20 poin):
-           - Apakah konteks cukup untuk AI memahami situasi?
-           - Apakah ada informasi penting yang hilang?
-           - Apakah target audience/use case jelas?
-        
-        3. STRUCTURE & ORGANIZATION (20 poin):
-           - Apakah prompt terstruktur dengan baik?
-           - Apakah ada logical flow yang jelas?
-           - Apakah format output ditentukan dengan jelas?
-        
-        4. TECHNIQUE APPROPRIATENESS (20 poin):
-           - Apakah teknik prompt engineering yang digunakan sesuai dengan jenis tugas?
-           - Zero-Shot: Untuk tugas sederhana/umum
-           - Few-Shot: Untuk format/style specific tasks  
-           - Chain of Thought: Untuk reasoning/problem solving
-           - Tree of Thoughts: Untuk creative/exploratory tasks
-        
-        5. COMPLETENESS & CONSTRAINTS (15 poin):
-           - Apakah semua parameter/constraints sudah disebutkan?
-           - Apakah ada guardrails untuk mencegah output yang tidak diinginkan?
-           - Apakah length/format requirements jelas?
-        
-        PENILAIAN YANG REALISTIS:
-        - Skor 90-100: Exceptional - hampir tidak ada yang perlu diperbaiki
-        - Skor 80-89: Very Good - minor improvements saja
-        - Skor 70-79: Good - beberapa area perlu diperbaiki
-        - Skor 60-69: Fair - cukup banyak yang bisa ditingkatkan
-        - Skor 50-59: Poor - banyak masalah fundamental
-        - Skor <50: Very Poor - perlu dirombak total
-        
-        Berikan feedback yang:
-        1. KONSTRUKTIF - fokus pada solusi, bukan hanya kritik
-        2. ACTIONABLE - berikan langkah konkret untuk perbaikan
-        3. BALANCED - sebutkan apa yang sudah baik sebelum kritik
-        4. SPECIFIC - hindari feedback generic, berikan contoh konkret
-        
-        Berikan respons dalam format JSON:
-        {{
-            "skor": <0-100, berdasarkan framework di atas>,
-            "jenis_tugas": "<kategorisasi spesifik: creative writing, data analysis, code generation, problem solving, etc>",
-            "teknik_sesuai": ["teknik yang paling cocok untuk jenis tugas ini"],
-            "teknik_ditemukan": [
-                {{
-                    "teknik": "nama teknik",
-                    "alasan": "penjelasan spesifik mengapa terdeteksi sebagai teknik ini, dengan kutipan bagian prompt yang relevan"
-                }}
-            ],
-            "teknik_disarankan": [
-                {{
-                    "teknik": "nama teknik yang disarankan",
-                    "alasan": "penjelasan mengapa teknik ini akan meningkatkan hasil, dan bagaimana implementasinya"
-                }}
-            ],
-            "kelebihan": ["poin kuat yang sudah bagus - sebutkan dengan spesifik"],
-            "kekurangan": ["masalah konkret yang perlu diperbaiki - dengan penjelasan"],
-            "rekomendasi": ["3-4 saran improvement yang paling impactful"],
-            "versi_perbaikan": "prompt yang sudah diperbaiki dengan menerapkan rekomendasi"
-        }}
-        
-        PENTING untuk teknik_disarankan:
-        - Jika teknik yang disarankan SUDAH digunakan dengan baik dalam prompt, berikan pujian dan jelaskan bahwa teknik tersebut sudah optimal
-        - Jika teknik belum digunakan, berikan saran konkret bagaimana mengimplementasikannya
-        - Jangan menyarankan teknik yang sudah ada kecuali perlu peningkatan
-        
-        Prompt yang dianalisis:
-        \"\"\"
-        {prompt}
-        \"\"\"
-        
-        Berikan evaluasi yang honest dan membangun dalam bahasa Indonesia.
-        """
-        
-        try:
-            response = self.client.chat.completions.create(
-                model=config["model"],
-                messages=[
-                    {"role": "system", "content": "Kamu adalah senior prompt engineering evaluator dengan pengalaman 10+ tahun. Berikan penilaian yang profesional, objektif, dan konstruktif. Fokus pada detail teknis yang konkret dan actionable insights. Jangan terlalu murah memberikan skor tinggi - gunakan standar industri yang ketat. Bahasa tetap ramah tapi profesional dan to-the-point."},
-                    {"role": "user", "content": prompt_analisis}
-                ],
-                temperature=config["temperature"],
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            
-            # Parse teknik_ditemukan and teknik_disarankan
-            teknik_ditemukan = [
-                TeknikInfo(teknik=item["teknik"], alasan=item["alasan"]) 
-                for item in result["teknik_ditemukan"]
-            ] if result["teknik_ditemukan"] else []
-            
-            teknik_disarankan = [
-                TeknikInfo(teknik=item["teknik"], alasan=item["alasan"]) 
-                for item in result["teknik_disarankan"]
-            ] if result["teknik_disarankan"] else []
-            
-            return AnalisisPrompt(
-                skor=result["skor"],
-                jenis_tugas=result["jenis_tugas"],
-                teknik_sesuai=result["teknik_sesuai"],
-                teknik_ditemukan=teknik_ditemukan,
-                teknik_disarankan=teknik_disarankan,
-                kelebihan=result["kelebihan"],
-                kekurangan=result["kekurangan"],
-                rekomendasi=result["rekomendasi"],
-                versi_perbaikan=result["versi_perbaikan"]
-            )
-            
-        except Exception as e:
-            st.error(f"Error saat menganalisis prompt: {str(e)}")
-            st.info("Pastikan OPENAI_API_KEY sudah diset dengan benar")
-            return None
-
-def generate_tips_kilat(analisis: AnalisisPrompt, client, prompt_asli: str) -> List[str]:
-    """Generate tips kilat berdasarkan analisis AI dan prompt asli"""
-    prompt_tips = f"""
-    Berdasarkan evaluasi prompt berikut:
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool bersama untuk pekerjaan API di latar belakang (tips kilat)"""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="tips-kilat")
 
-    PROMPT ASLI:
-    \"\"\"{prompt_asli}\"\"\"
+def tampilkan_pra_analisis(pra: PraAnalisis):
+    """Tampilkan hasil deteksi lokal instan selagi evaluasi model berjalan"""
+    st.caption("⚡ Deteksi cepat (lokal) - hasil sementara sambil menunggu evaluasi model")
+    col1, col2, col3 = st.columns([1, 2, 2])
+    with col1:
+        st.metric("Skor perkiraan", f"~{pra.skor_perkiraan}")
+    with col2:
+        st.markdown("**Teknik terdeteksi:** " + ", ".join(t.teknik for t in pra.teknik))
+        st.caption(pra.teknik[0].alasan)
+    with col3:
+        st.markdown(" ".join(
+            f"{'✅' if ada else '▫️'} {nama.replace('_', ' ')}" for nama, ada in pra.fitur.items()
+        ))
 
-    HASIL ANALISIS:
-    - Skor: {analisis.skor}/100
-    - Jenis tugas: {analisis.jenis_tugas}
-    - Teknik ditemukan: {', '.join([t.teknik for t in analisis.teknik_ditemukan]) if analisis.teknik_ditemukan else 'Tidak ada'}
-    - Teknik disarankan: {', '.join([t.teknik for t in analisis.teknik_disarankan]) if analisis.teknik_disarankan else 'Tidak ada'}
-    - Kekurangan utama: {'; '.join(analisis.kekurangan[:3]) if analisis.kekurangan else 'Tidak ada'}
+def tampilkan_prompt_mirip(penilai: PenilaiPrompt, prompt: str, mirip: PromptMirip, analisis: AnalisisPrompt):
+    """Pratinjau analisis prompt mirip yang pernah dinilai, bisa dipakai tanpa evaluasi baru"""
+    with st.container(border=True):
+        if mirip.identik:
+            st.caption(f"🔁 Prompt ini sama dengan yang pernah dinilai (hanya beda spasi/tanda baca) - skor {analisis.skor}/100")
+        else:
+            st.caption(f"🔁 Mirip {mirip.kemiripan:.0%} dengan prompt yang pernah dinilai - skor {analisis.skor}/100")
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            with st.expander("Lihat prompt sebelumnya"):
+                st.text(mirip.prompt)
+        with col2:
+            if st.button("⚡ Pakai analisis itu", use_container_width=True):
+                penilai.catat_riwayat(prompt, analisis, "mirip")
+                simpan_hasil(penilai, prompt, analisis)
 
-    Berikan 3-4 rekomendasi perbaikan yang:
-    1. SPESIFIK untuk prompt ini - jangan generic
-    2. ACTIONABLE - bisa langsung diterapkan
-    3. PRIORITAS TINGGI - fokus pada perbaikan yang paling berdampak
-    4. KONTEKSTUAL - sesuai dengan jenis tugas dan tujuan prompt
+def tampilkan_anggaran(keputusan: KeputusanAnggaran):
+    """Beri tahu pengguna kalau prompt dipangkas supaya muat anggaran token input"""
+    bagian = []
+    if keputusan.bagian_diringkas:
+        bagian.append(f"{keputusan.bagian_diringkas} bagian tengah diringkas")
+    if keputusan.bagian_dihapus:
+        bagian.append(f"{keputusan.bagian_dihapus} bagian dihapus")
+    st.info(
+        f"✂️ Prompt ini sekitar {keputusan.token_prompt:,} token - melebihi anggaran "
+        f"{keputusan.anggaran:,} token per evaluasi. Yang dinilai versi ringkasnya "
+        f"(±{keputusan.token_dikirim:,} token{': ' + ', '.join(bagian) if bagian else ''}); "
+        f"bagian awal dan akhir prompt tetap utuh."
+    )
 
-    Format: satu rekomendasi per baris, mulai dengan emoji yang relevan.
-    Gunakan bahasa profesional tapi tetap mudah dipahami.
+def analisis_dengan_streaming(penilai: PenilaiPrompt, prompt: str, pakai_cache: bool) -> AnalisisPrompt:
+    """Jalankan analisis streaming sambil menampilkan tiap field begitu lengkap"""
+    pratinjau = st.empty()
+    with pratinjau.container():
+        st.caption("⏳ Hasil sementara - evaluasi masih berjalan...")
+        col1, col2 = st.columns([1, 2])
+        slot = {
+            "skor": col1.empty(),
+            "jenis_tugas": col2.empty(),
+            "kelebihan": col1.empty(),
+            "kekurangan": col2.empty(),
+            "versi_perbaikan": st.empty()
+        }
     
-    Contoh format yang diinginkan:
-    🎯 Tambahkan definisi spesifik tentang "analisis mendalam" - sebutkan aspek apa saja yang harus dianalisis
-    📝 Spesifikasi format output dengan struktur yang jelas (bullets, numbered list, atau paragraf)
-
-    Respons hanya berupa list rekomendasi, tanpa penjelasan tambahan.
-    """
+    analisis = None
+    for kunci, nilai in penilai.analisis_prompt_stream(prompt, pakai_cache=pakai_cache):
+        if kunci == "selesai":
+            analisis = nilai
+        elif kunci == "skor":
+            slot["skor"].metric("Skor", f"{nilai}/100")
+        elif kunci == "jenis_tugas":
+            slot["jenis_tugas"].info(f"**📌 Kategori Tugas:** {nilai}")
+        elif kunci == "kelebihan":
+            slot["kelebihan"].markdown("**✅ Kelebihan:**\n" + "\n".join(f"- {item}" for item in nilai))
+        elif kunci == "kekurangan":
+            slot["kekurangan"].markdown("**⚠️ Area Perbaikan:**\n" + "\n".join(f"- {item}" for item in nilai))
+        elif kunci == "versi_perbaikan":
+            slot["versi_perbaikan"].code(nilai, language="text")
     
-    try:
-        response = client.chat.completions.create(
-            model=config["model"],
-            messages=[
-                {"role": "system", "content": "Kamu adalah guru prompt engineering yang memberikan tips praktis dan spesifik. Berikan tips yang actionable dan mudah dipahami."},
-                {"role": "user", "content": prompt_tips}
-            ],
-            temperature=0.7,
-            max_tokens=300
-        )
-        
-        tips_text = response.choices[0].message.content
-        tips = [tip.strip() for tip in tips_text.split('\n') if tip.strip() and not tip.strip().startswith('#')]
-        return tips[:4]  # Maximum 4 tips
-        
-    except Exception as e:
-        # Fallback ke tips default jika API error
-        if analisis.skor < 30:
-            return [
-                "🎯 Jelasin tujuan kamu lebih detail biar AI paham maksudnya",
-                "📝 Kasih instruksi yang step-by-step, biar AI gak bingung",
-                "🌟 Tambahin konteks yang lebih lengkap untuk hasil yang lebih baik"
-            ]
-        elif analisis.skor < 50:
-            return [
-                "📋 Tambahin 1-2 contoh biar AI tau persis yang kamu mau",
-                "🧠 Minta AI jelasin 'langkah demi langkah'",
-                "📐 Tentuin format output yang spesifik"
-            ]
-        elif analisis.skor < 75:
-            return [
-                "🎭 Kasih peran ke AI (misal: 'Kamu adalah ahli marketing')",
-                "🌳 Minta AI pertimbangkan beberapa opsi",
-                "✨ Sebutin tone yang diinginkan"
-            ]
-        else:
-            return [
-                "👑 Pertahanin konsistensi struktur yang udah bagus ini",
-                "🔮 Coba eksplorasi teknik lanjutan",
-                "💡 Eksperimen dengan variasi yang lebih kompleks"
-            ]
+    # Full results are rendered below once complete
+    pratinjau.empty()
+    return analisis
 
-def tampilkan_rekomendasi_cepat(analisis: AnalisisPrompt, penilai, prompt_asli: str):
+def tampilkan_rekomendasi_cepat(analisis: AnalisisPrompt, tips: List[str]):
     """Tampilkan rekomendasi cepat berdasarkan analisis AI"""
     st.subheader("💡 Rekomendasi Utama")
     
@@ -284,12 +135,11 @@ def tampilkan_rekomendasi_cepat(analisis: AnalisisPrompt, penilai, prompt_asli:
     else:
         st.success("🎯 **Excellent!** - Prompt Anda sudah sangat baik, sedikit finishing touch:")
     
-    # Generate and display tips
-    tips = generate_tips_kilat(analisis, penilai.client, prompt_asli)
+    # Display tips
     for tip in tips:
         st.markdown(f"• {tip}")
 
-def tampilkan_meter_skor(skor: int):
+def tampilkan_meter_skor(skor: int, rayakan: bool = True):
     """Tampilkan meter skor visual dengan gaya profesional"""
     if skor < 50:
         status = "Perlu Peningkatan"
@@ -311,7 +161,7 @@ def tampilkan_meter_skor(skor: int):
         status = "Excellent"
         color = "#96ceb4"
         pesan = "Kualitas exceptional, siap production"
-        if skor >= 95:
+        if skor >= 95 and rayakan:
             st.balloons()
     
     st.markdown(f"""
@@ -323,13 +173,282 @@ def tampilkan_meter_skor(skor: int):
     """, unsafe_allow_html=True)
     st.progress(skor / 100)
 
+def simpan_hasil(penilai: PenilaiPrompt, prompt: str, analisis: AnalisisPrompt, tips: Optional[List[str]] = None):
+    """Simpan hasil evaluasi di session state dan mulai tips kilat di background (kalau belum ada)"""
+    st.session_state.hasil = {
+        "prompt": prompt,
+        "analisis": analisis,
+        "tips": tips,
+        "baru": True
+    }
+    if tips is not None:
+        st.session_state.pop("tips_future", None)
+        return
+    # Tips need a second model call unless they came back with the analysis ("gabung" mode);
+    # run it in the background while the rest of the page renders
+    st.session_state.tips_future = get_executor().submit(penilai.tips_kilat, analisis, prompt)
+
+def sajikan_contoh(penilai: PenilaiPrompt, contoh: KoleksiContoh, hasil: HasilContoh):
+    """Tampilkan hasil tersimpan prompt contoh; artefak versi lama memicu penyegaran di background"""
+    if not hasil.segar:
+        contoh.segarkan_background()
+        st.toast("ℹ️ Hasil contoh ini dari model/template sebelumnya; versi baru sedang disiapkan")
+    penilai.catat_riwayat(hasil.prompt, hasil.analisis, "contoh")
+    simpan_hasil(penilai, hasil.prompt, hasil.analisis, hasil.tips)
+
+@st.fragment
+def tampilkan_hasil():
+    """Render hasil evaluasi terakhir dari session state, tanpa memanggil API lagi"""
+    hasil = st.session_state.hasil
+    analisis = hasil["analisis"]
+    # Balloons only on the first render of a fresh evaluation, not on every rerun
+    rayakan = hasil.pop("baru", False)
+    
+    st.markdown("---")
+    
+    if analisis.sumber == "lokal":
+        st.warning("⚠️ Model sedang tidak bisa dihubungi - ini hasil analisis lokal sementara. Coba evaluasi lagi nanti untuk penilaian lengkap.")
+    
+    # Quick recommendations first (filled in once the tips are ready)
+    slot_rekomendasi = st.container()
+    if hasil["tips"] is None:
+        with slot_rekomendasi:
+            spinner_tips = st.empty()
+            spinner_tips.caption("⏳ Menyiapkan rekomendasi utama...")
+    
+    st.markdown("---")
+    
+    # Results header
+    st.header("📊 Hasil Evaluasi Prompt")
+    
+    # Score and task type
+    col1, col2, col3 = st.columns([2, 1, 2])
+    
+    with col1:
+        st.info(f"**📌 Kategori Tugas:** {analisis.jenis_tugas}")
+    
+    with col2:
+        tampilkan_meter_skor(analisis.skor, rayakan=rayakan)
+    
+    with col3:
+        st.info(f"**🎯 Teknik yang Direkomendasikan:** {', '.join(analisis.teknik_sesuai)}")
+    
+    # Per-criterion breakdown, only present in the parallel analysis mode
+    if analisis.skor_kriteria:
+        kolom = st.columns(len(KRITERIA))
+        for (nama, judul, bobot, _), kol in zip(KRITERIA, kolom):
+            kol.metric(f"{judul.title()} ({bobot}%)", f"{analisis.skor_kriteria.get(nama, 0)}/100")
+    
+    # Technique analysis
+    st.subheader("🔍 Analisis Teknik Prompt Engineering")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**✅ Teknik yang Teridentifikasi:**")
+        if analisis.teknik_ditemukan:
+            for teknik_info in analisis.teknik_ditemukan:
+                with st.expander(f"📋 {teknik_info.teknik}", expanded=False):
+                    st.write(f"**Alasan:** {teknik_info.alasan}")
+        else:
+            st.warning("• Belum menggunakan teknik spesifik")
+    
+    with col2:
+        st.markdown("**💡 Teknik yang Disarankan:**")
+        if analisis.teknik_disarankan:
+            for teknik_info in analisis.teknik_disarankan:
+                # Check if this is praise (technique already used well) or suggestion
+                if any(dt.teknik.lower() == teknik_info.teknik.lower() for dt in analisis.teknik_ditemukan):
+                    with st.expander(f"🎉 {teknik_info.teknik} (Sudah Baik!)", expanded=False):
+                        st.success(f"**Pujian:** {teknik_info.alasan}")
+                else:
+                    with st.expander(f"🔧 {teknik_info.teknik}", expanded=False):
+                        st.info(f"**Saran:** {teknik_info.alasan}")
+        else:
+            st.success("• Penggunaan teknik sudah optimal")
+    
+    # Detailed feedback
+    st.subheader("📋 Evaluasi Detail")
+    
+    tab1, tab2, tab3 = st.tabs(["✅ Kelebihan", "⚠️ Area Perbaikan", "📝 Rekomendasi"])
+    
+    with tab1:
+        if analisis.kelebihan:
+            st.markdown("**Aspek yang sudah baik dalam prompt Anda:**")
+            for item in analisis.kelebihan:
+                st.markdown(f"• {item}")
+        else:
+            st.info("Masih ada potensi pengembangan yang bisa dioptimalkan")
+    
+    with tab2:
+        if analisis.kekurangan:
+            st.markdown("**Area yang memerlukan perbaikan:**")
+            for item in analisis.kekurangan:
+                st.markdown(f"• {item}")
+        else:
+            st.success("Tidak ada kekurangan signifikan yang teridentifikasi")
+    
+    with tab3:
+        if analisis.rekomendasi:
+            st.markdown("**Saran perbaikan untuk optimalisasi:**")
+            for item in analisis.rekomendasi:
+                st.markdown(f"• {item}")
+        else:
+            st.info("Prompt sudah optimal untuk kategori tugas ini")
+    
+    # Improved version
+    st.subheader("🚀 Prompt yang Dioptimalkan")
+    
+    if analisis.versi_perbaikan:
+        # Show improved prompt
+        st.code(analisis.versi_perbaikan, language="text")
+        
+        # Comparison toggle
+        tampilkan_perbandingan(hasil["prompt"], analisis.versi_perbaikan)
+    else:
+        st.info("Versi perbaikan membutuhkan evaluasi model")
+    
+    # Success message
+    st.success("✅ Evaluasi selesai! Silakan gunakan versi yang telah dioptimalkan untuk hasil yang lebih baik.")
+    
+    if hasil["tips"] is None:
+        hasil["tips"] = st.session_state.pop("tips_future").result()
+        spinner_tips.empty()
+    with slot_rekomendasi:
+        tampilkan_rekomendasi_cepat(analisis, hasil["tips"])
+
+@st.fragment
+def tampilkan_riwayat(riwayat: RiwayatEvaluasi):
+    """Dashboard riwayat evaluasi: ringkasan dari tabel agregat, daftar dari query berindeks"""
+    st.header("📊 Riwayat Evaluasi")
+    mulai = time.perf_counter()
+    semua = riwayat.ringkasan()
+    if not semua["total"]:
+        st.info("Belum ada evaluasi yang tercatat.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        pilihan = st.selectbox("Jenis tugas", ["Semua", *(j["nama"] for j in semua["jenis_tugas"])])
+    with col2:
+        skor_min, skor_maks = st.slider("Rentang skor", 0, 100, (0, 100))
+    jenis_tugas = None if pilihan == "Semua" else pilihan
+    ringkasan = semua if jenis_tugas is None else riwayat.ringkasan(jenis_tugas)
+    entri = riwayat.daftar(
+        batas=100,
+        jenis_tugas=jenis_tugas,
+        skor_min=skor_min if skor_min > 0 else None,
+        skor_maks=skor_maks if skor_maks < 100 else None,
+    )
+    durasi = (time.perf_counter() - mulai) * 1000
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total evaluasi", f"{ringkasan['total']:,}")
+    col2.metric("Rata-rata skor", ringkasan["rata_skor"])
+    col3.metric("Teknik terbanyak", ringkasan["teknik"][0]["nama"] if ringkasan["teknik"] else "-")
+
+    kiri, kanan = st.columns(2)
+    with kiri:
+        st.markdown("**Distribusi skor**")
+        st.bar_chart(
+            [{"skor": rentang, "jumlah": jumlah} for rentang, jumlah in ringkasan["distribusi_skor"].items()],
+            x="skor", y="jumlah"
+        )
+    with kanan:
+        st.markdown("**Pemakaian teknik** (`-` = tidak ada teknik terdeteksi)")
+        st.bar_chart(
+            [{"teknik": t["nama"], "jumlah": t["jumlah"]} for t in ringkasan["teknik"]],
+            x="teknik", y="jumlah"
+        )
+    st.markdown("**Evaluasi per hari**")
+    st.line_chart(
+        [{"tanggal": tanggal, "jumlah": jumlah} for tanggal, jumlah in ringkasan["per_hari"].items()],
+        x="tanggal", y="jumlah"
+    )
+    if jenis_tugas is None:
+        st.markdown("**Jenis tugas**")
+        st.dataframe(semua["jenis_tugas"][:20], use_container_width=True, hide_index=True)
+
+    st.markdown("**Evaluasi terbaru**")
+    st.dataframe(
+        [
+            {
+                "waktu": time.strftime("%Y-%m-%d %H:%M", time.localtime(e.dibuat)),
+                "skor": e.skor,
+                "jenis tugas": e.jenis_tugas,
+                "teknik": ", ".join(e.teknik),
+                "sumber": e.sumber,
+                "prompt": e.cuplikan,
+            }
+            for e in entri
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+    st.caption(f"⏱️ Query riwayat {durasi:.0f} ms")
+
+@st.fragment
+def tampilkan_perbandingan(prompt_asli: str, versi_perbaikan: str):
+    """Toggle perbandingan sebelum/sesudah; hanya fragment ini yang di-rerun saat dicentang"""
+    if st.checkbox("📊 Tampilkan perbandingan sebelum dan sesudah", key="tampilkan_perbandingan"):
+        col1, col2 = st.columns(2)
+        
+        st.markdown("**Perbandingan Prompt:**")
+        with col1:
+            st.markdown("**📄 Prompt Asli:**")
+            st.text_area("", prompt_asli, height=300, disabled=True, key="original")
+        
+        with col2:
+            st.markdown("**✨ Prompt Optimized:**")
+            st.text_area("", versi_perbaikan, height=300, disabled=True, key="improved")
+
+def evaluasi_baru(penilai: PenilaiPrompt, prompt: str, lewati_cache: bool):
+    """Evaluasi prompt ke model dengan pratinjau lokal dan status antrian, lalu simpan hasilnya"""
+    pratinjau_lokal = st.empty()
+    with pratinjau_lokal.container():
+        with timer("pra_analisis"):
+            pra = pra_analisis(prompt)
+        tampilkan_pra_analisis(pra)
+    
+    # Backpressure: show where this request sits in the shared API queue
+    status_antrian = st.empty()
+    penilai.saat_antri = lambda posisi, detik: status_antrian.caption(
+        f"🚦 Banyak yang lagi evaluasi - kamu antrian ke-{posisi} (sekitar {detik:.0f} detik lagi)"
+    )
+    with st.spinner("Sedang melakukan evaluasi mendalam terhadap prompt Anda..."):
+        try:
+            if config["streaming"]:
+                analisis = analisis_dengan_streaming(penilai, prompt, pakai_cache=not lewati_cache)
+            else:
+                analisis = penilai.analisis_prompt(prompt, pakai_cache=not lewati_cache)
+        except AnalisisError as e:
+            st.error(str(e))
+            if isinstance(e.__cause__, AntrianError):
+                st.info("Antrian evaluasi sedang penuh, coba lagi beberapa saat lagi")
+            else:
+                st.info("Pastikan OPENAI_API_KEY sudah diset dengan benar")
+            # Still give per-prompt feedback from the local analyzer
+            analisis = analisis_lokal(prompt)
+            penilai.catat_riwayat(prompt, analisis)
+        finally:
+            penilai.saat_antri = None
+    status_antrian.empty()
+    pratinjau_lokal.empty()
+    
+    if analisis:
+        # The local fallback means the API just failed; a second call for tips would fail the same way
+        tips = (tips_lokal(prompt) or tips_default(analisis.skor)) if analisis.sumber == "lokal" else None
+        simpan_hasil(penilai, prompt, analisis, tips)
+
 def main():
     st.title("🎯 Evaluator Prompt Engineering")
     st.markdown("Analisis mendalam dan tingkatkan kualitas prompt Anda dengan standar industri profesional.")
     
-    # Check API key
+    # Check API key; the scorer is built once per session, not on every rerun
     try:
-        penilai = PenilaiPrompt()
+        if "penilai" not in st.session_state:
+            st.session_state.penilai = PenilaiPrompt(config)
+        penilai = st.session_state.penilai
     except ValueError as e:
         st.error("⚠️ API Key belum dikonfigurasi")
         st.info("""
@@ -345,57 +464,70 @@ def main():
         """)
         return
     
-    # Main input section
-    st.header("📝 Input Prompt untuk Evaluasi")
+    # Sample results are computed once and refreshed in the background when the model/template changes
+    contoh = get_koleksi_contoh(config) if config["contoh_enabled"] else None
+    if contoh is not None:
+        contoh.segarkan_background()
     
-    # Example buttons
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        if st.button("Zero-Shot", use_container_width=True):
-            st.session_state.sample = "Jelaskan konsep blockchain dalam 3 paragraf untuk pemula."
+    # Cache controls
+    with st.sidebar:
+        lewati_cache = st.checkbox(
+            "🔄 Evaluasi ulang tanpa cache",
+            help="Paksa evaluasi baru ke model walaupun prompt yang sama pernah dinilai"
+        )
+        lihat_riwayat = st.toggle(
+            "📊 Riwayat & dashboard",
+            disabled=penilai.riwayat is None,
+            help="Distribusi skor, jenis tugas, dan pemakaian teknik dari semua evaluasi yang pernah dibuat"
+        )
+        if config["app_debug"]:
+            st.markdown("**🗄️ Statistik Cache**")
+            st.json(penilai.cache.stats())
+            if contoh is not None:
+                st.markdown("**🧪 Artefak Prompt Contoh**")
+                st.json(contoh.stats())
+            st.markdown("**🔌 Koneksi OpenAI**")
+            st.json(statistik_koneksi())
+            st.markdown("**🚦 Antrian API**")
+            st.json(penilai.penjadwal.stats())
+            st.markdown("**🛡️ Retry & Circuit Breaker**")
+            st.json(penilai.resilien.stats())
+            st.markdown("**🤝 Panggilan Digabung**")
+            st.json(statistik_singleflight())
+            if penilai.riwayat is not None:
+                st.markdown("**📊 Riwayat Evaluasi**")
+                st.json(penilai.riwayat.stats())
+            if penilai.indeks_mirip is not None:
+                st.markdown("**🔁 Indeks Prompt Mirip**")
+                st.json(penilai.indeks_mirip.stats())
+            if config["cascade"]:
+                st.markdown("**🪜 Cascade Model**")
+                st.json(statistik_cascade())
+            if registry.aktif:
+                with st.expander("⏱️ Metrik Latency & Token"):
+                    st.json(registry.snapshot())
+                    st.download_button(
+                        "Unduh snapshot Prometheus",
+                        registry.prometheus(),
+                        file_name="metrics.prom",
+                        mime="text/plain"
+                    )
     
-    with col2:
-        if st.button("Few-Shot", use_container_width=True):
-            st.session_state.sample = """Ubah deskripsi produk menjadi caption Instagram yang menarik.
-
-Contoh 1:
-Produk: Tas kanvas ramah lingkungan
-Caption: Eco-friendly canvas bag 🌱 Style meets sustainability! Perfect untuk daily adventures. #EcoFashion #SustainableLiving
-
-Contoh 2:
-Produk: Botol minum stainless steel
-Caption: Stay hydrated in style! 💧 Our stainless steel bottle keeps drinks cold for 24hrs. #Hydration #EcoFriendly
+    if lihat_riwayat:
+        tampilkan_riwayat(penilai.riwayat)
+        return
 
-Sekarang buatkan untuk:
-Produk: Sepatu sneakers dari bahan daur ulang"""
+    # Main input section
+    st.header("📝 Input Prompt untuk Evaluasi")
     
-    with col3:
-        if st.button("Chain of Thought", use_container_width=True):
-            st.session_state.sample = """Saya punya budget Rp 5.000.000 untuk liburan 4 hari 3 malam di Bali untuk 2 orang. 
-
-Bantu saya buat rencana budget detail. Pikirkan step by step:
-1. Hitung alokasi untuk setiap kategori (transport, hotel, makan, aktivitas)
-2. Cari opsi yang sesuai budget untuk setiap kategori
-3. Hitung total dan pastikan tidak melebihi budget
-4. Berikan rekomendasi final dengan breakdown biaya"""
-
-    with col4:
-        if st.button("Tree of Thoughts", use_container_width=True):
-            st.session_state.sample = """Saya ingin memulai bisnis online dengan modal Rp 10 juta. 
-
-Eksplorasi 3 ide bisnis yang berbeda:
-1. E-commerce fashion
-2. Kursus online
-3. Jasa digital marketing
-
-Untuk setiap ide:
-- Jelaskan konsep bisnis
-- Breakdown modal yang dibutuhkan
-- Analisis target market
-- Proyeksi revenue 6 bulan
-- List risiko dan mitigasi
-
-Berikan rekomendasi bisnis mana yang paling potensial."""
+    # Example buttons: precomputed results are shown right away, without a model call
+    for kolom, (nama, teks) in zip(st.columns(len(CONTOH_PROMPT)), CONTOH_PROMPT.items()):
+        with kolom:
+            if st.button(nama, use_container_width=True):
+                st.session_state.sample = teks
+                hasil_contoh = contoh.ambil(nama) if contoh is not None else None
+                if hasil_contoh is not None:
+                    sajikan_contoh(penilai, contoh, hasil_contoh)
     
     # Text area
     prompt_pengguna = st.text_area(
@@ -405,116 +537,38 @@ Berikan rekomendasi bisnis mana yang paling potensial."""
         placeholder="Masukkan prompt Anda di sini untuk evaluasi mendalam..."
     )
     
+    # A stored analysis of a near-identical prompt is offered before spending a fresh evaluation
+    mirip = penilai.cari_mirip(prompt_pengguna) if prompt_pengguna and not lewati_cache else None
+    if mirip is not None:
+        tampilkan_prompt_mirip(penilai, prompt_pengguna, *mirip)
+    
+    # Very long prompts are trimmed to the input token budget; say so before the evaluation
+    keputusan = penilai.anggaran(prompt_pengguna) if prompt_pengguna else None
+    if keputusan is not None and keputusan.dipangkas:
+        tampilkan_anggaran(keputusan)
+    
     # Analyze button
     if st.button("🔍 Mulai Evaluasi Prompt", type="primary", use_container_width=True):
         if not prompt_pengguna:
             st.error("⚠️ Silakan masukkan prompt terlebih dahulu")
             return
             
-        with st.spinner("Sedang melakukan evaluasi mendalam terhadap prompt Anda..."):
-            analisis = penilai.analisis_prompt(prompt_pengguna)
-            
-        if analisis:
-            st.markdown("---")
-            
-            # Quick recommendations first
-            tampilkan_rekomendasi_cepat(analisis, penilai, prompt_pengguna)
-            
-            st.markdown("---")
-            
-            # Results header
-            st.header("📊 Hasil Evaluasi Prompt")
-            
-            # Score and task type
-            col1, col2, col3 = st.columns([2, 1, 2])
-            
-            with col1:
-                st.info(f"**📌 Kategori Tugas:** {analisis.jenis_tugas}")
-            
-            with col2:
-                tampilkan_meter_skor(analisis.skor)
-            
-            with col3:
-                st.info(f"**🎯 Teknik yang Direkomendasikan:** {', '.join(analisis.teknik_sesuai)}")
-            
-            # Technique analysis
-            st.subheader("🔍 Analisis Teknik Prompt Engineering")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("**✅ Teknik yang Teridentifikasi:**")
-                if analisis.teknik_ditemukan:
-                    for teknik_info in analisis.teknik_ditemukan:
-                        with st.expander(f"📋 {teknik_info.teknik}", expanded=False):
-                            st.write(f"**Alasan:** {teknik_info.alasan}")
-                else:
-                    st.warning("• Belum menggunakan teknik spesifik")
-            
-            with col2:
-                st.markdown("**💡 Teknik yang Disarankan:**")
-                if analisis.teknik_disarankan:
-                    for teknik_info in analisis.teknik_disarankan:
-                        # Check if this is praise (technique already used well) or suggestion
-                        if any(dt.teknik.lower() == teknik_info.teknik.lower() for dt in analisis.teknik_ditemukan):
-                            with st.expander(f"🎉 {teknik_info.teknik} (Sudah Baik!)", expanded=False):
-                                st.success(f"**Pujian:** {teknik_info.alasan}")
-                        else:
-                            with st.expander(f"🔧 {teknik_info.teknik}", expanded=False):
-                                st.info(f"**Saran:** {teknik_info.alasan}")
-                else:
-                    st.success("• Penggunaan teknik sudah optimal")
-            
-            # Detailed feedback
-            st.subheader("📋 Evaluasi Detail")
-            
-            tab1, tab2, tab3 = st.tabs(["✅ Kelebihan", "⚠️ Area Perbaikan", "📝 Rekomendasi"])
-            
-            with tab1:
-                if analisis.kelebihan:
-                    st.markdown("**Aspek yang sudah baik dalam prompt Anda:**")
-                    for item in analisis.kelebihan:
-                        st.markdown(f"• {item}")
-                else:
-                    st.info("Masih ada potensi pengembangan yang bisa dioptimalkan")
-            
-            with tab2:
-                if analisis.kekurangan:
-                    st.markdown("**Area yang memerlukan perbaikan:**")
-                    for item in analisis.kekurangan:
-                        st.markdown(f"• {item}")
-                else:
-                    st.success("Tidak ada kekurangan signifikan yang teridentifikasi")
-            
-            with tab3:
-                if analisis.rekomendasi:
-                    st.markdown("**Saran perbaikan untuk optimalisasi:**")
-                    for item in analisis.rekomendasi:
-                        st.markdown(f"• {item}")
-                else:
-                    st.info("Prompt sudah optimal untuk kategori tugas ini")
-            
-            # Improved version
-            st.subheader("🚀 Prompt yang Dioptimalkan")
-            
-            # Show improved prompt
-            st.code(analisis.versi_perbaikan, language="text")
-            
-            # Comparison toggle
-            if st.checkbox("📊 Tampilkan perbandingan sebelum dan sesudah"):
-                col1, col2 = st.columns(2)
-                
-                st.markdown("**Perbandingan Prompt:**")
-                with col1:
-                    st.markdown("**📄 Prompt Asli:**")
-                    st.text_area("", prompt_pengguna, height=300, disabled=True, key="original")
-                
-                with col2:
-                    st.markdown("**✨ Prompt Optimized:**")
-                    st.text_area("", analisis.versi_perbaikan, height=300, disabled=True, key="improved")
-            
-            # Success message
-            st.success("✅ Evaluasi selesai! Silakan gunakan versi yang telah dioptimalkan untuk hasil yang lebih baik.")
+        st.session_state.pop("hasil", None)
+        
+        # An unchanged sample prompt is served from its precomputed artifact
+        nama = nama_contoh(prompt_pengguna) if contoh is not None and not lewati_cache else None
+        hasil_contoh = contoh.ambil(nama) if nama is not None else None
+        if hasil_contoh is not None and hasil_contoh.segar:
+            sajikan_contoh(penilai, contoh, hasil_contoh)
+        else:
+            evaluasi_baru(penilai, prompt_pengguna, lewati_cache)
+    
+    # Results live in session state, so reruns from other widgets never drop or recompute them
+    if "hasil" in st.session_state:
+        if st.session_state.hasil["prompt"] != prompt_pengguna:
+            st.caption("ℹ️ Hasil di bawah untuk prompt yang terakhir dievaluasi")
+        with timer("render"):
+            tampilkan_hasil()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file